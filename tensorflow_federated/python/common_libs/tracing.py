@@ -27,14 +27,18 @@ various boundaries, namely between asyncio and regular python code:
 
 import abc
 import asyncio
+import bisect
+import collections
 import contextlib
 import functools
 import inspect
+import json
+import os
 import random
 import sys
 import threading
 import time
-from typing import Any, ContextManager, Dict, Generator, Generic, Iterator, List, Optional, Tuple, TypeVar, Union
+from typing import Any, ContextManager, Dict, Generator, Generic, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
 
 from absl import logging
 
@@ -124,10 +128,22 @@ class TracingProvider(Generic[T], metaclass=abc.ABCMeta):
     del parent_span_yield
     return _null_context()
 
+  def rpc_metadata(self,
+                   parent_span_yield: Optional[T]) -> List[Tuple[str, str]]:
+    """Returns metadata to attach to an RPC to carry `parent_span_yield`."""
+    del parent_span_yield
+    return []
+
   def receive_rpc(self) -> Optional[T]:
     """Unpack `parent_span_yield` from the receiving end of an RPC."""
     return None
 
+  def receive_rpc_metadata(
+      self, metadata: Sequence[Tuple[str, str]]) -> Optional[T]:
+    """Unpack `parent_span_yield` from the metadata of a received RPC."""
+    del metadata
+    return self.receive_rpc()
+
 
 class LoggingTracingProvider(TracingProvider):
   """Implements TracingProvider and outputs the results via logging.
@@ -159,6 +175,435 @@ class LoggingTracingProvider(TracingProvider):
                   time.time() - start_time)
 
 
+# Upper bounds of the buckets of latency histograms, in seconds.
+DEFAULT_LATENCY_BUCKETS = tuple(1e-5 * 4**i for i in range(13))
+# Upper bounds of the buckets of payload size histograms, in bytes.
+DEFAULT_PAYLOAD_BUCKETS = tuple(64 * 4**i for i in range(13))
+
+
+class Histogram():
+  """A histogram of observations over fixed buckets.
+
+  Follows the Prometheus conventions: `bucket_counts[i]` counts the
+  observations at most `bounds[i]`, excluding those in previous buckets, and
+  the observations above the last bound are only counted in `count`.
+  """
+
+  def __init__(self, bounds: Sequence[float]):
+    self.bounds = tuple(bounds)
+    self.bucket_counts = [0] * len(self.bounds)
+    self.count = 0
+    self.sum = 0.0
+
+  def observe(self, value: float):
+    index = bisect.bisect_left(self.bounds, value)
+    if index < len(self.bounds):
+      self.bucket_counts[index] += 1
+    self.count += 1
+    self.sum += value
+
+  def cumulative_counts(self) -> List[int]:
+    """Returns the number of observations at most each bound."""
+    counts = []
+    total = 0
+    for count in self.bucket_counts:
+      total += count
+      counts.append(total)
+    return counts
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {
+        'bounds': list(self.bounds),
+        'bucket_counts': list(self.bucket_counts),
+        'count': self.count,
+        'sum': self.sum,
+    }
+
+
+class MethodMetrics():
+  """The metrics recorded for one traced method."""
+
+  def __init__(self, latency_buckets: Sequence[float],
+               payload_buckets: Sequence[float]):
+    self.calls = 0
+    self.errors = 0
+    self.latency_seconds = Histogram(latency_buckets)
+    self.request_bytes = Histogram(payload_buckets)
+    self.response_bytes = Histogram(payload_buckets)
+
+
+# Identifies the metrics of a method as `(scope, sub_scope, placement)`.
+MetricsKey = Tuple[str, str, str]
+
+
+class MetricsRegistry():
+  """An in-process registry of the metrics of traced methods.
+
+  The metrics of each method are keyed by the scope and sub-scope of its spans,
+  generally the name of the class and of the method, and by the placement of
+  the values it returns. Values which have no placement are recorded under the
+  `'unplaced'` placement.
+  """
+
+  def __init__(self,
+               latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+               payload_buckets: Sequence[float] = DEFAULT_PAYLOAD_BUCKETS):
+    self._latency_buckets = tuple(latency_buckets)
+    self._payload_buckets = tuple(payload_buckets)
+    self._lock = threading.Lock()
+    self._metrics: Dict[MetricsKey, MethodMetrics] = {}
+
+  def record(self,
+             key: MetricsKey,
+             latency_seconds: float,
+             request_bytes: Optional[int] = None,
+             response_bytes: Optional[int] = None,
+             error: bool = False):
+    """Records a single call to the method identified by `key`."""
+    with self._lock:
+      metrics = self._metrics.get(key)
+      if metrics is None:
+        metrics = MethodMetrics(self._latency_buckets, self._payload_buckets)
+        self._metrics[key] = metrics
+      metrics.calls += 1
+      if error:
+        metrics.errors += 1
+      metrics.latency_seconds.observe(latency_seconds)
+      if request_bytes is not None:
+        metrics.request_bytes.observe(request_bytes)
+      if response_bytes is not None:
+        metrics.response_bytes.observe(response_bytes)
+
+  def get(self, scope: str, sub_scope: str,
+          placement: str = 'unplaced') -> Optional[MethodMetrics]:
+    """Returns the metrics recorded for a method, or `None` if none were."""
+    with self._lock:
+      return self._metrics.get((scope, sub_scope, placement))
+
+  def reset(self):
+    """Clears all the recorded metrics."""
+    with self._lock:
+      self._metrics = {}
+
+  def to_json(self) -> str:
+    """Returns the recorded metrics as a JSON list, one entry per method."""
+    with self._lock:
+      entries = []
+      for (scope, sub_scope, placement), metrics in sorted(
+          self._metrics.items()):
+        entries.append({
+            'scope': scope,
+            'sub_scope': sub_scope,
+            'placement': placement,
+            'calls': metrics.calls,
+            'errors': metrics.errors,
+            'latency_seconds': metrics.latency_seconds.to_dict(),
+            'request_bytes': metrics.request_bytes.to_dict(),
+            'response_bytes': metrics.response_bytes.to_dict(),
+        })
+    return json.dumps(entries)
+
+  def to_prometheus(self, prefix: str = 'tff') -> str:
+    """Returns the recorded metrics in the Prometheus text exposition format."""
+    with self._lock:
+      items = sorted(self._metrics.items())
+      lines = []
+      for name, kind, help_text in [
+          ('calls_total', 'counter', 'Number of calls to a traced method.'),
+          ('errors_total', 'counter', 'Number of traced calls that raised.'),
+          ('latency_seconds', 'histogram', 'Latency of traced calls.'),
+          ('request_bytes', 'histogram', 'Serialized size of requests.'),
+          ('response_bytes', 'histogram', 'Serialized size of responses.'),
+      ]:
+        metric_name = '{}_{}'.format(prefix, name)
+        lines.append('# HELP {} {}'.format(metric_name, help_text))
+        lines.append('# TYPE {} {}'.format(metric_name, kind))
+        for (scope, sub_scope, placement), metrics in items:
+          labels = 'scope="{}",sub_scope="{}",placement="{}"'.format(
+              scope, sub_scope, placement)
+          if kind == 'counter':
+            value = metrics.calls if name == 'calls_total' else metrics.errors
+            lines.append('{}{{{}}} {}'.format(metric_name, labels, value))
+            continue
+          histogram = getattr(metrics, name)
+          if not histogram.count:
+            continue
+          for bound, count in zip(histogram.bounds,
+                                  histogram.cumulative_counts()):
+            lines.append('{}_bucket{{{},le="{!r}"}} {}'.format(
+                metric_name, labels, bound, count))
+          lines.append('{}_bucket{{{},le="+Inf"}} {}'.format(
+              metric_name, labels, histogram.count))
+          lines.append('{}_sum{{{}}} {!r}'.format(metric_name, labels,
+                                                  histogram.sum))
+          lines.append('{}_count{{{}}} {}'.format(metric_name, labels,
+                                                  histogram.count))
+    return '\n'.join(lines) + '\n'
+
+
+def _payload_bytes(values) -> Optional[int]:
+  """Returns the serialized size of the protocol buffers in `values`."""
+  total = None
+  for value in values:
+    if isinstance(value, tuple):
+      size = _payload_bytes(value)
+    else:
+      byte_size = getattr(value, 'ByteSize', None)
+      size = byte_size() if callable(byte_size) else None
+    if size is not None:
+      total = size if total is None else total + size
+  return total
+
+
+def _placement_label(value) -> str:
+  type_signature = getattr(value, 'type_signature', None)
+  placement = getattr(type_signature, 'placement', None)
+  return 'unplaced' if placement is None else str(placement)
+
+
+class MetricsTracingProvider(TracingProvider):
+  """Implements TracingProvider and records metrics in a `MetricsRegistry`.
+
+  For each traced method, the provider records the number of calls and of
+  errors and a histogram of latencies, keyed by the scope and sub-scope of the
+  span and the placement of the returned value. Protocol buffers passed to or
+  returned from traced methods, such as the requests and responses of the
+  executor service or serialized values, are additionally recorded in
+  histograms of payload sizes. Spans traced with `stats=False` are skipped.
+
+  The provider yields no span context, so recording a call costs two clock
+  reads and one short critical section.
+  """
+
+  def __init__(self, registry: Optional[MetricsRegistry] = None):
+    """Creates a `MetricsTracingProvider`.
+
+    Args:
+      registry: The `MetricsRegistry` to record into. By default, a new
+        registry is created.
+    """
+    super().__init__()
+    if registry is None:
+      registry = MetricsRegistry()
+    py_typecheck.check_type(registry, MetricsRegistry)
+    self._registry = registry
+
+  @property
+  def registry(self) -> MetricsRegistry:
+    return self._registry
+
+  def span(
+      self,
+      scope: str,
+      sub_scope: str,
+      nonce: int,
+      parent_span_yield: Optional[None],
+      fn_args: Optional[Tuple[Any, ...]],
+      fn_kwargs: Optional[Dict[str, Any]],
+      trace_opts: Dict[str, Any],
+  ) -> Generator[None, TraceResult, None]:
+    del nonce, parent_span_yield
+    if not trace_opts.get('stats', True):
+      yield None
+      return
+    request_bytes = None
+    if fn_args:
+      request_bytes = _payload_bytes(fn_args)
+    if fn_kwargs:
+      kwargs_bytes = _payload_bytes(fn_kwargs.values())
+      if kwargs_bytes is not None:
+        request_bytes = (kwargs_bytes if request_bytes is None else
+                         request_bytes + kwargs_bytes)
+    start_time = time.perf_counter()
+    result = yield None
+    latency_seconds = time.perf_counter() - start_time
+    response_bytes = None
+    placement = 'unplaced'
+    if isinstance(result, TracedFunctionReturned):
+      response_bytes = _payload_bytes([result.value])
+      placement = _placement_label(result.value)
+    self._registry.record((scope, sub_scope, placement),
+                          latency_seconds,
+                          request_bytes=request_bytes,
+                          response_bytes=response_bytes,
+                          error=isinstance(result, TracedFunctionThrew))
+
+
+# The trace context carried by Chrome trace events, as `yield`ed by the `span`
+# of `ChromeTraceTracingProvider`.
+ChromeTraceContext = collections.namedtuple('ChromeTraceContext',
+                                            ['trace_id', 'span_id'])
+
+# The key of the RPC metadata carrying a `ChromeTraceContext`.
+CHROME_TRACE_CONTEXT_METADATA_KEY = 'tff-trace-context'
+
+
+def _new_trace_id() -> str:
+  return '{:016x}'.format(random.getrandbits(64))
+
+
+class ChromeTraceTracingProvider(TracingProvider):
+  """Implements TracingProvider and records spans as Chrome trace events.
+
+  The recorded events can be written as a JSON file in the Chrome trace-event
+  format, which can be loaded in Perfetto (https://ui.perfetto.dev) or in
+  `chrome://tracing`. Spans run outside of an `asyncio.Task` are recorded as
+  duration events on the track of their thread. Spans run by a task are
+  recorded as async events on the track of their task, since the spans of
+  tasks interleaving on one thread do not nest. Each event carries the id of
+  its thread and task, and of its trace, span and parent span.
+
+  The trace context is carried over RPCs made inside `wrap_rpc_in_trace_context`
+  through the `tff-trace-context` metadata, and linked to the spans of the
+  receiving process by a flow event, so that the traces recorded by a
+  controller and its remote workers can be merged into a single timeline.
+  """
+
+  def __init__(self, process_name: Optional[str] = None):
+    """Creates a `ChromeTraceTracingProvider`.
+
+    Args:
+      process_name: An optional name to display for the track of this process,
+        such as the address of a remote worker.
+    """
+    super().__init__()
+    self._lock = threading.Lock()
+    self._pid = os.getpid()
+    self._process_name = process_name
+    self._events = []
+
+  def _record(self, event: Dict[str, Any]):
+    with self._lock:
+      self._events.append(event)
+
+  def span(
+      self,
+      scope: str,
+      sub_scope: str,
+      nonce: int,
+      parent_span_yield: Optional[ChromeTraceContext],
+      fn_args: Optional[Tuple[Any, ...]],
+      fn_kwargs: Optional[Dict[str, Any]],
+      trace_opts: Dict[str, Any],
+  ) -> Generator[ChromeTraceContext, TraceResult, None]:
+    del fn_args, fn_kwargs, trace_opts
+    if parent_span_yield is None:
+      context = ChromeTraceContext(_new_trace_id(), _new_trace_id())
+      parent_span_id = None
+    else:
+      context = ChromeTraceContext(parent_span_yield.trace_id,
+                                   _new_trace_id())
+      parent_span_id = parent_span_yield.span_id
+    task = _current_task()
+    task_id = None if task is None else '{:x}'.format(id(task))
+    event = {
+        'name': '{}.{}'.format(scope, sub_scope),
+        'cat': scope,
+        'pid': self._pid,
+        'tid': threading.get_ident(),
+    }
+    if task_id is None:
+      begin_phase, end_phase = 'B', 'E'
+    else:
+      begin_phase, end_phase = 'b', 'e'
+      event['id'] = task_id
+    self._record(
+        dict(
+            event,
+            ph=begin_phase,
+            ts=time.time() * 1e6,
+            args={
+                'trace_id': context.trace_id,
+                'span_id': context.span_id,
+                'parent_span_id': parent_span_id,
+                'task_id': task_id,
+                'nonce': nonce,
+            }))
+    result = yield context
+    end_args = {}
+    if isinstance(result, TracedFunctionThrew):
+      end_args['error'] = getattr(result.error_type, '__name__',
+                                  str(result.error_type))
+    # The end of an async span may be recorded on another thread.
+    self._record(
+        dict(
+            event,
+            ph=end_phase,
+            ts=time.time() * 1e6,
+            tid=threading.get_ident(),
+            args=end_args))
+
+  def rpc_metadata(
+      self, parent_span_yield: Optional[ChromeTraceContext]
+  ) -> List[Tuple[str, str]]:
+    if parent_span_yield is None:
+      return []
+    self._record({
+        'name': 'rpc',
+        'cat': 'rpc',
+        'ph': 's',
+        'id': parent_span_yield.span_id,
+        'pid': self._pid,
+        'tid': threading.get_ident(),
+        'ts': time.time() * 1e6,
+    })
+    return [(CHROME_TRACE_CONTEXT_METADATA_KEY,
+             '{}:{}'.format(parent_span_yield.trace_id,
+                            parent_span_yield.span_id))]
+
+  def receive_rpc_metadata(
+      self,
+      metadata: Sequence[Tuple[str, str]]) -> Optional[ChromeTraceContext]:
+    for key, value in metadata:
+      if key != CHROME_TRACE_CONTEXT_METADATA_KEY:
+        continue
+      trace_id, _, span_id = value.partition(':')
+      if not trace_id or not span_id:
+        return None
+      self._record({
+          'name': 'rpc',
+          'cat': 'rpc',
+          'ph': 'f',
+          'bp': 'e',
+          'id': span_id,
+          'pid': self._pid,
+          'tid': threading.get_ident(),
+          'ts': time.time() * 1e6,
+      })
+      return ChromeTraceContext(trace_id, span_id)
+    return None
+
+  def events(self) -> List[Dict[str, Any]]:
+    """Returns the events recorded so far, in the Chrome trace-event format."""
+    with self._lock:
+      events = list(self._events)
+    if self._process_name is not None:
+      events.insert(
+          0, {
+              'name': 'process_name',
+              'ph': 'M',
+              'pid': self._pid,
+              'args': {
+                  'name': self._process_name
+              },
+          })
+    return events
+
+  def clear(self):
+    """Discards the events recorded so far."""
+    with self._lock:
+      self._events = []
+
+  def to_json(self) -> str:
+    """Returns the recorded events as a Chrome trace-event JSON object."""
+    return json.dumps({'traceEvents': self.events(), 'displayTimeUnit': 'ms'})
+
+  def write(self, path: str):
+    """Writes the recorded events to a Chrome trace-event JSON file."""
+    with open(path, 'w') as f:
+      f.write(self.to_json())
+
+
 _global_tracing_providers = [LoggingTracingProvider()]
 
 
@@ -303,9 +748,14 @@ def _current_span_yields() -> SpanYields:
     spans = _non_async_span_yields.get()
   else:
     spans = getattr(task, 'trace_span_yields', None)
+  num_providers = len(_global_tracing_providers)
   if spans is None:
-    spans = [None for _ in range(len(_global_tracing_providers))]
-  assert len(_global_tracing_providers) == len(spans)
+    return [None] * num_providers
+  if len(spans) != num_providers:
+    # Tracing providers were added or removed since `spans` were recorded.
+    # Providers are added at the end, so the providers that were already
+    # installed keep their parent spans, and new ones start from the root.
+    spans = spans[:num_providers] + [None] * (num_providers - len(spans))
   return spans
 
 
@@ -394,18 +844,40 @@ def wrap_coroutine_in_current_trace_context(coro):
 
 @contextlib.contextmanager
 def wrap_rpc_in_trace_context():
-  """Attempts to record the trace context into the enclosed RPC call."""
+  """Attempts to record the trace context into the enclosed RPC call.
+
+  Yields:
+    A list of `(key, value)` pairs to send as the metadata of the RPC call, for
+    the `TracingProvider`s that carry their trace context that way.
+  """
   with contextlib.ExitStack() as stack:
+    metadata = []
     for tp, parent_span_yield in zip(_global_tracing_providers,
                                      _current_span_yields()):
       stack.enter_context(tp.wrap_rpc(parent_span_yield))
-    yield None
+      metadata.extend(tp.rpc_metadata(parent_span_yield))
+    yield metadata
 
 
 @contextlib.contextmanager
-def with_trace_context_from_rpc():
-  """Attempts to pick up the trace context from the receiving RPC call."""
-  span_yields_from_rpc = [tp.receive_rpc() for tp in _global_tracing_providers]
+def with_trace_context_from_rpc(
+    metadata: Optional[Sequence[Tuple[str, str]]] = None):
+  """Attempts to pick up the trace context from the receiving RPC call.
+
+  Args:
+    metadata: The optional metadata of the received RPC call.
+
+  Yields:
+    `None`.
+  """
+  if metadata:
+    span_yields_from_rpc = [
+        tp.receive_rpc_metadata(metadata) for tp in _global_tracing_providers
+    ]
+  else:
+    span_yields_from_rpc = [
+        tp.receive_rpc() for tp in _global_tracing_providers
+    ]
   with _with_span_yields(span_yields_from_rpc):
     yield None
 
@@ -417,6 +889,18 @@ def add_tracing_provider(tracing_provider: TracingProvider):
   _global_tracing_providers.append(tracing_provider)
 
 
+def remove_tracing_provider(tracing_provider: TracingProvider):
+  """Remove from the global list of tracing providers."""
+  py_typecheck.check_type(tracing_provider, TracingProvider)
+  global _global_tracing_providers
+  if not any(tp is tracing_provider for tp in _global_tracing_providers):
+    raise ValueError('The tracing provider {} was not added.'.format(
+        tracing_provider))
+  _global_tracing_providers = [
+      tp for tp in _global_tracing_providers if tp is not tracing_provider
+  ]
+
+
 def set_tracing_providers(tracing_providers: List[TracingProvider]):
   """Set the global list of tracing providers, replacing any existing."""
   py_typecheck.check_type(tracing_providers, list)
@@ -15,6 +15,7 @@
 import asyncio
 import functools
 import io
+import json
 import logging as std_logging
 import threading
 import time
@@ -319,6 +320,187 @@ class TracingProviderInterfaceTest(absltest.TestCase):
     self.assertEqual(mock.scopes, ['outer', '<locals>', 'inner'])
     self.assertEqual(mock.sub_scopes, ['', 'middle', ''])
 
+  def test_remove_tracing_provider(self):
+    mock_1 = set_mock_trace()
+    mock_2 = MockTracingProvider()
+    tracing.add_tracing_provider(mock_2)
+    with tracing.span('scope', 'first'):
+      pass
+    tracing.remove_tracing_provider(mock_2)
+    with tracing.span('scope', 'second'):
+      pass
+    self.assertEqual(mock_1.sub_scopes, ['first', 'second'])
+    self.assertEqual(mock_2.sub_scopes, ['first'])
+    with self.assertRaises(ValueError):
+      tracing.remove_tracing_provider(mock_2)
+
+  def test_span_after_provider_added_within_span(self):
+    mock = set_mock_trace()
+    added_mock = MockTracingProvider()
+    with tracing.span('outer', ''):
+      tracing.add_tracing_provider(added_mock)
+      with tracing.span('inner', ''):
+        pass
+      tracing.remove_tracing_provider(added_mock)
+      with tracing.span('after', ''):
+        pass
+    # The spans of the provider installed throughout keep their parent.
+    self.assertEqual(mock.parent_span_yields, [None, 0, 0])
+    self.assertEqual(added_mock.parent_span_yields, [None])
+
+
+class _FakeProto():
+
+  def __init__(self, size):
+    self._size = size
+
+  def ByteSize(self):  # pylint: disable=invalid-name
+    return self._size
+
+
+class MetricsTracingProviderTest(absltest.TestCase):
+
+  def test_records_calls_latency_and_payload_sizes(self):
+    provider = tracing.MetricsTracingProvider()
+    tracing.set_tracing_providers([provider])
+
+    class MyClass:
+
+      @tracing.trace
+      def my_func(self, request):
+        del request
+        return _FakeProto(200)
+
+    MyClass().my_func(_FakeProto(100))
+    MyClass().my_func(_FakeProto(100))
+    metrics = provider.registry.get('MyClass', 'my_func')
+    self.assertEqual(metrics.calls, 2)
+    self.assertEqual(metrics.errors, 0)
+    self.assertEqual(metrics.latency_seconds.count, 2)
+    self.assertEqual(metrics.request_bytes.sum, 200)
+    self.assertEqual(metrics.response_bytes.sum, 400)
+
+  def test_records_errors_and_placement(self):
+    provider = tracing.MetricsTracingProvider()
+    tracing.set_tracing_providers([provider])
+
+    class _Type:
+      placement = 'CLIENTS'
+
+    class _Value:
+      type_signature = _Type()
+
+    class MyClass:
+
+      @tracing.trace
+      async def create_value(self):
+        return _Value()
+
+      @tracing.trace
+      async def create_call(self):
+        raise ValueError()
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(MyClass().create_value())
+    with self.assertRaises(ValueError):
+      loop.run_until_complete(MyClass().create_call())
+    loop.close()
+    self.assertEqual(
+        provider.registry.get('MyClass', 'create_value', 'CLIENTS').calls, 1)
+    self.assertEqual(provider.registry.get('MyClass', 'create_call').errors, 1)
+
+  def test_skips_spans_without_stats(self):
+    provider = tracing.MetricsTracingProvider()
+    tracing.set_tracing_providers([provider])
+
+    class MyClass:
+
+      @tracing.trace(stats=False)
+      def my_func(self):
+        pass
+
+    MyClass().my_func()
+    self.assertIsNone(provider.registry.get('MyClass', 'my_func'))
+
+  def test_exports_json_and_prometheus(self):
+    registry = tracing.MetricsRegistry(latency_buckets=[0.1, 1.0])
+    registry.record(('Executor', 'compute', 'SERVER'), 0.5)
+    registry.record(('Executor', 'compute', 'SERVER'), 2.0, error=True)
+    entries = json.loads(registry.to_json())
+    self.assertLen(entries, 1)
+    self.assertEqual(entries[0]['calls'], 2)
+    self.assertEqual(entries[0]['latency_seconds']['bucket_counts'], [0, 1])
+    text = registry.to_prometheus()
+    labels = 'scope="Executor",sub_scope="compute",placement="SERVER"'
+    self.assertIn('tff_calls_total{%s} 2' % labels, text)
+    self.assertIn('tff_errors_total{%s} 1' % labels, text)
+    self.assertIn('tff_latency_seconds_bucket{%s,le="1.0"} 1' % labels, text)
+    self.assertIn('tff_latency_seconds_bucket{%s,le="+Inf"} 2' % labels, text)
+    self.assertIn('tff_latency_seconds_count{%s} 2' % labels, text)
+    registry.reset()
+    self.assertEqual(json.loads(registry.to_json()), [])
+
+
+class ChromeTraceTracingProviderTest(absltest.TestCase):
+
+  def test_records_nested_thread_spans(self):
+    provider = tracing.ChromeTraceTracingProvider(process_name='controller')
+    tracing.set_tracing_providers([provider])
+    with tracing.span('outer', 'osub'):
+      with tracing.span('inner', 'isub'):
+        pass
+    events = provider.events()
+    self.assertEqual(events[0]['ph'], 'M')
+    self.assertEqual(events[0]['args']['name'], 'controller')
+    spans = events[1:]
+    self.assertEqual([(e['name'], e['ph']) for e in spans],
+                     [('outer.osub', 'B'), ('inner.isub', 'B'),
+                      ('inner.isub', 'E'), ('outer.osub', 'E')])
+    outer_args, inner_args = spans[0]['args'], spans[1]['args']
+    self.assertEqual(inner_args['trace_id'], outer_args['trace_id'])
+    self.assertEqual(inner_args['parent_span_id'], outer_args['span_id'])
+    self.assertIsNone(outer_args['parent_span_id'])
+
+  def test_records_task_spans_as_async_events(self):
+    provider = tracing.ChromeTraceTracingProvider()
+    tracing.set_tracing_providers([provider])
+
+    @tracing.trace
+    async def foo():
+      raise ValueError()
+
+    loop = asyncio.new_event_loop()
+    with self.assertRaises(ValueError):
+      loop.run_until_complete(loop.create_task(foo()))
+    loop.close()
+    begin, end = provider.events()
+    self.assertEqual((begin['ph'], end['ph']), ('b', 'e'))
+    self.assertEqual(begin['id'], end['id'])
+    self.assertEqual(begin['args']['task_id'], begin['id'])
+    self.assertEqual(end['args']['error'], 'ValueError')
+
+  def test_propagates_trace_context_across_rpc(self):
+    client = tracing.ChromeTraceTracingProvider()
+    tracing.set_tracing_providers([client])
+    with tracing.span('client', 'call'):
+      with tracing.wrap_rpc_in_trace_context() as metadata:
+        pass
+    client_span = client.events()[0]['args']
+
+    server = tracing.ChromeTraceTracingProvider()
+    tracing.set_tracing_providers([server])
+    with tracing.with_trace_context_from_rpc(metadata):
+      with tracing.span('server', 'handle'):
+        pass
+    flow, server_span = server.events()[:2]
+    self.assertEqual(flow['ph'], 'f')
+    self.assertEqual(flow['id'], client_span['span_id'])
+    self.assertEqual(server_span['args']['trace_id'], client_span['trace_id'])
+    self.assertEqual(server_span['args']['parent_span_id'],
+                     client_span['span_id'])
+    trace = json.loads(server.to_json())
+    self.assertLen(trace['traceEvents'], 3)
+
 
 if __name__ == '__main__':
   absltest.main()
@@ -17,6 +17,8 @@ import abc
 import collections
 import difflib
 import enum
+import functools
+import threading
 import typing
 from typing import Any, Dict, Optional, Type as TypingType, TypeVar
 import weakref
@@ -123,6 +125,83 @@ class TypesNotIdenticalError(TypeError):
     self.second_type = second_type
 
 
+# Size here is simply heuristic, no formal analysis.
+_TYPE_RELATION_MEMO_SIZE = 10000
+
+
+class _TypeRelationMemo():
+  """A bounded memo of relations between types, keyed by their identity.
+
+  Since types are interned and immutable, whether a relation holds between two
+  types is a function of the identity of the types alone. Entries refer to the
+  types weakly, so that the memo does not extend their lifetimes, and the least
+  recently used entries are evicted once the memo holds `maxsize` of them.
+  """
+
+  def __init__(self, maxsize: int):
+    self._maxsize = maxsize
+    self._lock = threading.Lock()
+    self._entries = collections.OrderedDict()
+    self.hits = 0
+    self.misses = 0
+
+  def get(self, relation: TypeRelation, first: 'Type',
+          second: 'Type') -> Optional[bool]:
+    """Returns whether `relation` holds, or `None` if it is not memoized."""
+    key = (relation, id(first), id(second))
+    with self._lock:
+      entry = self._entries.get(key)
+      # The identifiers of dead types may have been reused by new ones.
+      if entry is None or entry[0]() is not first or entry[1]() is not second:
+        self.misses += 1
+        return None
+      self._entries.move_to_end(key)
+      self.hits += 1
+      return entry[2]
+
+  def put(self, relation: TypeRelation, first: 'Type', second: 'Type',
+          result: bool):
+    key = (relation, id(first), id(second))
+    entry = (weakref.ref(first), weakref.ref(second), result)
+    with self._lock:
+      self._entries[key] = entry
+      self._entries.move_to_end(key)
+      while len(self._entries) > self._maxsize:
+        self._entries.popitem(last=False)
+
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+      self.hits = 0
+      self.misses = 0
+
+  def __len__(self):
+    return len(self._entries)
+
+
+_type_relation_memo = _TypeRelationMemo(_TYPE_RELATION_MEMO_SIZE)
+
+
+def _memoize_type_relation(relation: TypeRelation):
+  """Memoizes a method checking `relation` between two types."""
+
+  def decorator(fn):
+
+    @functools.wraps(fn)
+    def wrapper(self, other):
+      if self is other or not isinstance(other, Type):
+        return fn(self, other)
+      result = _type_relation_memo.get(relation, self, other)
+      if result is None:
+        result = fn(self, other)
+        _type_relation_memo.put(relation, self, other, result)
+      return result
+
+    return wrapper
+
+  return decorator
+
+
 class Type(object, metaclass=abc.ABCMeta):
   """An abstract interface for all classes that represent TFF types."""
 
@@ -263,6 +342,7 @@ class Type(object, metaclass=abc.ABCMeta):
     if not self.is_equivalent_to(other):
       raise TypesNotEquivalentError(self, other)
 
+  @_memoize_type_relation(TypeRelation.EQUIVALENT)
   def is_equivalent_to(self, other: 'Type') -> bool:
     """Returns whether values of `other` can be cast to and from this type."""
     return self.is_assignable_from(other) and other.is_assignable_from(self)
@@ -306,6 +386,44 @@ class _ValueWithHash():
 # during destruction.
 _intern_pool: Dict[typing.Type[Any], Dict[Any, Any]] = (
     collections.defaultdict(lambda: weakref.WeakValueDictionary({})))
+# Guards `_intern_pool`, so that concurrent constructions with the same
+# arguments agree on a single instance.
+_intern_pool_lock = threading.RLock()
+# Per-`typing.Type` counts of the constructions that found (hits) and did not
+# find (misses) a live instance in `_intern_pool`.
+_intern_pool_hits: Dict[typing.Type[Any], int] = collections.Counter()
+_intern_pool_misses: Dict[typing.Type[Any], int] = collections.Counter()
+
+
+@attr.s(frozen=True)
+class InternPoolStats(object):
+  """Counters describing the interned instances of a type class.
+
+  Attributes:
+    size: The number of live instances currently interned.
+    hits: The number of constructions that returned a live interned instance.
+    misses: The number of constructions that created a new instance.
+  """
+  size = attr.ib(type=int)
+  hits = attr.ib(type=int)
+  misses = attr.ib(type=int)
+
+
+def intern_pool_stats() -> Dict[typing.Type[Any], InternPoolStats]:
+  """Returns the `InternPoolStats` of each interned type class.
+
+  Interned instances are only referenced weakly by the pool, so an instance no
+  longer referenced elsewhere is dropped from it, and a later construction with
+  the same arguments creates a new instance.
+  """
+  with _intern_pool_lock:
+    return {
+        cls: InternPoolStats(
+            size=len(pool),
+            hits=_intern_pool_hits[cls],
+            misses=_intern_pool_misses[cls])
+        for cls, pool in _intern_pool.items()
+    }
 
 
 class _Intern(abc.ABCMeta):
@@ -349,14 +467,22 @@ class _Intern(abc.ABCMeta):
       ) from None
     hashable_args = _ValueWithHash(normalized_args,
                                    cls._hash_normalized_args(*normalized_args))
-    intern_pool_for_cls = _intern_pool[cls]
-    interned = intern_pool_for_cls.get(hashable_args, None)
-    if interned is None:
-      new_instance = super().__call__(*normalized_args)
+    with _intern_pool_lock:
+      intern_pool_for_cls = _intern_pool[cls]
+      interned = intern_pool_for_cls.get(hashable_args, None)
+      if interned is not None:
+        _intern_pool_hits[cls] += 1
+        return interned
+    new_instance = super().__call__(*normalized_args)
+    with _intern_pool_lock:
+      # Another thread may have interned an instance in the meantime.
+      interned = intern_pool_for_cls.get(hashable_args, None)
+      if interned is not None:
+        _intern_pool_hits[cls] += 1
+        return interned
+      _intern_pool_misses[cls] += 1
       intern_pool_for_cls[hashable_args] = new_instance
       return new_instance
-    else:
-      return interned
 
 
 def _hash_dtype_and_shape(dtype: tf.DType, shape: tf.TensorShape) -> int:
@@ -442,6 +568,7 @@ class TensorType(Type, metaclass=_Intern):
             (isinstance(other, TensorType) and self._dtype == other.dtype and
              tensor_utils.same_shape(self._shape, other.shape)))
 
+  @_memoize_type_relation(TypeRelation.ASSIGNABLE)
   def is_assignable_from(self, source_type: 'Type') -> bool:
     if self is source_type:
       return True
@@ -561,6 +688,7 @@ class StructType(structure.Struct, Type, metaclass=_Intern):
     return (self is other) or (isinstance(other, StructType) and
                                structure.Struct.__eq__(self, other))
 
+  @_memoize_type_relation(TypeRelation.ASSIGNABLE)
   def is_assignable_from(self, source_type: 'Type') -> bool:
     if self is source_type:
       return True
@@ -659,6 +787,7 @@ class SequenceType(Type, metaclass=_Intern):
     return ((self is other) or (isinstance(other, SequenceType) and
                                 self._element == other.element))
 
+  @_memoize_type_relation(TypeRelation.ASSIGNABLE)
   def is_assignable_from(self, source_type: 'Type') -> bool:
     if self is source_type:
       return True
@@ -714,6 +843,7 @@ class FunctionType(Type, metaclass=_Intern):
                                 self._parameter == other.parameter and
                                 self._result == other.result))
 
+  @_memoize_type_relation(TypeRelation.ASSIGNABLE)
   def is_assignable_from(self, source_type: 'Type') -> bool:
     if self is source_type:
       return True
@@ -802,6 +932,7 @@ class PlacementType(Type, metaclass=_Intern):
   def __eq__(self, other):
     return (self is other) or isinstance(other, PlacementType)
 
+  @_memoize_type_relation(TypeRelation.ASSIGNABLE)
   def is_assignable_from(self, source_type: 'Type') -> bool:
     if self is source_type:
       return True
@@ -878,6 +1009,7 @@ class FederatedType(Type, metaclass=_Intern):
                                 self._placement == other.placement and
                                 self._all_equal == other.all_equal))
 
+  @_memoize_type_relation(TypeRelation.ASSIGNABLE)
   def is_assignable_from(self, source_type: 'Type') -> bool:
     if self is source_type:
       return True
@@ -0,0 +1,87 @@
+# Copyright 2020, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the type relation checks in `computation_types`.
+
+Compares checking the assignability of large nested model weight types with
+and without the memo of type relations. Run with `--benchmarks=.` to execute
+all benchmarks.
+"""
+
+import collections
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_federated.python.core.api import computation_types
+
+_NUM_ITERS = 100
+
+
+def _model_weights_types(num_layers):
+  """Returns a pair of distinct, mutually assignable model weight types."""
+  layers = collections.OrderedDict()
+  for i in range(num_layers):
+    layers['layer_{}'.format(i)] = collections.OrderedDict(
+        kernel=computation_types.TensorType(tf.float32, [i + 1, 128]),
+        bias=computation_types.TensorType(tf.float32, [128]))
+  named_type = computation_types.to_type(
+      collections.OrderedDict(trainable=layers, non_trainable=[]))
+  # The same structure without names, as produced for unnamed values.
+  unnamed_type = computation_types.StructType([
+      computation_types.StructType([
+          computation_types.StructType(list(layer))
+          for layer in named_type.trainable
+      ]),
+      computation_types.StructType([]),
+  ])
+  return (computation_types.at_clients(named_type),
+          computation_types.at_clients(unnamed_type))
+
+
+class TypeRelationBenchmark(tf.test.Benchmark):
+
+  def _benchmark_is_assignable_from(self, num_layers):
+    target_type, source_type = _model_weights_types(num_layers)
+    memo = computation_types._type_relation_memo  # pylint: disable=protected-access
+    uncached_times = []
+    cached_times = []
+    for _ in range(_NUM_ITERS):
+      memo.clear()
+      start = time.time()
+      target_type.is_assignable_from(source_type)
+      uncached_times.append(time.time() - start)
+
+      start = time.time()
+      target_type.is_assignable_from(source_type)
+      cached_times.append(time.time() - start)
+
+    self.report_benchmark(
+        name='is_assignable_from_{}_layers'.format(num_layers),
+        iters=_NUM_ITERS,
+        wall_time=np.median(cached_times),
+        extras={
+            'uncached_wall_time': np.median(uncached_times),
+            'cached_wall_time': np.median(cached_times),
+        })
+
+  def benchmark_is_assignable_from_10_layers(self):
+    self._benchmark_is_assignable_from(10)
+
+  def benchmark_is_assignable_from_1000_layers(self):
+    self._benchmark_is_assignable_from(1000)
+
+
+if __name__ == '__main__':
+  tf.test.main()
@@ -13,6 +13,8 @@
 # limitations under the License.
 
 import collections
+from concurrent import futures
+import weakref
 
 from absl.testing import absltest
 from absl.testing import parameterized
@@ -479,6 +481,90 @@ class FederatedTypeTest(absltest.TestCase):
     self.assertEqual(actual_type, expected_type)
 
 
+class TypeRelationMemoTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    computation_types._type_relation_memo.clear()  # pylint: disable=protected-access
+
+  def test_memoizes_assignability(self):
+    memo = computation_types._type_relation_memo  # pylint: disable=protected-access
+    t1 = computation_types.StructType([('a', tf.int32), ('b', tf.bool)])
+    t2 = computation_types.StructType([tf.int32, tf.bool])
+    self.assertTrue(t1.is_assignable_from(t2))
+    misses = memo.misses
+    self.assertTrue(t1.is_assignable_from(t2))
+    self.assertEqual(memo.misses, misses)
+    self.assertEqual(memo.hits, 1)
+    self.assertFalse(t2.is_assignable_from(t1))
+
+  def test_memoizes_equivalence(self):
+    memo = computation_types._type_relation_memo  # pylint: disable=protected-access
+    t1 = computation_types.FederatedType(tf.int32, placements.CLIENTS)
+    t2 = computation_types.FederatedType(tf.int32, placements.CLIENTS, True)
+    self.assertFalse(t1.is_equivalent_to(t2))
+    hits = memo.hits
+    self.assertFalse(t1.is_equivalent_to(t2))
+    self.assertEqual(memo.hits, hits + 1)
+
+  def test_evicts_least_recently_used_relation(self):
+    memo = computation_types._TypeRelationMemo(maxsize=2)  # pylint: disable=protected-access
+    relation = computation_types.TypeRelation.ASSIGNABLE
+    t1 = computation_types.TensorType(tf.int32)
+    t2 = computation_types.TensorType(tf.int32, [None])
+    t3 = computation_types.TensorType(tf.int32, [2])
+    memo.put(relation, t1, t2, False)
+    memo.put(relation, t2, t3, True)
+    self.assertTrue(memo.get(relation, t2, t3))
+    memo.put(relation, t1, t3, False)
+    self.assertLen(memo, 2)
+    self.assertIsNone(memo.get(relation, t1, t2))
+    self.assertTrue(memo.get(relation, t2, t3))
+
+  def test_does_not_extend_lifetime_of_types(self):
+    t1 = computation_types.TensorType(tf.int32, [None, 7])
+    t2 = computation_types.TensorType(tf.int32, [3, 7])
+    self.assertTrue(t1.is_assignable_from(t2))
+    t2_ref = weakref.ref(t2)
+    del t2
+    self.assertIsNone(t2_ref())
+
+
+class InternPoolTest(absltest.TestCase):
+
+  def test_stats_count_constructions(self):
+    stats = computation_types.intern_pool_stats()
+    misses = stats.get(computation_types.AbstractType,
+                       computation_types.InternPoolStats(0, 0, 0)).misses
+    t = computation_types.AbstractType('T_intern_pool_stats')
+    self.assertIs(t, computation_types.AbstractType('T_intern_pool_stats'))
+    stats = computation_types.intern_pool_stats()[
+        computation_types.AbstractType]
+    self.assertEqual(stats.misses, misses + 1)
+    self.assertGreaterEqual(stats.hits, 1)
+    self.assertGreaterEqual(stats.size, 1)
+
+  def test_drops_instances_no_longer_referenced(self):
+    t = computation_types.TensorType(tf.int64, [3, 5, 7, 11])
+    t_ref = weakref.ref(t)
+    size = computation_types.intern_pool_stats()[
+        computation_types.TensorType].size
+    del t
+    self.assertIsNone(t_ref())
+    self.assertEqual(
+        computation_types.intern_pool_stats()[
+            computation_types.TensorType].size, size - 1)
+
+  def test_concurrent_constructions_return_same_instance(self):
+    spec = [('a', tf.int32), ('b', [tf.float32, tf.string])]
+    with futures.ThreadPoolExecutor(max_workers=8) as executor:
+      types = list(
+          executor.map(lambda _: computation_types.StructType(spec),
+                       range(100)))
+    for t in types:
+      self.assertIs(t, types[0])
+
+
 class ToTypeTest(absltest.TestCase):
 
   def test_tensor_type(self):
@@ -23,30 +23,59 @@ def create_local_execution_context(num_clients=None,
                                    max_fanout=100,
                                    clients_per_thread=1,
                                    server_tf_device=None,
-                                   client_tf_devices=tuple()):
-  """Creates an execution context that executes computations locally."""
-  factory = executor_stacks.local_executor_factory(
-      num_clients=num_clients,
-      max_fanout=max_fanout,
-      clients_per_thread=clients_per_thread,
-      server_tf_device=server_tf_device,
-      client_tf_devices=client_tf_devices)
+                                   client_tf_devices=tuple(),
+                                   num_processes=None,
+                                   compilation_cache_dir=None):
+  """Creates an execution context that executes computations locally.
+
+  If `num_processes` is specified, clients are sharded across that many local
+  worker processes, as constructed by
+  `executor_stacks.local_multiprocess_executor_factory`. In this mode the
+  number of clients is always inferred from the arguments of a computation, and
+  TF devices cannot be specified.
+
+  If `compilation_cache_dir` is specified, compiled computations are persisted
+  in that directory and reused by later processes.
+  """
+  if num_processes is not None:
+    if (num_clients is not None or server_tf_device is not None or
+        client_tf_devices):
+      raise ValueError(
+          '`num_clients`, `server_tf_device` and `client_tf_devices` are not '
+          'supported together with `num_processes`.')
+    factory = executor_stacks.local_multiprocess_executor_factory(
+        num_processes=num_processes,
+        max_fanout=max_fanout,
+        clients_per_thread=clients_per_thread)
+  else:
+    factory = executor_stacks.local_executor_factory(
+        num_clients=num_clients,
+        max_fanout=max_fanout,
+        clients_per_thread=clients_per_thread,
+        server_tf_device=server_tf_device,
+        client_tf_devices=client_tf_devices)
   return execution_context.ExecutionContext(
-      executor_fn=factory, compiler_fn=compiler.transform_to_native_form)
+      executor_fn=factory,
+      compiler_fn=compiler.transform_to_native_form,
+      compilation_cache_dir=compilation_cache_dir)
 
 
 def set_local_execution_context(num_clients=None,
                                 max_fanout=100,
                                 clients_per_thread=1,
                                 server_tf_device=None,
-                                client_tf_devices=tuple()):
+                                client_tf_devices=tuple(),
+                                num_processes=None,
+                                compilation_cache_dir=None):
   """Sets an execution context that executes computations locally."""
   context = create_local_execution_context(
       num_clients=num_clients,
       max_fanout=max_fanout,
       clients_per_thread=clients_per_thread,
       server_tf_device=server_tf_device,
-      client_tf_devices=client_tf_devices)
+      client_tf_devices=client_tf_devices,
+      num_processes=num_processes,
+      compilation_cache_dir=compilation_cache_dir)
   context_stack_impl.context_stack.set_default_context(context)
 
 
@@ -90,7 +119,9 @@ def create_remote_execution_context(channels,
                                     rpc_mode='REQUEST_REPLY',
                                     thread_pool_executor=None,
                                     dispose_batch_size=20,
-                                    max_fanout: int = 100):
+                                    max_fanout: int = 100,
+                                    deduplicate_values: bool = False,
+                                    compilation_cache_dir=None):
   """Creates context to execute computations with workers on `channels`."""
   factory = executor_stacks.remote_executor_factory(
       channels=channels,
@@ -98,22 +129,29 @@ def create_remote_execution_context(channels,
       thread_pool_executor=thread_pool_executor,
       dispose_batch_size=dispose_batch_size,
       max_fanout=max_fanout,
+      deduplicate_values=deduplicate_values,
   )
 
   return execution_context.ExecutionContext(
-      executor_fn=factory, compiler_fn=compiler.transform_to_native_form)
+      executor_fn=factory,
+      compiler_fn=compiler.transform_to_native_form,
+      compilation_cache_dir=compilation_cache_dir)
 
 
 def set_remote_execution_context(channels,
                                  rpc_mode='REQUEST_REPLY',
                                  thread_pool_executor=None,
                                  dispose_batch_size=20,
-                                 max_fanout: int = 100):
+                                 max_fanout: int = 100,
+                                 deduplicate_values: bool = False,
+                                 compilation_cache_dir=None):
   """Installs context to execute computations with workers on `channels`."""
   context = create_remote_execution_context(
       channels=channels,
       rpc_mode=rpc_mode,
       thread_pool_executor=thread_pool_executor,
       dispose_batch_size=dispose_batch_size,
-      max_fanout=max_fanout)
+      max_fanout=max_fanout,
+      deduplicate_values=deduplicate_values,
+      compilation_cache_dir=compilation_cache_dir)
   context_stack_impl.context_stack.set_default_context(context)
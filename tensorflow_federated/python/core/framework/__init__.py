@@ -21,11 +21,15 @@ from tensorflow_federated.python.core.impl.context_stack.get_context_stack impor
 from tensorflow_federated.python.core.impl.context_stack.set_default_context import set_default_context
 from tensorflow_federated.python.core.impl.executors.caching_executor import CachingExecutor
 from tensorflow_federated.python.core.impl.executors.eager_tf_executor import EagerTFExecutor
+from tensorflow_federated.python.core.impl.executors.eager_tf_executor import FunctionCache
 from tensorflow_federated.python.core.impl.executors.execution_context import ExecutionContext
+from tensorflow_federated.python.core.impl.executors.execution_context import InvocationProfile
 from tensorflow_federated.python.core.impl.executors.executor_base import Executor
 from tensorflow_federated.python.core.impl.executors.executor_factory import ExecutorFactory
+from tensorflow_federated.python.core.impl.executors.executor_service import AsyncExecutorService
 from tensorflow_federated.python.core.impl.executors.executor_service import ExecutorService
 from tensorflow_federated.python.core.impl.executors.executor_stacks import local_executor_factory
+from tensorflow_federated.python.core.impl.executors.executor_stacks import local_multiprocess_executor_factory
 from tensorflow_federated.python.core.impl.executors.executor_stacks import remote_executor_factory
 from tensorflow_federated.python.core.impl.executors.executor_stacks import ResourceManagingExecutorFactory
 from tensorflow_federated.python.core.impl.executors.executor_stacks import SizeInfo
@@ -34,6 +38,7 @@ from tensorflow_federated.python.core.impl.executors.executor_stacks import Sizi
 from tensorflow_federated.python.core.impl.executors.executor_stacks import thread_debugging_executor_factory
 from tensorflow_federated.python.core.impl.executors.executor_value_base import ExecutorValue
 from tensorflow_federated.python.core.impl.executors.federated_composing_strategy import FederatedComposingStrategy
+from tensorflow_federated.python.core.impl.executors.federated_composing_strategy import SpeculativeExecutionPolicy
 from tensorflow_federated.python.core.impl.executors.federated_resolving_strategy import FederatedResolvingStrategy
 from tensorflow_federated.python.core.impl.executors.federating_executor import FederatingExecutor
 from tensorflow_federated.python.core.impl.executors.federating_executor import FederatingStrategy
@@ -15,11 +15,14 @@
 
 import abc
 import enum
-from typing import Any, Iterable, List, Optional, Tuple, Type
+import hashlib
+from typing import Any, FrozenSet, Iterable, List, Optional, Tuple, Type
+import weakref
 import zlib
 
 from tensorflow_federated.proto.v0 import computation_pb2 as pb
 from tensorflow_federated.python.common_libs import py_typecheck
+from tensorflow_federated.python.common_libs import serialization_utils
 from tensorflow_federated.python.common_libs import structure
 from tensorflow_federated.python.core.api import computation_types
 from tensorflow_federated.python.core.api import typed_object
@@ -112,6 +115,8 @@ class ComputationBuildingBlock(typed_object.TypedObject, metaclass=abc.ABCMeta):
     self._type_signature = type_signature
     self._cached_hash = None
     self._cached_proto = None
+    self._cached_digest = None
+    self._cached_free_names = None
 
   @property
   def type_signature(self) -> computation_types.Type:
@@ -129,6 +134,19 @@ class ComputationBuildingBlock(typed_object.TypedObject, metaclass=abc.ABCMeta):
     """Returns the structural string representation of this building block."""
     return _structural_representation(self)
 
+  def structural_digest(self) -> bytes:
+    """Returns a digest of the structure of this building block.
+
+    Two building blocks have the same digest exactly when they are equal up to
+    the renaming of the references they bind (barring SHA-256 collisions), so
+    the digest can be used as a dictionary key for alpha-equivalence classes.
+    The digest is cached on every subtree whose free references are not bound
+    within this building block, which makes repeated queries cheap.
+    """
+    if self._cached_digest is None:
+      _compute_structural_digest(self)
+    return self._cached_digest
+
   def check_reference(self):
     """Check that this is a 'Reference'."""
     if not self.is_reference():
@@ -1076,6 +1094,209 @@ class Placement(ComputationBuildingBlock):
     return 'Placement(\'{}\')'.format(self.uri)
 
 
+# A cache of the digests of types, keyed by the interned types themselves.
+_type_digest_cache = weakref.WeakKeyDictionary({})
+
+
+def _digest_of(*parts: bytes) -> bytes:
+  """Returns the SHA-256 digest of the length-prefixed `parts`."""
+  hasher = hashlib.sha256()
+  for part in parts:
+    hasher.update(len(part).to_bytes(8, 'big'))
+    hasher.update(part)
+  return hasher.digest()
+
+
+def _type_digest(type_spec: computation_types.Type) -> bytes:
+  """Returns the digest of `type_spec`, including any Python containers."""
+  digest = _type_digest_cache.get(type_spec)
+  if digest is None:
+    # The `repr` of a type names its Python containers by `__name__` only, so
+    # the qualified names of the containers are digested as well, in preorder.
+    container_names = []
+    types_to_visit = [type_spec]
+    while types_to_visit:
+      current = types_to_visit.pop()
+      if current.is_struct_with_python():
+        container = current.python_container
+        container_names.append('{}.{}'.format(container.__module__,
+                                              container.__qualname__))
+      types_to_visit.extend(reversed(list(current.children())))
+    digest = _digest_of(
+        repr(type_spec).encode(), *[name.encode() for name in container_names])
+    _type_digest_cache[type_spec] = digest
+  return digest
+
+
+def _compiled_computation_digest(comp: 'CompiledComputation') -> bytes:
+  """Returns the digest of the logic embedded in `comp`, ignoring its name."""
+  proto = comp.proto
+  computation_oneof = proto.WhichOneof('computation')
+  if computation_oneof != 'tensorflow':
+    return _digest_of(
+        computation_oneof.encode(),
+        getattr(proto, computation_oneof).SerializeToString(deterministic=True))
+  tensorflow = proto.tensorflow
+  graph_def = serialization_utils.unpack_graph_def(tensorflow.graph_def)
+  # TODO(b/174605105): We prefer to mitigate nans comparing unequal for now,
+  # given the severity of TFF's failure to handle this violation of its
+  # assumption that trees_equal is an equivalence relation on its ASTs. But this
+  # is not a long-term solution. To replace with more legitimate proto
+  # comparison which treats nans as equal.
+  return _digest_of(
+      computation_oneof.encode(),
+      tensorflow.initialize_op.encode(),
+      tensorflow.parameter.SerializeToString(deterministic=True),
+      tensorflow.result.SerializeToString(deterministic=True),
+      graph_def.SerializeToString(deterministic=True))
+
+
+def _compute_structural_digest(comp: ComputationBuildingBlock):
+  """Computes and caches the structural digest of `comp`.
+
+  References bound within `comp` are encoded by the distance to their binding
+  (their de Bruijn index), and free references by their name. The digest of a
+  subtree is therefore independent of the names it binds, and it can be reused
+  whenever none of the subtree's free references are captured by a binding
+  above it in `comp`. The traversal uses an explicit stack, so arbitrarily deep
+  computations are supported.
+
+  Args:
+    comp: The `ComputationBuildingBlock` whose digest to compute.
+
+  Raises:
+    NotImplementedError: If `comp` contains an unexpected subclass of
+      `ComputationBuildingBlock`.
+  """
+  # The names bound at each position of the binding stack, and the positions at
+  # which each name is currently bound, innermost last.
+  bindings = []
+  positions_by_name = {}
+
+  def _bind(name):
+    positions_by_name.setdefault(name, []).append(len(bindings))
+    bindings.append(name)
+
+  def _unbind_to(length):
+    while len(bindings) > length:
+      name = bindings.pop()
+      positions = positions_by_name[name]
+      positions.pop()
+      if not positions:
+        del positions_by_name[name]
+
+  def _is_captured(free_names: FrozenSet[str]) -> bool:
+    return any(name in positions_by_name for name in free_names)
+
+  def _children(comp):
+    if comp.is_selection():
+      return [comp.source]
+    elif comp.is_struct():
+      return list(comp)
+    elif comp.is_call():
+      return [comp.function, comp.argument]
+    elif comp.is_lambda():
+      return [comp.result]
+    elif comp.is_block():
+      return [value for _, value in comp.locals] + [comp.result]
+    return []
+
+  def _digest(comp, child_digests):
+    type_digest = _type_digest(comp.type_signature)
+    if comp.is_reference():
+      positions = positions_by_name.get(comp.name)
+      if positions:
+        index = len(bindings) - 1 - positions[-1]
+        return _digest_of(b'bound', type_digest, str(index).encode())
+      return _digest_of(b'free', type_digest, comp.name.encode())
+    elif comp.is_selection():
+      return _digest_of(b'selection', type_digest, repr(comp.name).encode(),
+                        repr(comp.index).encode(), *child_digests)
+    elif comp.is_struct():
+      # The element names are checked as part of the `type_signature`.
+      return _digest_of(b'struct', type_digest, *child_digests)
+    elif comp.is_call():
+      return _digest_of(b'call', type_digest, *child_digests)
+    elif comp.is_lambda():
+      # The parameter type is checked as part of the `type_signature`.
+      return _digest_of(b'lambda', type_digest, *child_digests)
+    elif comp.is_block():
+      return _digest_of(b'block', type_digest, *child_digests)
+    elif comp.is_compiled_computation():
+      return _digest_of(b'compiled', type_digest,
+                        _compiled_computation_digest(comp))
+    elif comp.is_data():
+      return _digest_of(b'data', type_digest, comp.uri.encode())
+    elif comp.is_intrinsic():
+      return _digest_of(b'intrinsic', type_digest, comp.uri.encode())
+    elif comp.is_placement():
+      return _digest_of(b'placement', type_digest, comp.uri.encode())
+    raise NotImplementedError('Unexpected type found: {}.'.format(type(comp)))
+
+  def _free_names(comp, child_free_names):
+    if comp.is_reference():
+      return frozenset([comp.name])
+    elif comp.is_lambda():
+      return child_free_names[0] - frozenset([comp.parameter_name])
+    elif comp.is_block():
+      free_names = set()
+      bound_names = set()
+      for (name, _), value_free_names in zip(comp.locals, child_free_names):
+        free_names.update(value_free_names - bound_names)
+        bound_names.add(name)
+      free_names.update(child_free_names[-1] - bound_names)
+      return frozenset(free_names)
+    return frozenset().union(*child_free_names)
+
+  def _enter(comp):
+    frame = [comp, _children(comp), [], [], len(bindings)]
+    if comp.is_lambda() and comp.parameter_type is not None:
+      _bind(comp.parameter_name)
+    return frame
+
+  def _append_child(frame, digest, free_names):
+    parent, _, child_digests, child_free_names, _ = frame
+    child_digests.append(digest)
+    child_free_names.append(free_names)
+    # Block locals are bound sequentially; each one is visible to the locals
+    # after it and to the result.
+    index = len(child_digests) - 1
+    if parent.is_block() and index < len(parent.locals):
+      _bind(parent.locals[index][0])
+
+  # Each frame is `[comp, children, child_digests, child_free_names,
+  # bindings_length]`, where `bindings_length` is the length of `bindings` on
+  # entering `comp`.
+  stack = [_enter(comp)]
+  while stack:
+    frame = stack[-1]
+    current, children, child_digests, child_free_names, bindings_length = frame
+    if len(child_digests) < len(children):
+      child = children[len(child_digests)]
+      if child is None:
+        _append_child(frame, b'', frozenset())
+      elif (child._cached_digest is not None and  # pylint: disable=protected-access
+            not _is_captured(child._cached_free_names)):  # pylint: disable=protected-access
+        _append_child(
+            frame,
+            child._cached_digest,  # pylint: disable=protected-access
+            child._cached_free_names)  # pylint: disable=protected-access
+      else:
+        stack.append(_enter(child))
+      continue
+    stack.pop()
+    _unbind_to(bindings_length)
+    digest = _digest(current, child_digests)
+    free_names = _free_names(current, child_free_names)
+    # The digest is independent of the bindings above `current` unless one of
+    # its free references is bound there.
+    if not _is_captured(free_names):
+      current._cached_digest = digest  # pylint: disable=protected-access
+      current._cached_free_names = free_names  # pylint: disable=protected-access
+    if stack:
+      _append_child(stack[-1], digest, free_names)
+
+
 def _string_representation(
     comp: ComputationBuildingBlock,
     formatted: bool,
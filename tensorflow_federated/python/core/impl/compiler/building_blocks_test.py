@@ -343,6 +343,110 @@ class ComputationBuildingBlocksTest(absltest.TestCase):
     target.type_signature.check_assignable_from(deserialized.type_signature)
 
 
+class StructuralDigestTest(absltest.TestCase):
+
+  def test_returns_same_digest_for_blocks_with_different_local_names(self):
+    data = building_blocks.Data('data', tf.int32)
+    comp_1 = building_blocks.Block(
+        [('a', data)], building_blocks.Reference('a', tf.int32))
+    comp_2 = building_blocks.Block(
+        [('b', data)], building_blocks.Reference('b', tf.int32))
+    self.assertEqual(comp_1.structural_digest(), comp_2.structural_digest())
+
+  def test_returns_same_digest_for_lambdas_with_different_parameter_names(
+      self):
+    comp_1 = building_blocks.Lambda('x', tf.int32,
+                                    building_blocks.Reference('x', tf.int32))
+    comp_2 = building_blocks.Lambda('y', tf.int32,
+                                    building_blocks.Reference('y', tf.int32))
+    self.assertEqual(comp_1.structural_digest(), comp_2.structural_digest())
+
+  def test_returns_different_digests_for_different_unbound_references(self):
+    comp_1 = building_blocks.Reference('x', tf.int32)
+    comp_2 = building_blocks.Reference('y', tf.int32)
+    self.assertNotEqual(comp_1.structural_digest(), comp_2.structural_digest())
+
+  def test_returns_different_digests_for_distinct_containers_of_same_name(
+      self):
+
+    def _other_container():
+
+      class Container(dict):
+        pass
+
+      return Container
+
+    class Container(dict):
+      pass
+
+    type_1 = computation_types.StructWithPythonType([('a', tf.int32)],
+                                                    Container)
+    type_2 = computation_types.StructWithPythonType([('a', tf.int32)],
+                                                    _other_container())
+    comp_1 = building_blocks.Reference('x', type_1)
+    comp_2 = building_blocks.Reference('x', type_2)
+    self.assertNotEqual(comp_1.structural_digest(), comp_2.structural_digest())
+
+  def test_returns_different_digests_for_bound_and_unbound_references(self):
+    # (x -> x) and (y -> x).
+    comp_1 = building_blocks.Lambda('x', tf.int32,
+                                    building_blocks.Reference('x', tf.int32))
+    comp_2 = building_blocks.Lambda('y', tf.int32,
+                                    building_blocks.Reference('x', tf.int32))
+    self.assertNotEqual(comp_1.structural_digest(), comp_2.structural_digest())
+
+  def test_returns_different_digests_for_references_to_different_locals(self):
+    data = building_blocks.Data('data', tf.int32)
+    comp_1 = building_blocks.Block(
+        [('a', data), ('b', data)], building_blocks.Reference('a', tf.int32))
+    comp_2 = building_blocks.Block(
+        [('a', data), ('b', data)], building_blocks.Reference('b', tf.int32))
+    self.assertNotEqual(comp_1.structural_digest(), comp_2.structural_digest())
+
+  def test_returns_different_digests_for_different_types(self):
+    comp_1 = building_blocks.Data('data', tf.int32)
+    comp_2 = building_blocks.Data('data', tf.float32)
+    self.assertNotEqual(comp_1.structural_digest(), comp_2.structural_digest())
+
+  def test_returns_different_digests_for_different_kinds(self):
+    comp_1 = building_blocks.Data('x', tf.int32)
+    comp_2 = building_blocks.Reference('x', tf.int32)
+    self.assertNotEqual(comp_1.structural_digest(), comp_2.structural_digest())
+
+  def test_returns_different_digests_for_called_and_uncalled_lambdas(self):
+    fn = building_blocks.Lambda(None, None,
+                                building_blocks.Data('data', tf.int32))
+    comp_1 = building_blocks.Call(fn)
+    comp_2 = building_blocks.Call(
+        building_blocks.Lambda('x', tf.int32,
+                               building_blocks.Data('data', tf.int32)),
+        building_blocks.Data('data', tf.int32))
+    self.assertNotEqual(comp_1.structural_digest(), comp_2.structural_digest())
+
+  def test_caches_digest_of_subtrees_without_captured_references(self):
+    data = building_blocks.Data('data', tf.int32)
+    ref_to_x = building_blocks.Reference('x', tf.int32)
+    struct = building_blocks.Struct([data, ref_to_x])
+    comp = building_blocks.Lambda('x', tf.int32, struct)
+    comp.structural_digest()
+    # pylint: disable=protected-access
+    self.assertIsNotNone(comp._cached_digest)
+    self.assertIsNotNone(data._cached_digest)
+    self.assertIsNone(ref_to_x._cached_digest)
+    self.assertIsNone(struct._cached_digest)
+    # pylint: enable=protected-access
+
+  def test_returns_digest_of_subtree_independent_of_enclosing_bindings(self):
+    ref_to_x = building_blocks.Reference('x', tf.int32)
+    struct = building_blocks.Struct([ref_to_x])
+    comp = building_blocks.Lambda('x', tf.int32, struct)
+    comp.structural_digest()
+    self.assertEqual(
+        struct.structural_digest(),
+        building_blocks.Struct([building_blocks.Reference('x', tf.int32)
+                               ]).structural_digest())
+
+
 class RepresentationTest(absltest.TestCase):
 
   def test_returns_string_for_block(self):
@@ -13,11 +13,26 @@
 # limitations under the License.
 """A pipeline that reduces computations into an executable form."""
 import functools
+import hashlib
+import os
+import tempfile
 
-from typing import Callable, Any
+from typing import Callable, Any, Optional
 
+from absl import logging
+
+from tensorflow_federated import version
+from tensorflow_federated.proto.v0 import computation_pb2 as pb
 from tensorflow_federated.python.common_libs import py_typecheck
 from tensorflow_federated.python.core.api import computation_base
+from tensorflow_federated.python.core.impl import computation_impl
+from tensorflow_federated.python.core.impl.context_stack import context_stack_impl
+
+# The default bound on the total size of the compiled computations stored in a
+# persistent compilation cache.
+_DEFAULT_MAX_CACHE_SIZE_BYTES = 1024**3  # 1 GB
+
+_CACHE_FILE_SUFFIX = '.pb'
 
 
 class CompilerPipeline(object):
@@ -34,16 +49,132 @@ class CompilerPipeline(object):
   backend takes the form of an instance of `tff.framework.Context`, which would
   be initialized with a `CompilerPipeline` whose `compilation_fn` accepts
   `tff.Computations` and returns CanonicalForms.
+
+  Compiled artifacts are always cached in memory. If a `cache_dir` is given,
+  computations compiled to computations are additionally stored on disk, keyed
+  by a hash of the serialized input computation, the name of the
+  `compilation_fn` and the version of TFF. This lets new processes (e.g.
+  restarts, or the tasks of an array job) sharing the directory skip
+  compilation. Once the directory grows beyond `max_cache_size_bytes`, the
+  least recently used entries are removed.
   """
 
-  def __init__(self, compilation_fn: Callable[[computation_base.Computation],
-                                              Any]):
+  def __init__(self,
+               compilation_fn: Callable[[computation_base.Computation], Any],
+               cache_dir: Optional[str] = None,
+               max_cache_size_bytes: int = _DEFAULT_MAX_CACHE_SIZE_BYTES):
+    """Constructs a `CompilerPipeline`.
+
+    Args:
+      compilation_fn: A Python function that will be used to compile a
+        computation.
+      cache_dir: An optional path to a local directory in which to persist
+        compiled computations across processes. Created if it does not exist.
+      max_cache_size_bytes: The maximum total size of the files in `cache_dir`.
+
+    Raises:
+      ValueError: If `max_cache_size_bytes` is not positive.
+    """
     py_typecheck.check_callable(compilation_fn)
     self._compilation_fn = compilation_fn
+    if cache_dir is not None:
+      py_typecheck.check_type(cache_dir, str)
+      py_typecheck.check_type(max_cache_size_bytes, int)
+      if max_cache_size_bytes < 1:
+        raise ValueError('The cache size must be positive, found {}.'.format(
+            max_cache_size_bytes))
+      os.makedirs(cache_dir, exist_ok=True)
+    self._cache_dir = cache_dir
+    self._max_cache_size_bytes = max_cache_size_bytes
 
   @functools.lru_cache()
   def compile(self, computation_to_compile: computation_base.Computation):
     """Generates executable for `computation_to_compile`."""
     py_typecheck.check_type(computation_to_compile,
                             computation_base.Computation)
-    return self._compilation_fn(computation_to_compile)
+    if (self._cache_dir is None or not isinstance(
+        computation_to_compile, computation_impl.ComputationImpl)):
+      return self._compilation_fn(computation_to_compile)
+
+    cache_path = self._get_cache_path(computation_to_compile)
+    compiled = self._load_from_cache(cache_path)
+    if compiled is None:
+      compiled = self._compilation_fn(computation_to_compile)
+      if isinstance(compiled, computation_impl.ComputationImpl):
+        self._store_in_cache(cache_path, compiled)
+    return compiled
+
+  def _get_cache_path(self, comp: computation_impl.ComputationImpl) -> str:
+    """Returns the path under which the compiled `comp` is cached."""
+    hasher = hashlib.sha256()
+    hasher.update(version.__version__.encode('utf-8'))
+    compilation_fn_name = '{}.{}'.format(
+        getattr(self._compilation_fn, '__module__', ''),
+        getattr(self._compilation_fn, '__qualname__',
+                type(self._compilation_fn).__qualname__))
+    hasher.update(compilation_fn_name.encode('utf-8'))
+    hasher.update(
+        computation_impl.ComputationImpl.get_proto(comp).SerializeToString(
+            deterministic=True))
+    return os.path.join(self._cache_dir,
+                        hasher.hexdigest() + _CACHE_FILE_SUFFIX)
+
+  def _load_from_cache(
+      self, cache_path: str) -> Optional[computation_impl.ComputationImpl]:
+    """Returns the computation cached at `cache_path`, or `None`."""
+    try:
+      with open(cache_path, 'rb') as f:
+        proto = pb.Computation.FromString(f.read())
+      # Mark the entry as recently used for the purposes of eviction.
+      os.utime(cache_path)
+    except FileNotFoundError:
+      return None
+    except Exception as e:  # pylint: disable=broad-except
+      logging.warning('Ignoring unreadable compilation cache entry %s: %s',
+                      cache_path, e)
+      return None
+    logging.debug('Loaded compiled computation from %s', cache_path)
+    return computation_impl.ComputationImpl(proto,
+                                            context_stack_impl.context_stack)
+
+  def _store_in_cache(self, cache_path: str,
+                      comp: computation_impl.ComputationImpl):
+    """Stores `comp` at `cache_path`, then evicts entries over the budget."""
+    serialized = computation_impl.ComputationImpl.get_proto(
+        comp).SerializeToString()
+    if len(serialized) > self._max_cache_size_bytes:
+      return
+    # Write to a temporary file and rename it, so that concurrent processes
+    # sharing the cache never observe partially written entries.
+    fd, temp_path = tempfile.mkstemp(dir=self._cache_dir, suffix='.tmp')
+    try:
+      with os.fdopen(fd, 'wb') as f:
+        f.write(serialized)
+      os.replace(temp_path, cache_path)
+    except OSError as e:
+      logging.warning('Failed to write compilation cache entry %s: %s',
+                      cache_path, e)
+      if os.path.exists(temp_path):
+        os.remove(temp_path)
+      return
+    self._evict_from_cache()
+
+  def _evict_from_cache(self):
+    """Removes least recently used entries until the cache fits its budget."""
+    entries = []
+    for entry in os.scandir(self._cache_dir):
+      if entry.is_file() and entry.name.endswith(_CACHE_FILE_SUFFIX):
+        try:
+          stat = entry.stat()
+        except FileNotFoundError:
+          continue  # Removed concurrently by another process.
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total_size_bytes = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+      if total_size_bytes <= self._max_cache_size_bytes:
+        break
+      try:
+        os.remove(path)
+      except FileNotFoundError:
+        pass
+      total_size_bytes -= size
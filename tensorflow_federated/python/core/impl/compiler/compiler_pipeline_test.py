@@ -12,12 +12,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+
 from absl.testing import absltest
 import tensorflow as tf
 
 from tensorflow_federated.python.core.api import computation_types
 from tensorflow_federated.python.core.api import computations
 from tensorflow_federated.python.core.api import intrinsics
+from tensorflow_federated.python.core.impl import computation_impl
 from tensorflow_federated.python.core.impl.compiler import compiler_pipeline
 from tensorflow_federated.python.core.impl.types import placement_literals
 
@@ -49,5 +52,91 @@ class CompilerPipelineTest(absltest.TestCase):
     # TODO(b/113123410): Expand the test with more structural invariants.
 
 
+def _create_computation(value):
+
+  @computations.tf_computation
+  def comp():
+    return tf.constant(value)
+
+  return comp
+
+
+class _CountingCompiler(object):
+  """A compilation function counting its invocations."""
+
+  def __init__(self):
+    self.num_calls = 0
+
+  def __call__(self, comp):
+    self.num_calls += 1
+    return comp
+
+
+class CompilerPipelinePersistentCacheTest(absltest.TestCase):
+
+  def test_raises_with_nonpositive_cache_size(self):
+    with self.assertRaises(ValueError):
+      compiler_pipeline.CompilerPipeline(
+          lambda x: x,
+          cache_dir=self.create_tempdir().full_path,
+          max_cache_size_bytes=0)
+
+  def test_compiled_computation_is_reused_across_pipelines(self):
+    cache_dir = self.create_tempdir().full_path
+    comp = _create_computation(1)
+    first_compiler = _CountingCompiler()
+    first_pipeline = compiler_pipeline.CompilerPipeline(
+        first_compiler, cache_dir=cache_dir)
+    first_pipeline.compile(comp)
+    self.assertEqual(first_compiler.num_calls, 1)
+    self.assertLen(os.listdir(cache_dir), 1)
+
+    second_compiler = _CountingCompiler()
+    second_pipeline = compiler_pipeline.CompilerPipeline(
+        second_compiler, cache_dir=cache_dir)
+    compiled = second_pipeline.compile(comp)
+    self.assertEqual(second_compiler.num_calls, 0)
+    self.assertEqual(
+        computation_impl.ComputationImpl.get_proto(compiled),
+        computation_impl.ComputationImpl.get_proto(comp))
+
+  def test_different_computations_are_cached_separately(self):
+    cache_dir = self.create_tempdir().full_path
+    compiler = _CountingCompiler()
+    pipeline = compiler_pipeline.CompilerPipeline(compiler, cache_dir=cache_dir)
+    pipeline.compile(_create_computation(1))
+    pipeline.compile(_create_computation(2))
+    self.assertEqual(compiler.num_calls, 2)
+    self.assertLen(os.listdir(cache_dir), 2)
+
+  def test_least_recently_used_entries_are_evicted(self):
+    cache_dir = self.create_tempdir().full_path
+    first_comp = _create_computation(1)
+    pipeline = compiler_pipeline.CompilerPipeline(
+        lambda x: x, cache_dir=cache_dir)
+    pipeline.compile(first_comp)
+    [first_entry] = os.listdir(cache_dir)
+    first_entry_path = os.path.join(cache_dir, first_entry)
+    entry_size_bytes = os.path.getsize(first_entry_path)
+    # Mark the first entry as used long ago.
+    os.utime(first_entry_path, (0, 0))
+
+    small_pipeline = compiler_pipeline.CompilerPipeline(
+        lambda x: x,
+        cache_dir=cache_dir,
+        max_cache_size_bytes=entry_size_bytes + entry_size_bytes // 2)
+    small_pipeline.compile(_create_computation(2))
+    remaining_entries = os.listdir(cache_dir)
+    self.assertLen(remaining_entries, 1)
+    self.assertNotEqual(remaining_entries[0], first_entry)
+
+  def test_noncomputation_results_are_not_persisted(self):
+    cache_dir = self.create_tempdir().full_path
+    pipeline = compiler_pipeline.CompilerPipeline(
+        lambda x: 'compiled', cache_dir=cache_dir)
+    self.assertEqual(pipeline.compile(_create_computation(1)), 'compiled')
+    self.assertEmpty(os.listdir(cache_dir))
+
+
 if __name__ == '__main__':
   absltest.main()
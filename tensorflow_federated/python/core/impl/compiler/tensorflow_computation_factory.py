@@ -277,6 +277,52 @@ def create_binary_operator_with_upcast(
   return _tensorflow_comp(tensorflow, type_signature)
 
 
+def create_stacked_reduction(
+    reduction: Callable[..., Any],
+    operand_type: computation_types.Type) -> ProtoAndType:
+  """Returns a tensorflow computation reducing a stack of operands.
+
+  The returned computation has the type signature `(S -> T)`, where `T` is
+  `operand_type` and `S` is `T` with an additional leading dimension of unknown
+  size added to each of its tensor types. The `reduction` is applied pointwise
+  to the tensor-level constituents of the argument, over the leading dimension.
+  For example, given `tf.math.reduce_sum`, the returned computation sums a
+  stack of values of type `T` with a single operation per tensor.
+
+  Args:
+    reduction: A callable taking a tensor and an `axis` keyword argument
+      representing the reduction to encode. For example: `tf.math.reduce_sum`
+        and `tf.math.reduce_mean`.
+    operand_type: A `computation_types.Type` of the operands to reduce; must
+      contain only named tuples and tensor types.
+
+  Raises:
+    TypeError: If the constraints of `operand_type` are violated or `reduction`
+      is not callable.
+  """
+  if not type_analysis.is_generic_op_compatible_type(operand_type):
+    raise TypeError(
+        'The type {} contains a type other than `computation_types.TensorType` '
+        'and `computation_types.StructType`; this is disallowed in the '
+        'generic operators.'.format(operand_type))
+  py_typecheck.check_callable(reduction)
+
+  def _add_leading_dimension(type_spec):
+    if type_spec.is_tensor():
+      shape = tf.TensorShape([None]).concatenate(type_spec.shape)
+      return computation_types.TensorType(type_spec.dtype, shape), True
+    return type_spec, False
+
+  parameter_type, _ = type_transformations.transform_type_postorder(
+      operand_type, _add_leading_dimension)
+  reduce_fn = functools.partial(reduction, axis=0)
+  if operand_type.is_tensor():
+    fn = reduce_fn
+  else:
+    fn = functools.partial(structure.map_structure, reduce_fn)
+  return create_computation_for_py_fn(fn, parameter_type)
+
+
 def create_empty_tuple() -> ProtoAndType:
   """Returns a tensorflow computation returning an empty tuple.
 
@@ -290,6 +290,62 @@ class CreateBinaryOperatorWithUpcastTest(parameterized.TestCase):
           type_signature, operator)
 
 
+class CreateStackedReductionTest(parameterized.TestCase):
+
+  # pyformat: disable
+  @parameterized.named_parameters(
+      ('sum_int', tf.math.reduce_sum,
+       computation_types.TensorType(tf.int32),
+       computation_types.TensorType(tf.int32, [None]),
+       [1, 2, 3], 6),
+      ('sum_float_vector', tf.math.reduce_sum,
+       computation_types.TensorType(tf.float32, [2]),
+       computation_types.TensorType(tf.float32, [None, 2]),
+       [[1.0, 2.0], [3.0, 4.25]], [4.0, 6.25]),
+      ('sum_named_tuple', tf.math.reduce_sum,
+       computation_types.StructType([('a', tf.int32), ('b', tf.float32)]),
+       computation_types.StructType([
+           ('a', computation_types.TensorType(tf.int32, [None])),
+           ('b', computation_types.TensorType(tf.float32, [None]))]),
+       [[1, 2], [1.0, 2.25]],
+       structure.Struct([('a', 3), ('b', 3.25)])),
+      ('mean_float', tf.math.reduce_mean,
+       computation_types.TensorType(tf.float32),
+       computation_types.TensorType(tf.float32, [None]),
+       [1.0, 2.0, 6.0], 3.0),
+  )
+  # pyformat: enable
+  def test_returns_computation(self, reduction, type_signature,
+                               expected_parameter_type, operand,
+                               expected_result):
+    proto, _ = tensorflow_computation_factory.create_stacked_reduction(
+        reduction, type_signature)
+
+    self.assertIsInstance(proto, pb.Computation)
+    actual_type = type_serialization.deserialize_type(proto.type)
+    self.assertIsInstance(actual_type, computation_types.FunctionType)
+    self.assertEqual(actual_type.parameter, expected_parameter_type)
+    actual_result = test_utils.run_tensorflow(proto, operand)
+    if isinstance(expected_result, list):
+      self.assertSequenceEqual(list(actual_result), expected_result)
+    else:
+      self.assertEqual(actual_result, expected_result)
+
+  @parameterized.named_parameters(
+      ('non_callable_reduction', 1, computation_types.TensorType(tf.int32)),
+      ('none_type', tf.math.reduce_sum, None),
+      ('federated_type', tf.math.reduce_sum,
+       computation_types.at_server(tf.int32)),
+      ('sequence_type', tf.math.reduce_sum,
+       computation_types.SequenceType(tf.int32)),
+  )
+  def test_raises_type_error(self, reduction, type_signature):
+
+    with self.assertRaises(TypeError):
+      tensorflow_computation_factory.create_stacked_reduction(
+          reduction, type_signature)
+
+
 class CreateEmptyTupleTest(test_case.TestCase):
 
   def test_returns_computation(self):
@@ -17,16 +17,105 @@ import abc
 import collections
 import itertools
 import operator
+import time
 import typing
-from typing import Callable, Dict, Set, Tuple
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import attr
 
 from tensorflow_federated.python.common_libs import py_typecheck
 from tensorflow_federated.python.common_libs import structure
 from tensorflow_federated.python.core.impl.compiler import building_blocks
 
 
+def _children(comp):
+  """Returns the building blocks `comp` is parameterized by, in order."""
+  if (comp.is_compiled_computation() or comp.is_data() or comp.is_intrinsic() or
+      comp.is_placement() or comp.is_reference()):
+    return []
+  elif comp.is_selection():
+    return [comp.source]
+  elif comp.is_struct():
+    return [value for _, value in structure.iter_elements(comp)]
+  elif comp.is_call():
+    if comp.argument is None:
+      return [comp.function]
+    return [comp.function, comp.argument]
+  elif comp.is_lambda():
+    return [comp.result]
+  elif comp.is_block():
+    return [value for _, value in comp.locals] + [comp.result]
+  else:
+    raise NotImplementedError(
+        'Unrecognized computation building block: {}'.format(str(comp)))
+
+
+def _rebuild(comp, children):
+  """Returns a copy of `comp` parameterized by `children` instead."""
+  if comp.is_selection():
+    return building_blocks.Selection(children[0], comp.name, comp.index)
+  elif comp.is_struct():
+    return building_blocks.Struct(
+        list(zip((key for key, _ in structure.iter_elements(comp)), children)))
+  elif comp.is_call():
+    return building_blocks.Call(children[0],
+                                children[1] if len(children) > 1 else None)
+  elif comp.is_lambda():
+    return building_blocks.Lambda(comp.parameter_name, comp.parameter_type,
+                                  children[0])
+  elif comp.is_block():
+    return building_blocks.Block(
+        list(zip((key for key, _ in comp.locals), children[:-1])),
+        children[-1])
+  else:
+    raise NotImplementedError(
+        'Unrecognized computation building block: {}'.format(str(comp)))
+
+
+# The traversals below are iterative rather than recursive, so that deeply
+# nested computations neither exceed the Python recursion limit nor pay for a
+# Python frame per building block. Each of them keeps an explicit stack of
+# frames `[comp, children, transformed_children, children_modified]`, one per
+# building block on the path from the root to the building block being
+# visited.
+
+
+def visit_postorder(
+    comp: building_blocks.ComputationBuildingBlock,
+    function: Callable[[building_blocks.ComputationBuildingBlock], None]):
+  """Calls `function` on each building block in `comp`, postorder.
+
+  Unlike `transform_postorder`, this does not construct any building blocks, so
+  it is the cheaper way to traverse `comp` when only analyzing it.
+
+  Args:
+    comp: A `building_blocks.ComputationBuildingBlock` to traverse.
+    function: A Python function accepting a building block, called on the
+      building blocks `comp` is parameterized by (left-to-right, in the order
+      they are listed in building block constructors) before the building block
+      itself.
+
+  Raises:
+    TypeError: If `comp` is not a `building_blocks.ComputationBuildingBlock`.
+    NotImplementedError: If `comp` contains a kind of computation building
+      block that is currently not recognized.
+  """
+  py_typecheck.check_type(comp, building_blocks.ComputationBuildingBlock)
+  # Each entry pairs a building block with its children left to visit, in
+  # reverse order.
+  stack = [(comp, _children(comp)[::-1])]
+  while stack:
+    comp, children = stack[-1]
+    if children:
+      child = children.pop()
+      stack.append((child, _children(child)[::-1]))
+    else:
+      stack.pop()
+      function(comp)
+
+
 def transform_postorder(comp, transform):
-  """Traverses `comp` recursively postorder and replaces its constituents.
+  """Traverses `comp` postorder and replaces its constituents.
 
   For each element of `comp` viewed as an expression tree, the transformation
   `transform` is applied first to building blocks it is parameterized by, then
@@ -64,58 +153,24 @@ def transform_postorder(comp, transform):
       that is currently not recognized.
   """
   py_typecheck.check_type(comp, building_blocks.ComputationBuildingBlock)
-  if (comp.is_compiled_computation() or comp.is_data() or comp.is_intrinsic() or
-      comp.is_placement() or comp.is_reference()):
-    return transform(comp)
-  elif comp.is_selection():
-    source, source_modified = transform_postorder(comp.source, transform)
-    if source_modified:
-      comp = building_blocks.Selection(source, comp.name, comp.index)
-    comp, comp_modified = transform(comp)
-    return comp, comp_modified or source_modified
-  elif comp.is_struct():
-    elements = []
-    elements_modified = False
-    for key, value in structure.iter_elements(comp):
-      value, value_modified = transform_postorder(value, transform)
-      elements.append((key, value))
-      elements_modified = elements_modified or value_modified
-    if elements_modified:
-      comp = building_blocks.Struct(elements)
-    comp, comp_modified = transform(comp)
-    return comp, comp_modified or elements_modified
-  elif comp.is_call():
-    fn, fn_modified = transform_postorder(comp.function, transform)
-    if comp.argument is not None:
-      arg, arg_modified = transform_postorder(comp.argument, transform)
-    else:
-      arg, arg_modified = (None, False)
-    if fn_modified or arg_modified:
-      comp = building_blocks.Call(fn, arg)
+  stack = [[comp, _children(comp), [], False]]
+  while True:
+    frame = stack[-1]
+    comp, children, transformed_children, children_modified = frame
+    if len(transformed_children) < len(children):
+      child = children[len(transformed_children)]
+      stack.append([child, _children(child), [], False])
+      continue
+    stack.pop()
+    if children_modified:
+      comp = _rebuild(comp, transformed_children)
     comp, comp_modified = transform(comp)
-    return comp, comp_modified or fn_modified or arg_modified
-  elif comp.is_lambda():
-    result, result_modified = transform_postorder(comp.result, transform)
-    if result_modified:
-      comp = building_blocks.Lambda(comp.parameter_name, comp.parameter_type,
-                                    result)
-    comp, comp_modified = transform(comp)
-    return comp, comp_modified or result_modified
-  elif comp.is_block():
-    variables = []
-    variables_modified = False
-    for key, value in comp.locals:
-      value, value_modified = transform_postorder(value, transform)
-      variables.append((key, value))
-      variables_modified = variables_modified or value_modified
-    result, result_modified = transform_postorder(comp.result, transform)
-    if variables_modified or result_modified:
-      comp = building_blocks.Block(variables, result)
-    comp, comp_modified = transform(comp)
-    return comp, comp_modified or variables_modified or result_modified
-  else:
-    raise NotImplementedError(
-        'Unrecognized computation building block: {}'.format(str(comp)))
+    comp_modified = comp_modified or children_modified
+    if not stack:
+      return comp, comp_modified
+    parent = stack[-1]
+    parent[2].append(comp)
+    parent[3] = parent[3] or comp_modified
 
 
 TransformReturnType = Tuple[building_blocks.ComputationBuildingBlock, bool]
@@ -130,11 +185,11 @@ def transform_preorder(
 
   Notice that this function will stop walking the tree when its transform
   function modifies a node; this is to prevent the caller from unexpectedly
-  kicking off an infinite recursion. For this purpose the transform function
+  kicking off an infinite traversal. For this purpose the transform function
   must identify when it has transformed the structure of a building block; if
   the structure of the building block is modified but `False` is returned as
   the second element of the tuple returned by `transform`, `transform_preorder`
-  may result in an infinite recursion.
+  may never terminate.
 
   Args:
     comp: Instance of `building_blocks.ComputationBuildingBlock` to be
@@ -156,66 +211,29 @@ def transform_preorder(
 
   py_typecheck.check_type(comp, building_blocks.ComputationBuildingBlock)
   py_typecheck.check_callable(transform)
-  inner_comp, modified = transform(comp)
-  if modified:
-    return inner_comp, modified
-  if (inner_comp.is_compiled_computation() or inner_comp.is_data() or
-      inner_comp.is_intrinsic() or inner_comp.is_placement() or
-      inner_comp.is_reference()):
-    return inner_comp, modified
-  elif inner_comp.is_lambda():
-    transformed_result, result_modified = transform_preorder(
-        inner_comp.result, transform)
-    if not (modified or result_modified):
-      return inner_comp, False
-    return building_blocks.Lambda(inner_comp.parameter_name,
-                                  inner_comp.parameter_type,
-                                  transformed_result), True
-  elif inner_comp.is_struct():
-    elements_modified = False
-    elements = []
-    for name, val in structure.iter_elements(inner_comp):
-      result, result_modified = transform_preorder(val, transform)
-      elements_modified = elements_modified or result_modified
-      elements.append((name, result))
-    if not (modified or elements_modified):
-      return inner_comp, False
-    return building_blocks.Struct(elements), True
-  elif inner_comp.is_selection():
-    transformed_source, source_modified = transform_preorder(
-        inner_comp.source, transform)
-    if not (modified or source_modified):
-      return inner_comp, False
-    return building_blocks.Selection(transformed_source, inner_comp.name,
-                                     inner_comp.index), True
-  elif inner_comp.is_call():
-    transformed_fn, fn_modified = transform_preorder(inner_comp.function,
-                                                     transform)
-    if inner_comp.argument is not None:
-      transformed_arg, arg_modified = transform_preorder(
-          inner_comp.argument, transform)
+  stack = []
+  to_visit = comp
+  while True:
+    if to_visit is not None:
+      comp, modified = transform(to_visit)
+      to_visit = None
+      if not modified:
+        stack.append([comp, _children(comp), [], False])
+        continue
     else:
-      transformed_arg = None
-      arg_modified = False
-    if not (modified or fn_modified or arg_modified):
-      return inner_comp, False
-    return building_blocks.Call(transformed_fn, transformed_arg), True
-  elif inner_comp.is_block():
-    transformed_variables = []
-    values_modified = False
-    for key, value in inner_comp.locals:
-      transformed_value, value_modified = transform_preorder(value, transform)
-      transformed_variables.append((key, transformed_value))
-      values_modified = values_modified or value_modified
-    transformed_result, result_modified = transform_preorder(
-        inner_comp.result, transform)
-    if not (modified or values_modified or result_modified):
-      return inner_comp, False
-    return building_blocks.Block(transformed_variables,
-                                 transformed_result), True
-  else:
-    raise NotImplementedError(
-        'Unrecognized computation building block: {}'.format(str(inner_comp)))
+      frame = stack[-1]
+      comp, children, transformed_children, modified = frame
+      if len(transformed_children) < len(children):
+        to_visit = children[len(transformed_children)]
+        continue
+      stack.pop()
+      if modified:
+        comp = _rebuild(comp, transformed_children)
+    if not stack:
+      return comp, modified
+    parent = stack[-1]
+    parent[2].append(comp)
+    parent[3] = parent[3] or modified
 
 
 def transform_postorder_with_symbol_bindings(comp, transform, symbol_tree):
@@ -276,39 +294,17 @@ def transform_postorder_with_symbol_bindings(comp, transform, symbol_tree):
                     'be callable.')
   identifier_seq = itertools.count(start=1)
 
-  def _transform_postorder_with_symbol_bindings_switch(comp, transform_fn,
-                                                       ctxt_tree,
-                                                       identifier_sequence):
-    """Recursive helper function delegated to after binding comp_id sequence."""
-    if (comp.is_compiled_computation() or comp.is_data() or
-        comp.is_intrinsic() or comp.is_placement() or comp.is_reference()):
-      return _traverse_leaf(comp, transform_fn, ctxt_tree, identifier_sequence)
-    elif comp.is_selection():
-      return _traverse_selection(comp, transform, ctxt_tree,
-                                 identifier_sequence)
-    elif comp.is_struct():
-      return _traverse_tuple(comp, transform, ctxt_tree, identifier_sequence)
-    elif comp.is_call():
-      return _traverse_call(comp, transform, ctxt_tree, identifier_sequence)
-    elif comp.is_lambda():
-      return _traverse_lambda(comp, transform, ctxt_tree, identifier_sequence)
+  def _enter(comp):
+    comp_id = next(identifier_seq)
+    if comp.is_lambda():
+      symbol_tree.drop_scope_down(comp_id)
+      symbol_tree.ingest_variable_binding(name=comp.parameter_name, value=None)
     elif comp.is_block():
-      return _traverse_block(comp, transform, ctxt_tree, identifier_sequence)
-    else:
-      raise NotImplementedError(
-          'Unrecognized computation building block: {}'.format(str(comp)))
-
-  def _traverse_leaf(comp, transform, context_tree, identifier_seq):
-    """Helper function holding traversal logic for leaf nodes."""
-    _ = next(identifier_seq)
-    return transform(comp, context_tree)
-
-  def _traverse_selection(comp, transform, context_tree, identifier_seq):
-    """Helper function holding traversal logic for selection nodes."""
-    _ = next(identifier_seq)
-    source, source_modified = _transform_postorder_with_symbol_bindings_switch(
-        comp.source, transform, context_tree, identifier_seq)
-    if source_modified:
+      symbol_tree.drop_scope_down(comp_id)
+    return [comp, _children(comp), [], False]
+
+  def _rebuild_with_symbol_bindings(comp, children):
+    if comp.is_selection():
       # Normalize selection to index based on the type signature of the
       # original source. The new source may not have names present.
       if comp.index is not None:
@@ -316,78 +312,35 @@ def transform_postorder_with_symbol_bindings(comp, transform, symbol_tree):
       else:
         index = structure.name_to_index_map(
             comp.source.type_signature)[comp.name]
-      comp = building_blocks.Selection(source, index=index)
-    comp, comp_modified = transform(comp, context_tree)
-    return comp, comp_modified or source_modified
-
-  def _traverse_tuple(comp, transform, context_tree, identifier_seq):
-    """Helper function holding traversal logic for tuple nodes."""
-    _ = next(identifier_seq)
-    elements = []
-    elements_modified = False
-    for key, value in structure.iter_elements(comp):
-      value, value_modified = _transform_postorder_with_symbol_bindings_switch(
-          value, transform, context_tree, identifier_seq)
-      elements.append((key, value))
-      elements_modified = elements_modified or value_modified
-    if elements_modified:
-      comp = building_blocks.Struct(elements)
-    comp, comp_modified = transform(comp, context_tree)
-    return comp, comp_modified or elements_modified
-
-  def _traverse_call(comp, transform, context_tree, identifier_seq):
-    """Helper function holding traversal logic for call nodes."""
-    _ = next(identifier_seq)
-    fn, fn_modified = _transform_postorder_with_symbol_bindings_switch(
-        comp.function, transform, context_tree, identifier_seq)
-    if comp.argument is not None:
-      arg, arg_modified = _transform_postorder_with_symbol_bindings_switch(
-          comp.argument, transform, context_tree, identifier_seq)
-    else:
-      arg, arg_modified = (None, False)
-    if fn_modified or arg_modified:
-      comp = building_blocks.Call(fn, arg)
-    comp, comp_modified = transform(comp, context_tree)
-    return comp, comp_modified or fn_modified or arg_modified
-
-  def _traverse_lambda(comp, transform, context_tree, identifier_seq):
-    """Helper function holding traversal logic for lambda nodes."""
-    comp_id = next(identifier_seq)
-    context_tree.drop_scope_down(comp_id)
-    context_tree.ingest_variable_binding(name=comp.parameter_name, value=None)
-    result, result_modified = _transform_postorder_with_symbol_bindings_switch(
-        comp.result, transform, context_tree, identifier_seq)
-    context_tree.walk_to_scope_beginning()
-    if result_modified:
-      comp = building_blocks.Lambda(comp.parameter_name, comp.parameter_type,
-                                    result)
-    comp, comp_modified = transform(comp, context_tree)
-    context_tree.pop_scope_up()
-    return comp, comp_modified or result_modified
-
-  def _traverse_block(comp, transform, context_tree, identifier_seq):
-    """Helper function holding traversal logic for block nodes."""
-    comp_id = next(identifier_seq)
-    context_tree.drop_scope_down(comp_id)
-    variables = []
-    variables_modified = False
-    for key, value in comp.locals:
-      value, value_modified = _transform_postorder_with_symbol_bindings_switch(
-          value, transform, context_tree, identifier_seq)
-      context_tree.ingest_variable_binding(name=key, value=value)
-      variables.append((key, value))
-      variables_modified = variables_modified or value_modified
-    result, result_modified = _transform_postorder_with_symbol_bindings_switch(
-        comp.result, transform, context_tree, identifier_seq)
-    context_tree.walk_to_scope_beginning()
-    if variables_modified or result_modified:
-      comp = building_blocks.Block(variables, result)
-    comp, comp_modified = transform(comp, context_tree)
-    context_tree.pop_scope_up()
-    return comp, comp_modified or variables_modified or result_modified
-
-  return _transform_postorder_with_symbol_bindings_switch(
-      comp, transform, symbol_tree, identifier_seq)
+      return building_blocks.Selection(children[0], index=index)
+    return _rebuild(comp, children)
+
+  stack = [_enter(comp)]
+  while True:
+    frame = stack[-1]
+    comp, children, transformed_children, children_modified = frame
+    if len(transformed_children) < len(children):
+      stack.append(_enter(children[len(transformed_children)]))
+      continue
+    stack.pop()
+    binds_variables = comp.is_lambda() or comp.is_block()
+    if binds_variables:
+      symbol_tree.walk_to_scope_beginning()
+    if children_modified:
+      comp = _rebuild_with_symbol_bindings(comp, transformed_children)
+    comp, comp_modified = transform(comp, symbol_tree)
+    if binds_variables:
+      symbol_tree.pop_scope_up()
+    comp_modified = comp_modified or children_modified
+    if not stack:
+      return comp, comp_modified
+    parent, _, parent_transformed_children, _ = stack[-1]
+    if (parent.is_block() and
+        len(parent_transformed_children) < len(parent.locals)):
+      name, _ = parent.locals[len(parent_transformed_children)]
+      symbol_tree.ingest_variable_binding(name=name, value=comp)
+    parent_transformed_children.append(comp)
+    stack[-1][3] = stack[-1][3] or comp_modified
 
 
 class SymbolTree(object):
@@ -1003,9 +956,8 @@ def list_comp_names(comp):
 
   def _string_rep(inner_comp):
     names.append(str(inner_comp))
-    return inner_comp
 
-  transform_postorder(comp, _string_rep)
+  visit_postorder(comp, _string_rep)
   return names
 
 
@@ -1111,9 +1063,8 @@ def get_unique_names(comp):
         names.add(comp.parameter_name)
     elif isinstance(comp, building_blocks.Reference):
       names.add(comp.name)
-    return comp, False
 
-  transform_postorder(comp, _update)
+  visit_postorder(comp, _update)
   return names
 
 
@@ -1147,13 +1098,12 @@ def has_unique_names(comp):
           names.add(name)
       elif comp.is_lambda():
         if comp.parameter_type is None:
-          return comp, False
+          return
         if comp.parameter_name in names:
           unique = False
         names.add(comp.parameter_name)
-    return comp, False
 
-  transform_postorder(comp, _transform)
+  visit_postorder(comp, _transform)
   return unique
 
 
@@ -1205,9 +1155,8 @@ def get_map_of_unbound_references(
       references[comp] = set(itertools.chain.from_iterable(elements))
     else:
       references[comp] = set()
-    return comp, False
 
-  transform_postorder(comp, _update)
+  visit_postorder(comp, _update)
   return references
 
 
@@ -1228,3 +1177,213 @@ class TransformSpec(object, metaclass=abc.ABCMeta):
   @abc.abstractmethod
   def transform(self, comp):
     pass
+
+
+_Pass = Union[Callable[[building_blocks.ComputationBuildingBlock],
+                       TransformReturnType], TransformSpec]
+
+
+@attr.s(frozen=True)
+class PassStats(object):
+  """Statistics about one run of a pass by a `PassManager`.
+
+  Attributes:
+    name: The name of the pass.
+    seconds: The time spent running the pass.
+    modified: Whether the pass modified the computation.
+    skipped: Whether the pass was skipped, because it had already been run on
+      the computation without modifying it.
+    num_nodes_before: The number of building blocks in the computation before
+      the pass, or `None` if the `PassManager` does not count them.
+    num_nodes_after: The number of building blocks in the computation after the
+      pass, or `None` if the `PassManager` does not count them.
+  """
+  name = attr.ib(type=str)
+  seconds = attr.ib(type=float)
+  modified = attr.ib(type=bool)
+  skipped = attr.ib(type=bool)
+  num_nodes_before = attr.ib(type=Optional[int])
+  num_nodes_after = attr.ib(type=Optional[int])
+
+
+def _count_nodes(comp):
+  num_nodes = 0
+
+  def _count(_):
+    nonlocal num_nodes
+    num_nodes += 1
+
+  visit_postorder(comp, _count)
+  return num_nodes
+
+
+class PassManager(object):
+  """Runs a sequence of passes over a computation, avoiding redundant work.
+
+  A pass is either a function accepting a building block and returning a
+  `(building block, bool)` tuple, like `transform_postorder`, or a
+  `TransformSpec` which is not a `global_transform`, which the manager applies
+  postorder to each building block of the computation.
+
+  Since building blocks are immutable, and passes return the very building
+  blocks they do not modify, the manager tracks the computations each pass has
+  left unmodified: a pass is skipped when run on a computation it has already
+  left unmodified. Passes must therefore be deterministic, and the result of a
+  `TransformSpec` on a building block must only depend on that building block.
+  For `TransformSpec` passes this is tracked per subtree, so that running the
+  pass again only visits the subtrees modified since, by this or any other
+  pass. The manager records `PassStats` for every pass it runs.
+  """
+
+  def __init__(self, passes: Sequence[_Pass] = (), count_nodes: bool = False):
+    """Creates a new pass manager.
+
+    Args:
+      passes: The passes run by `run`, in order.
+      count_nodes: Whether to count the building blocks of the computation
+        before and after each pass in its `PassStats`, which costs a traversal
+        of the computation per pass.
+
+    Raises:
+      TypeError: If a pass is neither callable nor a `TransformSpec`.
+      ValueError: If a pass is a `global_transform` `TransformSpec`.
+    """
+    for transform in passes:
+      self._check_pass(transform)
+    self._passes = list(passes)
+    self._count_nodes = count_nodes
+    # The last computation each pass left unmodified.
+    self._unmodified = {}
+    # For each `TransformSpec` pass, the subtrees it leaves unmodified, keyed by
+    # their `id`.
+    self._clean_subtrees = collections.defaultdict(dict)
+    self._stats = []
+
+  def _check_pass(self, transform):
+    if isinstance(transform, TransformSpec):
+      if transform.global_transform:
+        raise ValueError(
+            'Passes cannot be global transforms, found {}.'.format(
+                type(transform).__name__))
+    else:
+      py_typecheck.check_callable(transform)
+
+  @property
+  def stats(self) -> List[PassStats]:
+    """The `PassStats` of the passes run so far, in order."""
+    return list(self._stats)
+
+  def _transform_clean_subtrees(self, spec, comp):
+    """Applies `spec` postorder to the subtrees of `comp` it may modify."""
+    clean = self._clean_subtrees[spec]
+    if clean.get(id(comp)) is comp:
+      return comp, False
+    stack = [[comp, _children(comp), [], False]]
+    while True:
+      comp, children, transformed_children, children_modified = stack[-1]
+      if len(transformed_children) < len(children):
+        child = children[len(transformed_children)]
+        if clean.get(id(child)) is child:
+          transformed_children.append(child)
+        else:
+          stack.append([child, _children(child), [], False])
+        continue
+      stack.pop()
+      if children_modified:
+        comp = _rebuild(comp, transformed_children)
+      comp, comp_modified = spec.transform(comp)
+      comp_modified = comp_modified or children_modified
+      if not comp_modified:
+        clean[id(comp)] = comp
+      if not stack:
+        return comp, comp_modified
+      parent = stack[-1]
+      parent[2].append(comp)
+      parent[3] = parent[3] or comp_modified
+
+  def run_pass(
+      self, transform: _Pass,
+      comp: building_blocks.ComputationBuildingBlock) -> TransformReturnType:
+    """Runs the single pass `transform` on `comp`, recording its stats.
+
+    Args:
+      transform: The pass to run, as described in the class documentation.
+      comp: The `building_blocks.ComputationBuildingBlock` to transform.
+
+    Returns:
+      The result of the pass, along with a Boolean with the value `True` if
+      `comp` was transformed and `False` if it was not.
+    """
+    py_typecheck.check_type(comp, building_blocks.ComputationBuildingBlock)
+    self._check_pass(transform)
+    if isinstance(transform, TransformSpec):
+      name = type(transform).__name__
+    else:
+      name = getattr(transform, '__name__', repr(transform))
+    num_nodes_before = _count_nodes(comp) if self._count_nodes else None
+    start_time = time.perf_counter()
+    skipped = self._unmodified.get(transform) is comp
+    if skipped:
+      modified = False
+    elif isinstance(transform, TransformSpec):
+      comp, modified = self._transform_clean_subtrees(transform, comp)
+      if not modified:
+        self._unmodified[transform] = comp
+    else:
+      transformed_comp, modified = transform(comp)
+      if not modified and transformed_comp is comp:
+        self._unmodified[transform] = comp
+      comp = transformed_comp
+    seconds = time.perf_counter() - start_time
+    num_nodes_after = _count_nodes(comp) if self._count_nodes else None
+    self._stats.append(
+        PassStats(
+            name=name,
+            seconds=seconds,
+            modified=bool(modified),
+            skipped=skipped,
+            num_nodes_before=num_nodes_before,
+            num_nodes_after=num_nodes_after))
+    return comp, modified
+
+  def run(self,
+          comp: building_blocks.ComputationBuildingBlock,
+          max_iterations: int = 1) -> TransformReturnType:
+    """Runs the passes of this manager on `comp`, in order.
+
+    Args:
+      comp: The `building_blocks.ComputationBuildingBlock` to transform.
+      max_iterations: The maximum number of times to run the sequence of passes.
+        The sequence is run again until an iteration modifies nothing, or
+        `max_iterations` iterations have run.
+
+    Returns:
+      The result of the passes, along with a Boolean with the value `True` if
+      `comp` was transformed and `False` if it was not.
+    """
+    py_typecheck.check_type(max_iterations, int)
+    modified = False
+    for _ in range(max_iterations):
+      iteration_modified = False
+      for transform in self._passes:
+        comp, pass_modified = self.run_pass(transform, comp)
+        iteration_modified = iteration_modified or pass_modified
+      modified = modified or iteration_modified
+      if not iteration_modified:
+        break
+    return comp, modified
+
+  def format_stats(self) -> str:
+    """Returns a human readable table of the `stats` of this manager."""
+    lines = []
+    for stats in self._stats:
+      line = '{:<40} {:>10.4f}s'.format(stats.name, stats.seconds)
+      if stats.skipped:
+        line += ' (skipped)'
+      elif stats.modified:
+        line += ' (modified)'
+      if stats.num_nodes_before is not None:
+        line += ' {} -> {} nodes'.format(stats.num_nodes_before,
+                                         stats.num_nodes_after)
+      lines.append(line)
+    return '\n'.join(lines)
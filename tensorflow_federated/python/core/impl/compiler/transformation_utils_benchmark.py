@@ -0,0 +1,92 @@
+# Copyright 2020, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the traversals in `transformation_utils` on large ASTs.
+
+Traverses chains of called lambdas nested far deeper than the Python recursion
+limit, which recursive traversals could not handle. Run with `--benchmarks=.`
+to execute all benchmarks.
+"""
+
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_federated.python.core.impl.compiler import building_blocks
+from tensorflow_federated.python.core.impl.compiler import transformation_utils
+
+_NUM_ITERS = 5
+
+
+def _create_chain_of_called_lambdas(length):
+  """Returns `(x -> x)((x -> x)(...(data)))`, with `3 * length + 1` nodes."""
+  comp = building_blocks.Data('data', tf.int32)
+  for _ in range(length):
+    fn = building_blocks.Lambda('x', tf.int32,
+                                building_blocks.Reference('x', tf.int32))
+    comp = building_blocks.Call(fn, comp)
+  return comp
+
+
+def _identity(comp):
+  return comp, False
+
+
+def _replace_data(comp):
+  if comp.is_data():
+    return building_blocks.Data('replaced', tf.int32), True
+  return comp, False
+
+
+class TraversalBenchmark(tf.test.Benchmark):
+
+  def _benchmark_traversal(self, name, traverse_fn, length):
+    comp = _create_chain_of_called_lambdas(length)
+    wall_times = []
+    for _ in range(_NUM_ITERS):
+      start = time.time()
+      traverse_fn(comp)
+      wall_times.append(time.time() - start)
+    self.report_benchmark(
+        name='{}_{}_nodes'.format(name, 3 * length + 1),
+        iters=_NUM_ITERS,
+        wall_time=np.median(wall_times),
+        extras={'num_nodes': 3 * length + 1})
+
+  def _benchmark_traversals(self, length):
+    self._benchmark_traversal(
+        'transform_postorder',
+        lambda comp: transformation_utils.transform_postorder(comp, _identity),
+        length)
+    self._benchmark_traversal(
+        'transform_postorder_rebuilding',
+        lambda comp: transformation_utils.transform_postorder(
+            comp, _replace_data), length)
+    self._benchmark_traversal(
+        'transform_preorder',
+        lambda comp: transformation_utils.transform_preorder(comp, _identity),
+        length)
+    self._benchmark_traversal(
+        'visit_postorder',
+        lambda comp: transformation_utils.visit_postorder(comp, id), length)
+
+  def benchmark_traversals_1k(self):
+    self._benchmark_traversals(333)
+
+  def benchmark_traversals_100k(self):
+    self._benchmark_traversals(33333)
+
+
+if __name__ == '__main__':
+  tf.test.main()
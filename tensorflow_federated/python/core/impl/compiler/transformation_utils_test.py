@@ -165,6 +165,16 @@ def _get_number_of_nodes_via_transform_preorder(comp, predicate=None):
   return count
 
 
+def _create_chain_of_called_lambdas(length):
+  """Returns `(x -> x)((x -> x)(...(data)))`, with `length` calls."""
+  comp = building_blocks.Data('data', tf.int32)
+  for _ in range(length):
+    fn = building_blocks.Lambda('x', tf.int32,
+                                building_blocks.Reference('x', tf.int32))
+    comp = building_blocks.Call(fn, comp)
+  return comp
+
+
 class TransformationUtilsTest(parameterized.TestCase):
 
   def test_transform_postorder_fails_on_none_comp(self):
@@ -1682,6 +1692,179 @@ class TransformPreorderTest(parameterized.TestCase):
     self.assertIsInstance(data_replaced[0], building_blocks.Reference)
 
 
+class VisitPostorderTest(absltest.TestCase):
+
+  def test_visits_children_before_parents(self):
+    comp = _create_chain_of_called_lambdas(1)
+    visited = []
+    transformation_utils.visit_postorder(
+        comp, lambda x: visited.append(x.compact_representation()))
+    self.assertEqual(visited,
+                     ['x', '(x -> x)', 'data', '(x -> x)(data)'])
+
+  def test_fails_on_none_comp(self):
+    with self.assertRaises(TypeError):
+      transformation_utils.visit_postorder(None, lambda x: None)
+
+
+class DeeplyNestedComputationTest(absltest.TestCase):
+
+  # Deep enough to exceed the default Python recursion limit.
+  _LENGTH = 5000
+
+  def test_transform_postorder(self):
+    comp = _create_chain_of_called_lambdas(self._LENGTH)
+
+    def transform(comp):
+      if comp.is_data():
+        return building_blocks.Data('transformed', tf.int32), True
+      return comp, False
+
+    transformed_comp, modified = transformation_utils.transform_postorder(
+        comp, transform)
+    self.assertTrue(modified)
+    self.assertEqual(
+        _get_number_of_nodes_via_transform_postorder(
+            transformed_comp, lambda x: x.is_data() and x.uri == 'transformed'),
+        1)
+
+  def test_transform_preorder(self):
+    comp = _create_chain_of_called_lambdas(self._LENGTH)
+    self.assertEqual(
+        _get_number_of_nodes_via_transform_preorder(comp),
+        3 * self._LENGTH + 1)
+
+  def test_transform_postorder_with_symbol_bindings(self):
+    comp = _create_chain_of_called_lambdas(self._LENGTH)
+    self.assertEqual(
+        _get_number_of_nodes_via_transform_postorder_with_symbol_bindings(comp),
+        3 * self._LENGTH + 1)
+
+  def test_visit_postorder(self):
+    comp = _create_chain_of_called_lambdas(self._LENGTH)
+    visited = []
+    transformation_utils.visit_postorder(comp, visited.append)
+    self.assertLen(visited, 3 * self._LENGTH + 1)
+    self.assertIs(visited[-1], comp)
+
+
+class _CountingDataReplacer(transformation_utils.TransformSpec):
+  """Replaces data `a` with data `b`, counting the building blocks visited."""
+
+  def __init__(self):
+    super().__init__()
+    self.num_visited = 0
+
+  def should_transform(self, comp):
+    return comp.is_data() and comp.uri == 'a'
+
+  def transform(self, comp):
+    self.num_visited += 1
+    if not self.should_transform(comp):
+      return comp, False
+    return building_blocks.Data('b', comp.type_signature), True
+
+
+class PassManagerTest(absltest.TestCase):
+
+  def test_runs_passes_in_order(self):
+    comp = building_blocks.Data('a', tf.int32)
+    names = []
+
+    def first(comp):
+      names.append('first')
+      return comp, False
+
+    def second(comp):
+      names.append('second')
+      return building_blocks.Data('b', tf.int32), True
+
+    pass_manager = transformation_utils.PassManager([first, second])
+    transformed_comp, modified = pass_manager.run(comp)
+    self.assertTrue(modified)
+    self.assertEqual(transformed_comp.uri, 'b')
+    self.assertEqual(names, ['first', 'second'])
+    self.assertEqual([s.name for s in pass_manager.stats], ['first', 'second'])
+    self.assertEqual([s.modified for s in pass_manager.stats], [False, True])
+
+  def test_skips_pass_on_computation_it_left_unmodified(self):
+    comp = building_blocks.Data('a', tf.int32)
+    num_calls = 0
+
+    def transform(comp):
+      nonlocal num_calls
+      num_calls += 1
+      return comp, False
+
+    pass_manager = transformation_utils.PassManager()
+    pass_manager.run_pass(transform, comp)
+    transformed_comp, modified = pass_manager.run_pass(transform, comp)
+    self.assertIs(transformed_comp, comp)
+    self.assertFalse(modified)
+    self.assertEqual(num_calls, 1)
+    self.assertEqual([s.skipped for s in pass_manager.stats], [False, True])
+
+  def test_transform_spec_pass_only_visits_modified_subtrees(self):
+    spec = _CountingDataReplacer()
+    pass_manager = transformation_utils.PassManager()
+    clean = building_blocks.Struct([
+        building_blocks.Data('x', tf.int32),
+        building_blocks.Data('y', tf.int32),
+    ])
+    pass_manager.run_pass(spec, clean)
+    self.assertEqual(spec.num_visited, 3)
+    comp = building_blocks.Struct([clean, building_blocks.Data('a', tf.int32)])
+    transformed_comp, modified = pass_manager.run_pass(spec, comp)
+    self.assertTrue(modified)
+    self.assertEqual(transformed_comp.compact_representation(), '<<x,y>,b>')
+    # Only the new struct and data are visited.
+    self.assertEqual(spec.num_visited, 5)
+
+  def test_runs_passes_to_fixed_point(self):
+    comp = building_blocks.Struct([building_blocks.Data('a', tf.int32)])
+    spec = _CountingDataReplacer()
+
+    def rename(comp):
+      if comp.is_struct() and comp[0].uri == 'b':
+        return building_blocks.Struct([building_blocks.Data('c', tf.int32)
+                                      ]), True
+      return comp, False
+
+    pass_manager = transformation_utils.PassManager([rename, spec])
+    transformed_comp, modified = pass_manager.run(comp, max_iterations=5)
+    self.assertTrue(modified)
+    self.assertEqual(transformed_comp.compact_representation(), '<c>')
+    self.assertLen(pass_manager.stats, 6)
+    self.assertTrue(pass_manager.stats[-1].skipped)
+
+  def test_counts_nodes(self):
+    comp = building_blocks.Struct([building_blocks.Data('a', tf.int32)])
+
+    def unwrap(comp):
+      return comp[0], True
+
+    pass_manager = transformation_utils.PassManager([unwrap], count_nodes=True)
+    pass_manager.run(comp)
+    self.assertEqual(pass_manager.stats[0].num_nodes_before, 2)
+    self.assertEqual(pass_manager.stats[0].num_nodes_after, 1)
+
+  def test_fails_on_global_transform_spec(self):
+
+    class GlobalTransformSpec(transformation_utils.TransformSpec):
+
+      def __init__(self):
+        super().__init__(global_transform=True)
+
+      def should_transform(self, comp, symbol_tree):
+        return False
+
+      def transform(self, comp, symbol_tree):
+        return comp, False
+
+    with self.assertRaises(ValueError):
+      transformation_utils.PassManager([GlobalTransformSpec()])
+
+
 class GetUniqueNamesTest(absltest.TestCase):
 
   def test_raises_on_none(self):
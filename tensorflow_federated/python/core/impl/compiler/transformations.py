@@ -451,15 +451,19 @@ def remove_duplicate_called_graphs(comp):
     return comp, False
 
   leaf_called_graphs = []
+  # Maps the structural digests of the called graphs in `leaf_called_graphs` to
+  # their names, which makes finding a duplicate a dictionary lookup.
+  names_by_digest = {}
 
   def _pack_called_graphs_into_block(inner_comp):
     """Packs deduplicated bindings to called graphs in `leaf_called_graphs`."""
     if inner_comp.is_call() and inner_comp.function.is_compiled_computation():
-      for (name, x) in leaf_called_graphs:
-        if tree_analysis.trees_equal(x, inner_comp):
-          return building_blocks.Reference(name,
-                                           inner_comp.type_signature), True
+      digest = inner_comp.structural_digest()
+      name = names_by_digest.get(digest)
+      if name is not None:
+        return building_blocks.Reference(name, inner_comp.type_signature), True
       new_name = next(name_generator)
+      names_by_digest[digest] = new_name
       leaf_called_graphs.append((new_name, inner_comp))
       return building_blocks.Reference(new_name,
                                        inner_comp.type_signature), True
@@ -812,20 +816,28 @@ def transform_to_call_dominant(
     return transformation_utils.transform_postorder(comp,
                                                     block_extracter.transform)
 
+  # Both runs of this pass share its record of unmodified subtrees.
+  remove_unused_block_locals = tree_transformations.RemoveUnusedBlockLocals()
+  pass_manager = transformation_utils.PassManager(
+      count_nodes=logging.level_debug())
+
   def _resolve_calls_to_concrete_functions(comp):
     """Removes symbol bindings which contain functional types."""
 
-    comp, refs_renamed = tree_transformations.uniquify_reference_names(comp)
-    comp, fns_resolved = tree_transformations.resolve_higher_order_functions(
-        comp)
-    comp, called_lambdas_replaced = tree_transformations.replace_called_lambda_with_block(
-        comp)
-    comp, selections_inlined = tree_transformations.inline_selections_from_tuple(
-        comp)
+    comp, refs_renamed = pass_manager.run_pass(
+        tree_transformations.uniquify_reference_names, comp)
+    comp, fns_resolved = pass_manager.run_pass(
+        tree_transformations.resolve_higher_order_functions, comp)
+    comp, called_lambdas_replaced = pass_manager.run_pass(
+        tree_transformations.replace_called_lambda_with_block, comp)
+    comp, selections_inlined = pass_manager.run_pass(
+        tree_transformations.inline_selections_from_tuple, comp)
     if fns_resolved or selections_inlined:
-      comp, _ = tree_transformations.uniquify_reference_names(comp)
-    comp, fns_inlined = _inline_functions(comp)
-    comp, locals_removed = tree_transformations.remove_unused_block_locals(comp)
+      comp, _ = pass_manager.run_pass(
+          tree_transformations.uniquify_reference_names, comp)
+    comp, fns_inlined = pass_manager.run_pass(_inline_functions, comp)
+    comp, locals_removed = pass_manager.run_pass(remove_unused_block_locals,
+                                                 comp)
 
     modified = (
         refs_renamed or fns_resolved or called_lambdas_replaced or
@@ -842,9 +854,11 @@ def transform_to_call_dominant(
       tree_transformations.inline_selections_from_tuple,
       tree_transformations.merge_chained_blocks,
       tree_transformations.remove_duplicate_block_locals,
-      tree_transformations.remove_unused_block_locals,
+      remove_unused_block_locals,
       tree_transformations.uniquify_reference_names,
   ]:
-    comp, transformed = transform(comp)
+    comp, transformed = pass_manager.run_pass(transform, comp)
     modified = modified or transformed
+  logging.debug('Passes transforming to call-dominant form:\n%s',
+                pass_manager.format_stats())
   return comp, modified
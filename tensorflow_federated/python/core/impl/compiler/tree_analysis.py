@@ -16,7 +16,6 @@
 from typing import Callable, List, Optional, Tuple, Type, Union
 
 from tensorflow_federated.python.common_libs import py_typecheck
-from tensorflow_federated.python.common_libs import serialization_utils
 from tensorflow_federated.python.core.impl.compiler import building_block_analysis
 from tensorflow_federated.python.core.impl.compiler import building_blocks
 from tensorflow_federated.python.core.impl.compiler import intrinsic_defs
@@ -32,13 +31,7 @@ _TypeOrTupleOfTypes = Union[
 def _visit_postorder(
     tree: building_blocks.ComputationBuildingBlock,
     function: Callable[[building_blocks.ComputationBuildingBlock], None]):
-  py_typecheck.check_type(tree, building_blocks.ComputationBuildingBlock)
-
-  def _visit(building_block):
-    function(building_block)
-    return building_block, False
-
-  transformation_utils.transform_postorder(tree, _visit)
+  transformation_utils.visit_postorder(tree, function)
 
 
 _BuildingBlockPredicate = Callable[[building_blocks.ComputationBuildingBlock],
@@ -440,40 +433,6 @@ def contains_no_unbound_references(tree, excluding=None):
   return len(names) == 0  # pylint: disable=g-explicit-length-test
 
 
-def _compiled_comp_equal(comp_1, comp_2):
-  """Returns `True` iff the computations are entirely identical.
-
-  Args:
-    comp_1: A `building_blocks.CompiledComputation` to test.
-    comp_2: A `building_blocks.CompiledComputation` to test.
-
-  Raises:
-    TypeError: if `comp_1` or `comp_2` is not a
-      `building_blocks.CompiledComputation`.
-  """
-  py_typecheck.check_type(comp_1, building_blocks.CompiledComputation)
-  py_typecheck.check_type(comp_2, building_blocks.CompiledComputation)
-
-  tensorflow_1 = comp_1.proto.tensorflow
-  tensorflow_2 = comp_2.proto.tensorflow
-  if tensorflow_1.initialize_op != tensorflow_2.initialize_op:
-    return False
-  if tensorflow_1.parameter != tensorflow_2.parameter:
-    return False
-  if tensorflow_1.result != tensorflow_2.result:
-    return False
-
-  graphdef_1 = serialization_utils.unpack_graph_def(tensorflow_1.graph_def)
-  graphdef_2 = serialization_utils.unpack_graph_def(tensorflow_2.graph_def)
-  # TODO(b/174605105): We prefer to mitigate nans comparing unequal for now,
-  # given the severity of TFF's failure to handle this violation of its
-  # assumption that trees_equal is an equivalence relation on its ASTs. But this
-  # is not a long-term solution. To replace with more legitimate proto
-  # comparison which treats nans as equal.
-  return graphdef_1.SerializeToString(
-      deterministic=True) == graphdef_2.SerializeToString(deterministic=True)
-
-
 def trees_equal(comp_1, comp_2):
   """Returns `True` if the computations are structurally equivalent.
 
@@ -487,6 +446,10 @@ def trees_equal(comp_1, comp_2):
   Note that the equivalence relation here is also known as alpha equivalence
   in lambda calculus.
 
+  The computations are compared by their cached structural digests (see
+  `building_blocks.ComputationBuildingBlock.structural_digest`), so repeated
+  comparisons against the same computation take constant time.
+
   Args:
     comp_1: A `building_blocks.ComputationBuildingBlock` to test.
     comp_2: A `building_blocks.ComputationBuildingBlock` to test.
@@ -505,67 +468,19 @@ def trees_equal(comp_1, comp_2):
       comp_1, (building_blocks.ComputationBuildingBlock, type(None)))
   py_typecheck.check_type(
       comp_2, (building_blocks.ComputationBuildingBlock, type(None)))
-
-  def _trees_equal(comp_1, comp_2, reference_equivalences):
-    """Internal helper for `trees_equal`."""
-    # The unidiomatic-typecheck is intentional, for the purposes of equality
-    # this function requires that the types are identical and that a subclass
-    # will not be equal to its baseclass.
-    if comp_1 is None or comp_2 is None:
-      return comp_1 is None and comp_2 is None
-    if type(comp_1) != type(comp_2):  # pylint: disable=unidiomatic-typecheck
-      return False
-    if comp_1.type_signature != comp_2.type_signature:
-      return False
-    if comp_1.is_block():
-      if len(comp_1.locals) != len(comp_2.locals):
-        return False
-      for (name_1, value_1), (name_2, value_2) in zip(comp_1.locals,
-                                                      comp_2.locals):
-        if not _trees_equal(value_1, value_2, reference_equivalences):
-          return False
-        reference_equivalences.append((name_1, name_2))
-      return _trees_equal(comp_1.result, comp_2.result, reference_equivalences)
-    elif comp_1.is_call():
-      return (_trees_equal(comp_1.function, comp_2.function,
-                           reference_equivalences) and
-              _trees_equal(comp_1.argument, comp_2.argument,
-                           reference_equivalences))
-    elif comp_1.is_compiled_computation():
-      return _compiled_comp_equal(comp_1, comp_2)
-    elif comp_1.is_data():
-      return comp_1.uri == comp_2.uri
-    elif comp_1.is_intrinsic():
-      return comp_1.uri == comp_2.uri
-    elif comp_1.is_lambda():
-      if comp_1.parameter_type != comp_2.parameter_type:
-        return False
-      reference_equivalences.append(
-          (comp_1.parameter_name, comp_2.parameter_name))
-      return _trees_equal(comp_1.result, comp_2.result, reference_equivalences)
-    elif comp_1.is_placement():
-      return comp_1.uri == comp_2.uri
-    elif comp_1.is_reference():
-      for comp_1_candidate, comp_2_candidate in reversed(
-          reference_equivalences):
-        if comp_1.name == comp_1_candidate:
-          return comp_2.name == comp_2_candidate
-      return comp_1.name == comp_2.name
-    elif comp_1.is_selection():
-      return (comp_1.name == comp_2.name and
-              comp_1.index == comp_2.index and _trees_equal(
-                  comp_1.source, comp_2.source, reference_equivalences))
-    elif comp_1.is_struct():
-      # The element names are checked as part of the `type_signature`.
-      if len(comp_1) != len(comp_2):
-        return False
-      for element_1, element_2 in zip(comp_1, comp_2):
-        if not _trees_equal(element_1, element_2, reference_equivalences):
-          return False
-      return True
-    raise NotImplementedError('Unexpected type found: {}.'.format(type(comp_1)))
-
-  return _trees_equal(comp_1, comp_2, [])
+  if comp_1 is None or comp_2 is None:
+    return comp_1 is None and comp_2 is None
+  if comp_1 is comp_2:
+    return True
+  # The unidiomatic-typecheck is intentional, for the purposes of equality this
+  # function requires that the types are identical and that a subclass will not
+  # be equal to its baseclass. Checking the kinds and types of the roots first
+  # avoids digesting both trees for most unequal computations.
+  if type(comp_1) != type(comp_2):  # pylint: disable=unidiomatic-typecheck
+    return False
+  if comp_1.type_signature != comp_2.type_signature:
+    return False
+  return comp_1.structural_digest() == comp_2.structural_digest()
 
 
 def find_aggregations_in_tree(
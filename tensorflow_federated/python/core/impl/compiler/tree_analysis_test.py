@@ -714,6 +714,46 @@ class TreesEqualTest(absltest.TestCase):
     tf_comp2 = _create_tensorflow_graph_with_nan()
     self.assertTrue(tree_analysis.trees_equal(tf_comp1, tf_comp2))
 
+  def test_returns_false_for_different_kinds_without_digesting(self):
+    data = building_blocks.Data('data', tf.int32)
+    ref = building_blocks.Reference('data', tf.int32)
+    self.assertFalse(tree_analysis.trees_equal(data, ref))
+    # pylint: disable=protected-access
+    self.assertIsNone(data._cached_digest)
+    self.assertIsNone(ref._cached_digest)
+    # pylint: enable=protected-access
+
+  def test_returns_false_for_lambdas_referencing_shadowed_parameters(self):
+    ref_to_x = building_blocks.Reference('x', tf.int32)
+    # (x -> (x -> x)) and (x -> (y -> x)).
+    comp_1 = building_blocks.Lambda(
+        'x', tf.int32, building_blocks.Lambda('x', tf.int32, ref_to_x))
+    comp_2 = building_blocks.Lambda(
+        'x', tf.int32, building_blocks.Lambda('y', tf.int32, ref_to_x))
+    # (a -> (b -> b)), which is equal to (x -> (x -> x)).
+    comp_3 = building_blocks.Lambda(
+        'a', tf.int32,
+        building_blocks.Lambda('b', tf.int32,
+                               building_blocks.Reference('b', tf.int32)))
+    self.assertFalse(tree_analysis.trees_equal(comp_1, comp_2))
+    self.assertTrue(tree_analysis.trees_equal(comp_1, comp_3))
+    self.assertFalse(tree_analysis.trees_equal(comp_2, comp_3))
+
+  def test_returns_true_for_deeply_nested_comps(self):
+
+    def _create_chain_of_called_lambdas(parameter_name, length):
+      comp = building_blocks.Data('data', tf.int32)
+      for _ in range(length):
+        fn = building_blocks.Lambda(
+            parameter_name, tf.int32,
+            building_blocks.Reference(parameter_name, tf.int32))
+        comp = building_blocks.Call(fn, comp)
+      return comp
+
+    comp_1 = _create_chain_of_called_lambdas('x', 10000)
+    comp_2 = _create_chain_of_called_lambdas('y', 10000)
+    self.assertTrue(tree_analysis.trees_equal(comp_1, comp_2))
+
 
 @computations.federated_computation
 def non_aggregation_intrinsics():
@@ -13,9 +13,12 @@
 # limitations under the License.
 """A library of transformation functions for ASTs."""
 
+import collections
 import typing
 from typing import Dict, List, Tuple, Sequence, Set, Union
 
+from absl import logging
+
 from tensorflow_federated.python.common_libs import py_typecheck
 from tensorflow_federated.python.common_libs import structure
 from tensorflow_federated.python.core.api import computation_types
@@ -359,6 +362,52 @@ def extract_intrinsics(comp):
   return _apply_transforms(comp, ExtractComputation(comp, _predicate))
 
 
+def hash_cons_building_blocks(comp, canonical_blocks=None):
+  """Replaces structurally equal subtrees of `comp` with a shared instance.
+
+  This transform traverses `comp` postorder and replaces every subtree with the
+  first building block seen with the same
+  `building_blocks.ComputationBuildingBlock.structural_digest`, that is, the
+  first one which is equal to it up to the renaming of the references it binds
+  (see `tree_analysis.trees_equal`). Structurally equal subtrees of the result
+  are therefore the same Python object, and checking them for equality or
+  deduplicating them are dictionary lookups on their cached digests.
+
+  Notice that sharing subtrees which bind references means that the result
+  generally does not have unique names, even if `comp` did; callers which rely
+  on unique names should call `uniquify_reference_names` afterwards.
+
+  The digest of each subtree is computed once, except that the digest of a
+  subtree referring to a name bound by one of its ancestors is recomputed when
+  digesting that ancestor. This is linear in the size of `comp` when references
+  are bound close to their uses, but quadratic in the worst case, e.g. for a
+  chain of nested lambdas whose innermost result refers to every parameter.
+
+  Args:
+    comp: The computation building block in which to perform the replacements.
+    canonical_blocks: An optional mutable mapping from structural digests to
+      the building blocks to use for them. Passing the same mapping to
+      multiple calls shares equal subtrees across computations. If `None`, a
+      new mapping is used.
+
+  Returns:
+    A new computation with the transformation applied or the original `comp`.
+
+  Raises:
+    TypeError: If types do not match.
+  """
+  py_typecheck.check_type(comp, building_blocks.ComputationBuildingBlock)
+  if canonical_blocks is None:
+    canonical_blocks = {}
+
+  def _transform(comp):
+    canonical_block = canonical_blocks.setdefault(comp.structural_digest(),
+                                                  comp)
+    return canonical_block, canonical_block is not comp
+
+  return transformation_utils.transform_postorder(comp, _transform)
+
+
 class InlineBlock(transformation_utils.TransformSpec):
   """Inlines the block variables in `comp` specified by `variable_names`.
 
@@ -677,16 +726,18 @@ class MergeChainedFederatedMapsOrApplys(transformation_utils.TransformSpec):
 
 def remove_duplicate_building_blocks(comp):
   """Composite transformation to remove duplicated building blocks."""
-  mutated = False
-  for transform in [
-      replace_called_lambda_with_block,
-      remove_mapped_or_applied_identity,
-      uniquify_reference_names,
-      extract_computations,
-      remove_duplicate_block_locals,
-  ]:
-    comp, comp_mutated = transform(comp)
-    mutated = mutated or comp_mutated
+  pass_manager = transformation_utils.PassManager(
+      [
+          replace_called_lambda_with_block,
+          remove_mapped_or_applied_identity,
+          uniquify_reference_names,
+          extract_computations,
+          remove_duplicate_block_locals,
+      ],
+      count_nodes=logging.level_debug())
+  comp, mutated = pass_manager.run(comp)
+  logging.debug('Passes removing duplicate building blocks:\n%s',
+                pass_manager.format_stats())
   return comp, mutated
 
 
@@ -1054,6 +1105,42 @@ def merge_tuple_intrinsics(comp, uri):
   return _apply_transforms(comp, MergeTupleIntrinsics(comp, uri))
 
 
+class _DigestIndexedSymbolTree(transformation_utils.SymbolTree):
+  """A `SymbolTree` which indexes the visible bound values by digest.
+
+  Bindings are only visible from the scope they are bound in, so the index of a
+  scope is dropped when the walk leaves it.
+  """
+
+  def __init__(self, payload_type):
+    super().__init__(payload_type)
+    self._payloads_by_digest = collections.defaultdict(list)
+    self._digests_by_scope = [[]]
+
+  def drop_scope_down(self, comp_id):
+    super().drop_scope_down(comp_id)
+    self._digests_by_scope.append([])
+
+  def pop_scope_up(self):
+    super().pop_scope_up()
+    for digest in self._digests_by_scope.pop():
+      payloads = self._payloads_by_digest[digest]
+      payloads.pop()
+      if not payloads:
+        del self._payloads_by_digest[digest]
+
+  def ingest_variable_binding(self, name, value):
+    super().ingest_variable_binding(name, value)
+    if value is not None:
+      digest = value.structural_digest()
+      self._payloads_by_digest[digest].append(self.active_node.payload)
+      self._digests_by_scope[-1].append(digest)
+
+  def get_visible_payloads_with_digest(self, digest):
+    """Returns the visible payloads with values of `digest`, outermost first."""
+    return self._payloads_by_digest.get(digest, [])
+
+
 def remove_duplicate_block_locals(comp):
   r"""Removes duplicated computations from Block locals in `comp`.
 
@@ -1113,18 +1200,18 @@ def remove_duplicate_block_locals(comp):
     value = _resolve_reference_to_concrete(ref, symbol_tree)
     if value.is_reference():
       return value, True
-    payloads_with_value = symbol_tree.get_higher_payloads_with_value(
-        value, tree_analysis.trees_equal)
+    payloads_with_value = symbol_tree.get_visible_payloads_with_digest(
+        value.structural_digest())
     if not payloads_with_value:
       # In this case, the current binding is the only visible binding with value
       # `value`. We don't need to update anything, or replace the current
       # reference.
       return ref, False
     else:
-      highest_payload = payloads_with_value[-1]
-      lower_payloads = payloads_with_value[:-1]
+      highest_payload = payloads_with_value[0]
+      lower_payloads = payloads_with_value[1:]
       for payload in lower_payloads:
-        symbol_tree.update_payload_with_name(payload.name)
+        payload.update(payload.name)
       highest_building_block = building_blocks.Reference(
           highest_payload.name, highest_payload.value.type_signature)
       return highest_building_block, True
@@ -1149,7 +1236,7 @@ def remove_duplicate_block_locals(comp):
       return _remove_reference_chain(comp, symbol_tree)
     return comp, False
 
-  symbol_tree = transformation_utils.SymbolTree(
+  symbol_tree = _DigestIndexedSymbolTree(
       transformation_utils.TrackRemovedReferences)
   return transformation_utils.transform_postorder_with_symbol_bindings(
       comp, _transform, symbol_tree)
@@ -1265,6 +1265,79 @@ class ExtractIntrinsicsTest(test_case.TestCase):
     self.assertFalse(modified)
 
 
+class HashConsBuildingBlocksTest(test_case.TestCase):
+
+  def test_raises_type_error_with_none_comp(self):
+    with self.assertRaises(TypeError):
+      tree_transformations.hash_cons_building_blocks(None)
+
+  def test_noops_with_no_equal_subtrees(self):
+    data = building_blocks.Data('data', tf.int32)
+    ref = building_blocks.Reference('a', tf.int32)
+    comp = building_blocks.Struct([data, ref])
+
+    transformed_comp, modified = tree_transformations.hash_cons_building_blocks(
+        comp)
+
+    self.assertIs(transformed_comp, comp)
+    self.assertFalse(modified)
+
+  def test_shares_equal_subtrees(self):
+    data_1 = building_blocks.Data('data', tf.int32)
+    data_2 = building_blocks.Data('data', tf.int32)
+    comp = building_blocks.Struct([data_1, data_2])
+
+    transformed_comp, modified = tree_transformations.hash_cons_building_blocks(
+        comp)
+
+    self.assertIs(transformed_comp[0], data_1)
+    self.assertIs(transformed_comp[1], data_1)
+    self.assertTrue(modified)
+
+  def test_shares_subtrees_equal_up_to_renaming(self):
+    fn_1 = building_blocks.Lambda('x', tf.int32,
+                                  building_blocks.Reference('x', tf.int32))
+    fn_2 = building_blocks.Lambda('y', tf.int32,
+                                  building_blocks.Reference('y', tf.int32))
+    comp = building_blocks.Struct([fn_1, fn_2])
+
+    transformed_comp, modified = tree_transformations.hash_cons_building_blocks(
+        comp)
+
+    self.assertEqual(comp.compact_representation(), '<(x -> x),(y -> y)>')
+    self.assertEqual(transformed_comp.compact_representation(),
+                     '<(x -> x),(x -> x)>')
+    self.assertIs(transformed_comp[0], transformed_comp[1])
+    self.assertTrue(modified)
+
+  def test_does_not_share_subtrees_with_different_unbound_references(self):
+    ref_to_x = building_blocks.Reference('x', tf.int32)
+    ref_to_y = building_blocks.Reference('y', tf.int32)
+    comp = building_blocks.Struct([
+        building_blocks.Struct([ref_to_x]),
+        building_blocks.Struct([ref_to_y]),
+    ])
+
+    transformed_comp, modified = tree_transformations.hash_cons_building_blocks(
+        comp)
+
+    self.assertIs(transformed_comp, comp)
+    self.assertFalse(modified)
+
+  def test_shares_subtrees_across_computations(self):
+    canonical_blocks = {}
+    data_1 = building_blocks.Data('data', tf.int32)
+    data_2 = building_blocks.Data('data', tf.int32)
+
+    tree_transformations.hash_cons_building_blocks(
+        building_blocks.Struct([data_1]), canonical_blocks)
+    transformed_comp, modified = tree_transformations.hash_cons_building_blocks(
+        building_blocks.Struct([data_2]), canonical_blocks)
+
+    self.assertIs(transformed_comp[0], data_1)
+    self.assertTrue(modified)
+
+
 class InlineBlockLocalsTest(test_case.TestCase):
 
   def test_raises_type_error_with_none_comp(self):
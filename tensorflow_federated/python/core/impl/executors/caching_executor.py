@@ -15,6 +15,8 @@
 
 import asyncio
 import collections
+
+import attr
 import cachetools
 
 import numpy as np
@@ -142,6 +144,9 @@ class CachedValue(executor_value_base.ExecutorValue):
     self._type_spec = type_spec
     self._target_future = target_future
     self._computed_result = None
+    self._size_bytes = (
+        _estimate_type_size_bytes(type_spec) +
+        _estimate_key_size_bytes(hashable_key))
 
   @property
   def type_signature(self):
@@ -159,6 +164,11 @@ class CachedValue(executor_value_base.ExecutorValue):
   def target_future(self):
     return self._target_future
 
+  @property
+  def size_bytes(self):
+    """The estimated size of this value in bytes, including its hashable key."""
+    return self._size_bytes
+
   async def compute(self):
     if self._computed_result is None:
       target_value = await self._target_future
@@ -166,35 +176,169 @@ class CachedValue(executor_value_base.ExecutorValue):
     return self._computed_result
 
 
-_DEFAULT_CACHE_SIZE = 1000
+_DEFAULT_CACHE_SIZE_BYTES = 1024**3  # 1 GB
+
+# The size accounted for cache entries whose size cannot be estimated from
+# their type, such as the identifiers that source values map to.
+_NOMINAL_ENTRY_SIZE_BYTES = 64
+
+
+def _estimate_type_size_bytes(type_spec: computation_types.Type) -> int:
+  """Estimates the memory taken by a value of type `type_spec`.
+
+  Like `sizing_executor.get_type_information`, this only measures tensors and
+  structures of tensors, but it relies on the type alone. Tensors without a
+  fully defined shape or of a variable-width dtype, and values of other types,
+  are accounted for at a nominal size.
+
+  Args:
+    type_spec: A `tff.Type`.
+
+  Returns:
+    The estimated size in bytes.
+  """
+  if type_spec.is_tensor():
+    num_elements = type_spec.shape.num_elements()
+    if num_elements is None or type_spec.dtype == tf.string:
+      return _NOMINAL_ENTRY_SIZE_BYTES
+    return num_elements * type_spec.dtype.size
+  elif type_spec.is_struct():
+    return sum(
+        _estimate_type_size_bytes(t) for _, t in structure.iter_elements(
+            type_spec))
+  elif type_spec.is_federated():
+    return _estimate_type_size_bytes(type_spec.member)
+  else:
+    return _NOMINAL_ENTRY_SIZE_BYTES
+
+
+def _estimate_key_size_bytes(hashable_key) -> int:
+  """Estimates the memory held by a key returned by `_get_hashable_key`."""
+  if isinstance(hashable_key, (bytes, str)):
+    return len(hashable_key)
+  elif isinstance(hashable_key, tuple):
+    return sum(_estimate_key_size_bytes(k) for k in hashable_key)
+  elif isinstance(hashable_key, structure.Struct):
+    return sum(
+        _estimate_key_size_bytes(k) for k in structure.flatten(hashable_key))
+  else:
+    return 0
+
+
+def _get_cache_entry_size(entry) -> int:
+  if isinstance(entry, CachedValue):
+    return entry.size_bytes
+  else:
+    return _NOMINAL_ENTRY_SIZE_BYTES
+
+
+class _ByteSizedLRUCache(cachetools.LRUCache):
+  """An LRU cache bounded by the estimated size in bytes of its entries."""
+
+  def __init__(self, max_size_bytes: int):
+    super().__init__(max_size_bytes, getsizeof=_get_cache_entry_size)
+    self.num_evictions = 0
+
+  def __setitem__(self, key, value):
+    if self.getsizeof(value) > self.maxsize:
+      # Values larger than the whole budget are passed through uncached,
+      # rather than failing as they would in `cachetools.LRUCache`.
+      self._discard_hashable_key(value)
+      return
+    super().__setitem__(key, value)
+
+  def _discard_hashable_key(self, value):
+    # Peeks with `cachetools.Cache.__getitem__` to not mark the key as used.
+    if isinstance(value, CachedValue) and value.hashable_key is not None:
+      if (value.hashable_key in self and cachetools.Cache.__getitem__(
+          self, value.hashable_key) == value.identifier):
+        del self[value.hashable_key]
+
+  def popitem(self):
+    key, value = super().popitem()
+    self.num_evictions += 1
+    # Source values are found through their hashable key, which is of no use
+    # once the value is gone.
+    self._discard_hashable_key(value)
+    return key, value
+
+
+@attr.s(frozen=True)
+class CacheStats(object):
+  """Counters describing the use of the cache of a `CachingExecutor`.
+
+  Attributes:
+    hits: The number of requests served from the cache.
+    misses: The number of requests forwarded to the target executor.
+    evictions: The number of entries evicted to respect the byte budget. Always
+      0 if the executor was constructed with a custom `cache`.
+    size_bytes: The current estimated size of the cached entries. Always 0 if
+      the executor was constructed with a custom `cache`.
+  """
+  hits = attr.ib(type=int)
+  misses = attr.ib(type=int)
+  evictions = attr.ib(type=int)
+  size_bytes = attr.ib(type=int)
 
 
 class CachingExecutor(executor_base.Executor):
-  """The caching executor only performs caching."""
+  """The caching executor only performs caching.
 
-  # TODO(b/134543154): Factor out default cache settings to supply elsewhere,
-  # possibly as a part of executor stack configuration.
+  By default, cached values are accounted for by their estimated size in bytes,
+  derived from their type signatures (and, for values created from Python
+  objects, the size of the key used to look them up), and the least recently
+  used values are evicted to keep the total within a byte budget.
+  """
 
   # TODO(b/134543154): It might be desirable to still keep aorund things that
   # are currently in use (referenced) regardless of what's in the cache. This
   # can be added later on.
 
-  def __init__(self, target_executor, cache=None):
+  def __init__(self,
+               target_executor,
+               cache=None,
+               max_cache_size_bytes=_DEFAULT_CACHE_SIZE_BYTES):
     """Creates a new instance of this executor.
 
     Args:
       target_executor: An instance of `executor_base.Executor`.
       cache: The cache to use (must be an instance of `cachetools.Cache`). If
-        unspecified, by default we construct a 1000-element LRU cache.
+        unspecified, by default we construct an LRU cache bounded by
+        `max_cache_size_bytes`.
+      max_cache_size_bytes: The budget for the estimated size of the cached
+        values, if `cache` is unspecified. Defaults to 1GB.
+
+    Raises:
+      ValueError: If `max_cache_size_bytes` is not positive.
     """
     py_typecheck.check_type(target_executor, executor_base.Executor)
     if cache is not None:
       py_typecheck.check_type(cache, cachetools.Cache)
     else:
-      cache = cachetools.LRUCache(_DEFAULT_CACHE_SIZE)
+      py_typecheck.check_type(max_cache_size_bytes, int)
+      if max_cache_size_bytes < 1:
+        raise ValueError('The cache size must be positive, found {}.'.format(
+            max_cache_size_bytes))
+      cache = _ByteSizedLRUCache(max_cache_size_bytes)
     self._target_executor = target_executor
     self._cache = cache
     self._num_values_created = 0
+    self._num_hits = 0
+    self._num_misses = 0
+
+  @property
+  def cache_stats(self) -> CacheStats:
+    if isinstance(self._cache, _ByteSizedLRUCache):
+      evictions = self._cache.num_evictions
+      size_bytes = self._cache.currsize
+    else:
+      evictions = 0
+      size_bytes = 0
+    return CacheStats(
+        hits=self._num_hits,
+        misses=self._num_misses,
+        evictions=evictions,
+        size_bytes=size_bytes)
 
   def close(self):
     self._cache.clear()
@@ -225,12 +369,17 @@ class CachingExecutor(executor_base.Executor):
       # which may be a legitimate use case if (as it happens) the payload alone
       # does not uniquely determine the type, so we simply opt not to reuse the
       # cache value and fallback on the regular behavior.
-      if (cached_value is not None and type_spec is not None and
-          not cached_value.type_signature.is_equivalent_to(type_spec)):
+      # The value may also have been evicted while its key remained cached.
+      if (cached_value is None or
+          (type_spec is not None and
+           not cached_value.type_signature.is_equivalent_to(type_spec))):
         identifier = None
     else:
       identifier = None
-    if identifier is None:
+    if identifier is not None:
+      self._num_hits += 1
+    else:
+      self._num_misses += 1
       self._num_values_created = self._num_values_created + 1
       identifier = CachedValueIdentifier(str(self._num_values_created))
       self._cache[hashable_key] = identifier
@@ -249,7 +398,7 @@ class CachingExecutor(executor_base.Executor):
       # only the current cache item needs to be invalidated; however this
       # currently only occurs when an inner RemoteExecutor has the backend go
       # down.
-      self._cache = {}
+      self._cache.clear()
       raise
     # No type check is necessary here; we have either checked
     # `is_equivalent_to` or just constructed `target_value`
@@ -272,7 +421,9 @@ class CachingExecutor(executor_base.Executor):
     identifier = CachedValueIdentifier(identifier_str)
     try:
       cached_value = self._cache[identifier]
+      self._num_hits += 1
     except KeyError:
+      self._num_misses += 1
       target_future = asyncio.ensure_future(
           self._target_executor.create_call(*gathered))
       cached_value = CachedValue(identifier, None, type_spec, target_future)
@@ -284,7 +435,7 @@ class CachingExecutor(executor_base.Executor):
       # only the current cache item needs to be invalidated; however this
       # currently only occurs when an inner RemoteExecutor has the backend go
       # down.
-      self._cache = {}
+      self._cache.clear()
       raise
     type_spec.check_assignable_from(target_value.type_signature)
     return cached_value
@@ -311,7 +462,9 @@ class CachingExecutor(executor_base.Executor):
     identifier = CachedValueIdentifier('<{}>'.format(','.join(element_strings)))
     try:
       cached_value = self._cache[identifier]
+      self._num_hits += 1
     except KeyError:
+      self._num_misses += 1
       target_future = asyncio.ensure_future(
           self._target_executor.create_struct(
               structure.Struct(
@@ -325,7 +478,7 @@ class CachingExecutor(executor_base.Executor):
       # only the current cache item needs to be invalidated; however this
       # currently only occurs when an inner RemoteExecutor has the backend go
       # down.
-      self._cache = {}
+      self._cache.clear()
       raise
     type_spec.check_assignable_from(target_value.type_signature)
     return cached_value
@@ -345,7 +498,9 @@ class CachingExecutor(executor_base.Executor):
     identifier = CachedValueIdentifier(identifier_str)
     try:
       cached_value = self._cache[identifier]
+      self._num_hits += 1
     except KeyError:
+      self._num_misses += 1
       target_future = asyncio.ensure_future(
           self._target_executor.create_selection(
               source_val, index=index, name=name))
@@ -358,7 +513,7 @@ class CachingExecutor(executor_base.Executor):
       # only the current cache item needs to be invalidated; however this
       # currently only occurs when an inner RemoteExecutor has the backend go
       # down.
-      self._cache = {}
+      self._cache.clear()
       raise
     type_spec.check_assignable_from(target_value.type_signature)
     return cached_value
@@ -378,6 +378,53 @@ class CachingExecutorTest(absltest.TestCase):
     v3 = loop.run_until_complete(ex.create_value(10, tf.int32))
     self.assertIsNot(v3, v1)
 
+  def test_cache_stats_count_hits_and_misses(self):
+    ex, _ = _make_executor_and_tracer_for_test()
+    loop = asyncio.get_event_loop()
+    v1 = loop.run_until_complete(ex.create_value(10, tf.int32))
+    loop.run_until_complete(ex.create_value(10, tf.int32))
+    loop.run_until_complete(ex.create_struct([v1, v1]))
+    loop.run_until_complete(ex.create_struct([v1, v1]))
+    stats = ex.cache_stats
+    self.assertEqual(stats.hits, 2)
+    self.assertEqual(stats.misses, 2)
+    self.assertEqual(stats.evictions, 0)
+    self.assertGreater(stats.size_bytes, 0)
+
+  def test_cached_value_size_accounts_for_type_and_key(self):
+    ex, _ = _make_executor_and_tracer_for_test()
+    loop = asyncio.get_event_loop()
+    value = np.zeros([100], dtype=np.float32)
+    v1 = loop.run_until_complete(
+        ex.create_value(value, computation_types.TensorType(tf.float32, [100])))
+    # 400 bytes for the tensor itself, and 400 more for its hashable key.
+    self.assertGreaterEqual(v1.size_bytes, 800)
+    self.assertLess(v1.size_bytes, 1000)
+
+  def test_evicts_least_recently_used_values_over_byte_budget(self):
+    tracer = executor_test_utils.TracingExecutor(
+        eager_tf_executor.EagerTFExecutor())
+    ex = caching_executor.CachingExecutor(tracer, max_cache_size_bytes=2000)
+    loop = asyncio.get_event_loop()
+    type_spec = computation_types.TensorType(tf.float32, [100])
+    values = [np.full([100], i, dtype=np.float32) for i in range(3)]
+    v0 = loop.run_until_complete(ex.create_value(values[0], type_spec))
+    loop.run_until_complete(ex.create_value(values[1], type_spec))
+    loop.run_until_complete(ex.create_value(values[2], type_spec))
+    stats = ex.cache_stats
+    self.assertGreater(stats.evictions, 0)
+    self.assertLessEqual(stats.size_bytes, 2000)
+    # The first value was evicted, so creating it again is a miss.
+    v3 = loop.run_until_complete(ex.create_value(values[0], type_spec))
+    self.assertIsNot(v3, v0)
+    self.assertEqual(ex.cache_stats.hits, 0)
+    self.assertEqual(ex.cache_stats.misses, 4)
+
+  def test_raises_on_non_positive_cache_size(self):
+    with self.assertRaises(ValueError):
+      caching_executor.CachingExecutor(
+          eager_tf_executor.EagerTFExecutor(), max_cache_size_bytes=0)
+
   def test_with_integer_constant(self):
     ex, tracer = _make_executor_and_tracer_for_test()
     loop = asyncio.get_event_loop()
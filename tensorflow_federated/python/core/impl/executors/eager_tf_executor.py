@@ -13,9 +13,13 @@
 # limitations under the License.
 """A simple executor that operates synchronously in eager TensorFlow mode."""
 
+import hashlib
 import itertools
+import threading
+import time
 from typing import Any, Iterable, MutableMapping, Optional
 
+import attr
 import cachetools
 import tensorflow as tf
 
@@ -40,6 +44,110 @@ from tensorflow_federated.python.tensorflow_libs import graph_merge
 
 # Cache size here is simply heuristic, no formal analysis.
 _TF_FUNCTION_CACHE_SIZE = 100
+# The shared cache holds the functions of all the executors of a process.
+_SHARED_TF_FUNCTION_CACHE_SIZE = 1000
+
+
+@attr.s(frozen=True)
+class FunctionCacheStats(object):
+  """Counters describing the use of a `FunctionCache`.
+
+  Attributes:
+    hits: The number of lookups that found an embedded function.
+    misses: The number of lookups that found no embedded function.
+    size: The number of embedded functions currently cached.
+    instantiation_seconds: The total time spent embedding the cached functions.
+    seconds_saved: The total time the hits would have spent embedding their
+      function anew.
+  """
+  hits = attr.ib(type=int)
+  misses = attr.ib(type=int)
+  size = attr.ib(type=int)
+  instantiation_seconds = attr.ib(type=float)
+  seconds_saved = attr.ib(type=float)
+
+
+class FunctionCache(cachetools.LRUCache):
+  """A thread-safe LRU cache of embedded TensorFlow functions.
+
+  The cache obeys `dict` semantics, so that it can be used wherever a
+  `tf_function_cache` is expected, and can be shared by executors running on
+  different threads. Functions are keyed by a digest of their computation and
+  type, and by the name of the device they are placed on.
+  """
+
+  def __init__(self, maxsize: int):
+    super().__init__(maxsize)
+    self._lock = threading.RLock()
+    self._hits = 0
+    self._misses = 0
+    self._instantiation_seconds = {}
+    self._total_instantiation_seconds = 0.0
+    self._seconds_saved = 0.0
+
+  def __getitem__(self, key):
+    with self._lock:
+      return super().__getitem__(key)
+
+  def get(self, key, default=None):
+    # Only lookups through `get` are counted, since `cachetools` reads items
+    # with `[]` when evicting them.
+    with self._lock:
+      if key not in self:
+        self._misses += 1
+        return default
+      self._hits += 1
+      self._seconds_saved += self._instantiation_seconds.get(key, 0.0)
+      return self[key]
+
+  def __setitem__(self, key, value):
+    with self._lock:
+      super().__setitem__(key, value)
+
+  def __delitem__(self, key):
+    with self._lock:
+      super().__delitem__(key)
+      self._forget(key)
+
+  def popitem(self):
+    with self._lock:
+      key, value = super().popitem()
+      self._forget(key)
+      return key, value
+
+  def _forget(self, key):
+    self._total_instantiation_seconds -= self._instantiation_seconds.pop(
+        key, 0.0)
+
+  def put(self, key, value, instantiation_seconds: float):
+    """Caches `value`, which took `instantiation_seconds` to embed."""
+    with self._lock:
+      self[key] = value
+      self._forget(key)
+      self._instantiation_seconds[key] = instantiation_seconds
+      self._total_instantiation_seconds += instantiation_seconds
+
+  def stats(self) -> FunctionCacheStats:
+    with self._lock:
+      return FunctionCacheStats(
+          hits=self._hits,
+          misses=self._misses,
+          size=len(self),
+          instantiation_seconds=self._total_instantiation_seconds,
+          seconds_saved=self._seconds_saved)
+
+
+_shared_function_cache = None
+_shared_function_cache_lock = threading.Lock()
+
+
+def shared_function_cache() -> FunctionCache:
+  """Returns the `FunctionCache` shared by the executors of this process."""
+  global _shared_function_cache
+  with _shared_function_cache_lock:
+    if _shared_function_cache is None:
+      _shared_function_cache = FunctionCache(_SHARED_TF_FUNCTION_CACHE_SIZE)
+    return _shared_function_cache
 
 
 def _all_graph_def_nodes(
@@ -48,6 +156,52 @@ def _all_graph_def_nodes(
                          *[f.node_def for f in graph_def.library.function])
 
 
+def _creates_resources(comp: pb.Computation) -> bool:
+  """Returns whether `comp` creates TensorFlow resources, e.g. variables.
+
+  Such resources, which also include hash tables and other stateful ops, are
+  the nodes given a `shared_name` that `graph_merge.uniquify_shared_names`
+  makes unique on each import of the computation.
+
+  Args:
+    comp: An instance of `pb.Computation` holding a TensorFlow computation.
+  """
+  graph_def = serialization_utils.unpack_graph_def(comp.tensorflow.graph_def)
+  return any('shared_name' in node.attr
+             for node in _all_graph_def_nodes(graph_def))
+
+
+class _ExecutorFunctionCache(object):
+  """The embedded functions of an executor, sharing stateless ones.
+
+  The functions which create TensorFlow resources hold the state of these
+  resources, which must not be shared by executors that may call them
+  concurrently, e.g. the executors of different clients: one client could
+  otherwise reinitialize the variables of another mid-call. Each executor
+  caches its own instance of these functions, whose resources are unique to
+  it. The other functions are cached in a `FunctionCache` shared with other
+  executors.
+  """
+
+  def __init__(self, shared_cache: FunctionCache):
+    self._shared_cache = shared_cache
+    self._own_cache = FunctionCache(_TF_FUNCTION_CACHE_SIZE)
+
+  def get(self, key, default=None):
+    value = self._own_cache.get(key)
+    if value is None:
+      value = self._shared_cache.get(key, default)
+    return value
+
+  def put(self, key, value, instantiation_seconds: float,
+          creates_resources: bool):
+    """Caches `value`, in this executor's own cache if `creates_resources`."""
+    if creates_resources:
+      self._own_cache.put(key, value, instantiation_seconds)
+    else:
+      self._shared_cache.put(key, value, instantiation_seconds)
+
+
 def _check_dataset_reduce_in_multi_gpu(
     graph_def: tf.compat.v1.GraphDef) -> None:
   """Detect if ReduceDataset Op is used in a multi-GPU simulation."""
@@ -147,6 +301,7 @@ def _get_wrapped_function_from_comp(comp, must_pin_function_to_cpu, param_type,
   return wrapped_fn
 
 
+@tracing.trace
 def embed_tensorflow_computation(comp, type_spec=None, device=None):
   """Embeds a TensorFlow computation for use in the eager context.
 
@@ -294,14 +449,26 @@ def _to_computation_internal_rep(*, value: pb.Computation,
                                  type_spec: computation_types.StructType,
                                  device: tf.config.LogicalDevice):
   """Converts a `pb.Computation` to a `tf.function`."""
-  key = (value.SerializeToString(deterministic=True),
-         type_serialization.serialize_type(type_spec).SerializeToString(
-             deterministic=True), device.name if device else None)
+  digest = hashlib.sha256(value.SerializeToString(deterministic=True))
+  digest.update(
+      type_serialization.serialize_type(type_spec).SerializeToString(
+          deterministic=True))
+  key = (digest.digest(), device.name if device else None)
   cached_fn = tf_function_cache.get(key)
   if cached_fn is not None:
     return cached_fn
+  start_time = time.perf_counter()
   embedded_fn = embed_tensorflow_computation(value, type_spec, device)
-  tf_function_cache[key] = embedded_fn
+  if isinstance(tf_function_cache, _ExecutorFunctionCache):
+    tf_function_cache.put(
+        key,
+        embedded_fn,
+        time.perf_counter() - start_time,
+        creates_resources=_creates_resources(value))
+  elif isinstance(tf_function_cache, FunctionCache):
+    tf_function_cache.put(key, embedded_fn, time.perf_counter() - start_time)
+  else:
+    tf_function_cache[key] = embedded_fn
   return embedded_fn
 
 
@@ -507,7 +674,7 @@ class EagerTFExecutor(executor_base.Executor):
   executors into a complex executor stack, rather than mixing in all the logic.
   """
 
-  def __init__(self, device=None):
+  def __init__(self, device=None, tf_function_cache=None):
     """Creates a new instance of an eager executor.
 
     Args:
@@ -515,10 +682,18 @@ class EagerTFExecutor(executor_base.Executor):
         schedule all of its operations to run on. For example, the list of
         logical devices can be obtained using
         `tf.config.list_logical_devices()`.
+      tf_function_cache: An optional `FunctionCache` of embedded TensorFlow
+        functions, which may be shared with other executors, such as the one
+        returned by `shared_function_cache()`. Functions which create
+        TensorFlow resources, such as variables, are never shared, since
+        executors may call them concurrently; the executor caches these on its
+        own. By default, the executor caches all the functions it embeds on its
+        own.
 
     Raises:
       RuntimeError: If not executing eagerly.
-      TypeError: If the device is not a `tf.config.LogicalDevice`.
+      TypeError: If the device is not a `tf.config.LogicalDevice`, or if
+        `tf_function_cache` is not a `FunctionCache`.
       ValueError: If there is no device `device`.
     """
     if not tf.executing_eagerly():
@@ -528,7 +703,12 @@ class EagerTFExecutor(executor_base.Executor):
       self._device = device
     else:
       self._device = None
-    self._tf_function_cache = cachetools.LRUCache(_TF_FUNCTION_CACHE_SIZE)
+    if tf_function_cache is None:
+      tf_function_cache = FunctionCache(_TF_FUNCTION_CACHE_SIZE)
+    else:
+      py_typecheck.check_type(tf_function_cache, FunctionCache)
+      tf_function_cache = _ExecutorFunctionCache(tf_function_cache)
+    self._tf_function_cache = tf_function_cache
 
   @tracing.trace(span=True)
   async def create_value(self, value, type_spec=None):
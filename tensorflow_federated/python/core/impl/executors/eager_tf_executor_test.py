@@ -14,6 +14,7 @@
 
 import asyncio
 import collections
+from concurrent import futures
 from typing import Optional
 from absl.testing import parameterized
 
@@ -724,6 +725,94 @@ class EagerTFExecutorTest(tf.test.TestCase, parameterized.TestCase):
 
     self.assertEqual(result, 10)
 
+  def test_executor_construction_fails_with_dict_function_cache(self):
+    with self.assertRaises(TypeError):
+      eager_tf_executor.EagerTFExecutor(tf_function_cache={})
+
+
+class FunctionCacheTest(tf.test.TestCase):
+
+  def test_executors_sharing_cache_embed_computation_once(self):
+    cache = eager_tf_executor.FunctionCache(10)
+    loop = asyncio.get_event_loop()
+
+    @computations.tf_computation(tf.int32)
+    def comp(x):
+      return tf.add(x, 1)
+
+    for _ in range(3):
+      ex = eager_tf_executor.EagerTFExecutor(tf_function_cache=cache)
+      fn = loop.run_until_complete(ex.create_value(comp))
+      arg = loop.run_until_complete(ex.create_value(10, tf.int32))
+      result = loop.run_until_complete(ex.create_call(fn, arg))
+      self.assertEqual(loop.run_until_complete(result.compute()), 11)
+
+    stats = cache.stats()
+    self.assertEqual(stats.misses, 1)
+    self.assertEqual(stats.hits, 2)
+    self.assertEqual(stats.size, 1)
+    self.assertGreater(stats.instantiation_seconds, 0.0)
+    self.assertAlmostEqual(stats.seconds_saved,
+                           2 * stats.instantiation_seconds)
+
+  def test_executors_sharing_cache_isolate_variables_of_concurrent_calls(self):
+    cache = eager_tf_executor.FunctionCache(10)
+    num_steps = 100
+
+    @computations.tf_computation(tf.int32)
+    def accumulate(x):
+      accumulator = tf.Variable(0)
+
+      def _body(i):
+        with tf.control_dependencies([accumulator.assign_add(x)]):
+          return i + 1
+
+      steps = tf.while_loop(lambda i: i < num_steps, _body, [tf.constant(0)])
+      with tf.control_dependencies(tf.nest.flatten(steps)):
+        return accumulator.read_value()
+
+    def _accumulate_in_new_executor(x):
+      loop = asyncio.new_event_loop()
+      try:
+        ex = eager_tf_executor.EagerTFExecutor(tf_function_cache=cache)
+        results = []
+        for _ in range(10):
+          fn = loop.run_until_complete(ex.create_value(accumulate))
+          arg = loop.run_until_complete(ex.create_value(x, tf.int32))
+          result = loop.run_until_complete(ex.create_call(fn, arg))
+          results.append(loop.run_until_complete(result.compute()).numpy())
+        return results
+      finally:
+        loop.close()
+
+    args = [1, 2, 3, 4]
+    with futures.ThreadPoolExecutor(max_workers=len(args)) as pool:
+      results = list(pool.map(_accumulate_in_new_executor, args))
+
+    for x, results_for_x in zip(args, results):
+      self.assertEqual(results_for_x, [num_steps * x] * 10)
+    # The function creates a variable, so each executor embeds its own.
+    self.assertEqual(cache.stats().size, 0)
+
+  def test_evicts_least_recently_used_function(self):
+    cache = eager_tf_executor.FunctionCache(2)
+    cache.put('a', 1, instantiation_seconds=1.0)
+    cache.put('b', 2, instantiation_seconds=2.0)
+    self.assertEqual(cache.get('a'), 1)
+    cache.put('c', 3, instantiation_seconds=4.0)
+    self.assertNotIn('b', cache)
+    self.assertIsNone(cache.get('b'))
+    stats = cache.stats()
+    self.assertEqual(stats.hits, 1)
+    self.assertEqual(stats.misses, 1)
+    self.assertEqual(stats.size, 2)
+    self.assertEqual(stats.instantiation_seconds, 5.0)
+    self.assertEqual(stats.seconds_saved, 1.0)
+
+  def test_shared_function_cache_is_singleton(self):
+    self.assertIs(eager_tf_executor.shared_function_cache(),
+                  eager_tf_executor.shared_function_cache())
+
 
 if __name__ == '__main__':
   tf.test.main()
@@ -14,9 +14,15 @@
 """A context for execution based on an embedded executor instance."""
 
 import asyncio
+import collections
 import contextlib
-from typing import Any, Callable, Optional
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Optional
 
+from absl import logging
+import attr
 import retrying
 import tensorflow as tf
 
@@ -137,18 +143,161 @@ def _unwrap_execution_context_value(val):
     return val
 
 
+@attr.s(frozen=True)
+class InvocationProfile(object):
+  """A breakdown of the cost of one call to `ExecutionContext.invoke`.
+
+  Attributes:
+    compile_seconds: The time spent compiling the computation.
+    ingest_seconds: The time spent embedding the argument in the executor.
+    invoke_seconds: The time spent creating and computing the call.
+    intrinsic_seconds: A `dict` from the name of each federated intrinsic, such
+      as `federated_map`, to the total time spent in its outermost calls.
+      Concurrent calls each count in full.
+    intrinsic_calls: A `dict` from the name of each federated intrinsic to the
+      number of its outermost calls.
+    serialized_bytes: The size of the values serialized by the executors, such
+      as to be sent to remote workers.
+    deserialized_bytes: The size of the values deserialized by the executors in
+      this process.
+    num_tf_function_instantiations: The number of TensorFlow computations
+      embedded as eager functions, which excludes reused cached functions.
+    peak_python_memory_bytes: The peak size of the memory allocated by Python
+      during the invocation, as traced by `tracemalloc`, which excludes the
+      buffers of tensors.
+  """
+  compile_seconds = attr.ib(type=float)
+  ingest_seconds = attr.ib(type=float)
+  invoke_seconds = attr.ib(type=float)
+  intrinsic_seconds = attr.ib(type=Dict[str, float])
+  intrinsic_calls = attr.ib(type=Dict[str, int])
+  serialized_bytes = attr.ib(type=int)
+  deserialized_bytes = attr.ib(type=int)
+  num_tf_function_instantiations = attr.ib(type=int)
+  peak_python_memory_bytes = attr.ib(type=int)
+
+
+_INTRINSIC_SPAN_PREFIX = 'compute_federated_'
+
+
+def _span_kind(scope: str, sub_scope: str) -> Optional[str]:
+  """Returns the kind of the profiled span, or `None` if it is not profiled."""
+  if sub_scope.startswith(_INTRINSIC_SPAN_PREFIX):
+    return 'intrinsic'
+  elif scope == 'executor_serialization' and sub_scope in ('serialize_value',
+                                                           'deserialize_value'):
+    return sub_scope
+  elif sub_scope == 'embed_tensorflow_computation':
+    return sub_scope
+  return None
+
+
+class _ProfilingTracingProvider(tracing.TracingProvider):
+  """Accumulates the spans of an invocation into an `InvocationProfile`.
+
+  Only the outermost span of each kind is recorded, so that intrinsics
+  delegated to nested federating executors, or values serialized recursively,
+  are counted once. The provider yields the kinds of the enclosing spans.
+  """
+
+  def __init__(self):
+    super().__init__()
+    self._lock = threading.Lock()
+    self._recording = False
+    self._started_tracemalloc = False
+    self._reset()
+
+  def _reset(self):
+    self._intrinsic_seconds = collections.defaultdict(float)
+    self._intrinsic_calls = collections.defaultdict(int)
+    self._serialized_bytes = 0
+    self._deserialized_bytes = 0
+    self._num_tf_function_instantiations = 0
+
+  def start(self):
+    """Starts recording the spans of an invocation."""
+    with self._lock:
+      self._reset()
+      self._recording = True
+    if tracemalloc.is_tracing():
+      self._started_tracemalloc = False
+      # Python 3.9 and later can measure the peak from here on.
+      if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+    else:
+      self._started_tracemalloc = True
+      tracemalloc.start()
+
+  def stop(self, compile_seconds: float, ingest_seconds: float,
+           invoke_seconds: float) -> InvocationProfile:
+    """Stops recording, and returns the profile of the invocation."""
+    _, peak_python_memory_bytes = tracemalloc.get_traced_memory()
+    if self._started_tracemalloc:
+      tracemalloc.stop()
+    with self._lock:
+      self._recording = False
+      return InvocationProfile(
+          compile_seconds=compile_seconds,
+          ingest_seconds=ingest_seconds,
+          invoke_seconds=invoke_seconds,
+          intrinsic_seconds=dict(self._intrinsic_seconds),
+          intrinsic_calls=dict(self._intrinsic_calls),
+          serialized_bytes=self._serialized_bytes,
+          deserialized_bytes=self._deserialized_bytes,
+          num_tf_function_instantiations=self._num_tf_function_instantiations,
+          peak_python_memory_bytes=peak_python_memory_bytes)
+
+  def span(self, scope, sub_scope, nonce, parent_span_yield, fn_args,
+           fn_kwargs, trace_opts):
+    del nonce, fn_kwargs, trace_opts
+    enclosing_kinds = parent_span_yield or frozenset()
+    kind = _span_kind(scope, sub_scope)
+    if (not self._recording or kind is None or kind in enclosing_kinds):
+      yield parent_span_yield
+      return
+    start_time = time.perf_counter()
+    result = yield enclosing_kinds | {kind}
+    elapsed_seconds = time.perf_counter() - start_time
+    with self._lock:
+      if not self._recording:
+        return
+      if kind == 'intrinsic':
+        intrinsic = sub_scope[len('compute_'):]
+        self._intrinsic_seconds[intrinsic] += elapsed_seconds
+        self._intrinsic_calls[intrinsic] += 1
+      elif kind == 'embed_tensorflow_computation':
+        self._num_tf_function_instantiations += 1
+      elif kind == 'deserialize_value':
+        if fn_args:
+          self._deserialized_bytes += fn_args[0].ByteSize()
+      elif isinstance(result, tracing.TracedFunctionReturned):
+        value_proto, _ = result.value
+        self._serialized_bytes += value_proto.ByteSize()
+
+
 class ExecutionContext(context_base.Context):
   """Represents an execution context backed by an `executor_base.Executor`."""
 
   def __init__(self,
                executor_fn: executor_factory.ExecutorFactory,
                compiler_fn: Optional[Callable[[computation_base.Computation],
-                                              Any]] = None):
+                                              Any]] = None,
+               compilation_cache_dir: Optional[str] = None,
+               profile: bool = False):
     """Initializes an execution context.
 
     Args:
       executor_fn: Instance of `executor_factory.ExecutorFactory`.
       compiler_fn: A Python function that will be used to compile a computation.
+      compilation_cache_dir: An optional path to a local directory in which
+        compiled computations are persisted across processes, see
+        `compiler_pipeline.CompilerPipeline`. Ignored if `compiler_fn` is
+        `None`.
+      profile: Whether to profile every invocation. The `InvocationProfile` of
+        the latest invocation is logged and available as `last_profile`.
+        Profiling installs a global `tracing.TracingProvider` for the duration
+        of each invocation, and traces the memory allocated by Python, which
+        slows down execution.
     """
     py_typecheck.check_type(executor_fn, executor_factory.ExecutorFactory)
     self._executor_factory = executor_fn
@@ -158,14 +307,25 @@ class ExecutionContext(context_base.Context):
         tracing.propagate_trace_context_task_factory)
     if compiler_fn is not None:
       py_typecheck.check_callable(compiler_fn)
-      self._compiler_pipeline = compiler_pipeline.CompilerPipeline(compiler_fn)
+      self._compiler_pipeline = compiler_pipeline.CompilerPipeline(
+          compiler_fn, cache_dir=compilation_cache_dir)
     else:
       self._compiler_pipeline = None
+    if profile:
+      self._profiler = _ProfilingTracingProvider()
+    else:
+      self._profiler = None
+    self._last_profile = None
 
   @property
   def executor_factory(self):
     return self._executor_factory
 
+  @property
+  def last_profile(self) -> Optional[InvocationProfile]:
+    """The profile of the latest invocation, if profiling is enabled."""
+    return self._last_profile
+
   def ingest(self, val, type_spec):
     return ExecutionContextValue(val, type_spec)
 
@@ -176,6 +336,32 @@ class ExecutionContext(context_base.Context):
       wait_jitter_max=1000  # in milliseconds
   )
   def invoke(self, comp, arg):
+    if self._profiler is None:
+      return self._invoke(comp, arg, collections.defaultdict(float))
+    self._profiler.start()
+    tracing.add_tracing_provider(self._profiler)
+    seconds = collections.defaultdict(float)
+    try:
+      return self._invoke(comp, arg, seconds)
+    finally:
+      tracing.remove_tracing_provider(self._profiler)
+      self._last_profile = self._profiler.stop(
+          compile_seconds=seconds['compile'],
+          ingest_seconds=seconds['ingest'],
+          invoke_seconds=seconds['invoke'])
+      logging.info('Invocation profile: %s', self._last_profile)
+
+  def _invoke(self, comp, arg, seconds: Dict[str, float]):
+    """Invokes `comp` on `arg`, adding the time of each step to `seconds`."""
+
+    @contextlib.contextmanager
+    def timed(step):
+      start_time = time.perf_counter()
+      try:
+        yield
+      finally:
+        seconds[step] += time.perf_counter() - start_time
+
     comp.type_signature.check_function()
     # Save the type signature before compiling. Compilation currently loses
     # container types, so we must remember them here so that they can be
@@ -183,7 +369,8 @@ class ExecutionContext(context_base.Context):
     result_type = comp.type_signature.result
     if self._compiler_pipeline is not None:
       with tracing.span('ExecutionContext', 'Compile', span=True):
-        comp = self._compiler_pipeline.compile(comp)
+        with timed('compile'):
+          comp = self._compiler_pipeline.compile(comp)
 
     with tracing.span('ExecutionContext', 'Invoke', span=True):
 
@@ -208,10 +395,12 @@ class ExecutionContext(context_base.Context):
         py_typecheck.check_type(executor, executor_base.Executor)
 
         if arg is not None:
-          arg = self._event_loop.run_until_complete(
-              tracing.wrap_coroutine_in_current_trace_context(
-                  _ingest(executor, unwrapped_arg, arg.type_signature)))
+          with timed('ingest'):
+            arg = self._event_loop.run_until_complete(
+                tracing.wrap_coroutine_in_current_trace_context(
+                    _ingest(executor, unwrapped_arg, arg.type_signature)))
 
-        return self._event_loop.run_until_complete(
-            tracing.wrap_coroutine_in_current_trace_context(
-                _invoke(executor, comp, arg, result_type)))
+        with timed('invoke'):
+          return self._event_loop.run_until_complete(
+              tracing.wrap_coroutine_in_current_trace_context(
+                  _invoke(executor, comp, arg, result_type)))
@@ -19,9 +19,11 @@ from absl.testing import parameterized
 import numpy as np
 import tensorflow as tf
 
+from tensorflow_federated.python.common_libs import tracing
 from tensorflow_federated.python.core.api import computation_types
 from tensorflow_federated.python.core.api import computations
 from tensorflow_federated.python.core.api import intrinsics
+from tensorflow_federated.python.core.impl.context_stack import context_stack_impl
 from tensorflow_federated.python.core.impl.executors import execution_context
 from tensorflow_federated.python.core.impl.executors import executor_stacks
 from tensorflow_federated.python.core.impl.executors import executor_test_utils
@@ -181,5 +183,61 @@ class ExecutionContextIntegrationTest(parameterized.TestCase):
         comp([five_ints, ten_ints])
 
 
+class ExecutionContextProfilingTest(absltest.TestCase):
+
+  def test_profiles_invocation(self):
+
+    @computations.tf_computation(tf.int32)
+    def add_one(x):
+      return x + 1
+
+    @computations.federated_computation(computation_types.at_clients(tf.int32))
+    def comp(x):
+      return intrinsics.federated_map(add_one, x)
+
+    context = execution_context.ExecutionContext(
+        executor_stacks.local_executor_factory(), profile=True)
+    self.assertIsNone(context.last_profile)
+    with context_stack_impl.context_stack.install(context):
+      result = comp([1, 2, 3])
+
+    self.assertEqual(result, [2, 3, 4])
+    profile = context.last_profile
+    self.assertIsInstance(profile, execution_context.InvocationProfile)
+    self.assertEqual(profile.compile_seconds, 0.0)
+    self.assertGreater(profile.ingest_seconds, 0.0)
+    self.assertGreater(profile.invoke_seconds, 0.0)
+    self.assertEqual(profile.intrinsic_calls, {'federated_map': 1})
+    self.assertGreater(profile.intrinsic_seconds['federated_map'], 0.0)
+    self.assertGreaterEqual(profile.num_tf_function_instantiations, 1)
+    self.assertGreater(profile.peak_python_memory_bytes, 0)
+
+  def test_profiling_does_not_leave_tracing_provider_installed(self):
+
+    @computations.tf_computation
+    def comp():
+      return tf.constant(10)
+
+    context = execution_context.ExecutionContext(
+        executor_stacks.local_executor_factory(), profile=True)
+    providers_before = list(tracing._global_tracing_providers)  # pylint: disable=protected-access
+    with context_stack_impl.context_stack.install(context):
+      self.assertEqual(comp(), 10)
+    self.assertIsNotNone(context.last_profile)
+    self.assertEqual(tracing._global_tracing_providers, providers_before)  # pylint: disable=protected-access
+
+  def test_does_not_profile_by_default(self):
+
+    @computations.tf_computation
+    def comp():
+      return tf.constant(10)
+
+    context = execution_context.ExecutionContext(
+        executor_stacks.local_executor_factory())
+    with context_stack_impl.context_stack.install(context):
+      self.assertEqual(comp(), 10)
+    self.assertIsNone(context.last_profile)
+
+
 if __name__ == '__main__':
   absltest.main()
@@ -16,7 +16,7 @@
 import os
 import os.path
 import tempfile
-from typing import Any, Collection, Optional, List, Mapping, Tuple, Union
+from typing import Any, Collection, Dict, Optional, List, Mapping, Tuple, Union
 import zipfile
 
 import numpy as np
@@ -45,6 +45,22 @@ _DeserializeReturnType = Tuple[Any, computation_types.Type]
 # variables from the graph.
 _DEFAULT_MAX_SERIALIZED_SEQUENCE_SIZE_BYTES = 20 * (1024**2)  # 20 MB
 
+# The maximum number of runs of equally shaped elements of a materialized
+# sequence. Each run is deserialized as a dataset of its own and concatenated to
+# the previous ones, so datasets whose element shapes vary more often are saved
+# to disk instead.
+_MAX_SERIALIZED_SEQUENCE_CHUNKS = 8
+
+# Numpy arrays at least this large are serialized as raw buffers, which avoids
+# the copies made converting to and from `tf.TensorProto`. Smaller values keep
+# the `tf.TensorProto` encoding, for which the conversion cost is negligible.
+_RAW_TENSOR_MIN_SIZE_BYTES = 1024
+
+# The largest message sent as a whole on the `Execute` stream. Larger requests
+# and responses are split into `executor_pb2.ExecuteChunk`s of this size, which
+# keeps each message well below gRPC's default 4MB limit.
+DEFAULT_STREAM_CHUNK_SIZE_BYTES = 1024**2  # 1 MB
+
 
 class DatasetSerializationError(Exception):
   """Error raised during Dataset serialization or deserialization."""
@@ -84,6 +100,11 @@ def _serialize_tensor_value(
   """
   if isinstance(value, tf.Tensor):
     value = value.numpy()
+  if (isinstance(value, np.ndarray) and
+      value.nbytes >= _RAW_TENSOR_MIN_SIZE_BYTES and
+      _is_raw_tensor_dtype(type_spec.dtype) and
+      value.dtype == type_spec.dtype.as_numpy_dtype):
+    return _serialize_raw_tensor_value(value, type_spec)
   if isinstance(value, np.ndarray):
     tensor_proto = tf.make_tensor_proto(
         value, dtype=type_spec.dtype, verify_shape=False)
@@ -99,6 +120,39 @@ def _serialize_tensor_value(
   return executor_pb2.Value(tensor=any_pb), type_spec
 
 
+def _is_raw_tensor_dtype(dtype: tf.dtypes.DType) -> bool:
+  """Returns whether tensors of `dtype` can be serialized as raw buffers."""
+  return dtype.is_numpy_compatible and dtype != tf.string
+
+
+@tracing.trace
+def _serialize_raw_tensor_value(
+    value: np.ndarray,
+    type_spec: computation_types.TensorType) -> _SerializeReturnType:
+  """Serializes a Numpy array into an `executor_pb2.Value.RawTensor`.
+
+  Args:
+    value: A Numpy array of a dtype for which `_is_raw_tensor_dtype` holds.
+    type_spec: A `tff.TensorType`.
+
+  Returns:
+    A tuple `(value_proto, type_spec)` in which `value_proto` is an instance
+    of `executor_pb2.Value` with the serialized content of `value`, and
+    `type_spec` is the type of the serialized value.
+
+  Raises:
+    TypeError: If `value` is not assignable to `type_spec`.
+  """
+  dtype = tf.dtypes.as_dtype(value.dtype)
+  type_spec.check_assignable_from(
+      computation_types.TensorType(dtype=dtype, shape=value.shape))
+  # The content is little-endian regardless of the byte order of this host.
+  content = value.astype(value.dtype.newbyteorder('<'), copy=False).tobytes()
+  raw_tensor = executor_pb2.Value.RawTensor(
+      dtype=dtype.name, shape=value.shape, content=content)
+  return executor_pb2.Value(raw_tensor=raw_tensor), type_spec
+
+
 def _serialize_dataset(
     dataset,
     max_serialized_size_bytes=_DEFAULT_MAX_SERIALIZED_SEQUENCE_SIZE_BYTES):
@@ -152,6 +206,86 @@ def _serialize_dataset(
   return zip_bytes
 
 
+def _serialize_dataset_elements(
+    dataset,
+    max_serialized_size_bytes=_DEFAULT_MAX_SERIALIZED_SEQUENCE_SIZE_BYTES
+) -> Optional[executor_pb2.Value.Sequence.Elements]:
+  """Serializes the materialized elements of a `tf.data.Dataset`.
+
+  Only non-empty datasets of numeric tensors (or structures of such tensors)
+  whose cardinality is known to be finite can be materialized. Consecutive
+  elements whose tensors have the same shapes are stacked, so that each run of
+  such elements is serialized as a single tensor per component. Datasets with
+  more than `_MAX_SERIALIZED_SEQUENCE_CHUNKS` such runs are not materialized.
+
+  Note that the elements are materialized by iterating over `dataset` once, so
+  the deserialized dataset yields them in the same order on every iteration.
+  For example, a dataset shuffled with `reshuffle_each_iteration=True` is
+  reshuffled each time it is serialized, but not when the deserialized dataset
+  is iterated over several times.
+
+  Args:
+    dataset: A `tf.data.Dataset`.
+    max_serialized_size_bytes: An `int` size in bytes. Datasets whose elements
+      take up more memory than this are not materialized.
+
+  Returns:
+    An instance of `executor_pb2.Value.Sequence.Elements`, or `None` if the
+    dataset cannot be materialized, in which case the caller should fall back
+    to `_serialize_dataset`.
+  """
+  if not tf.executing_eagerly():
+    return None
+  # The sizes of string tensors cannot be measured from their Numpy arrays,
+  # which hold Python objects.
+  if not all(
+      isinstance(spec, tf.TensorSpec) and spec.dtype != tf.string
+      for spec in tf.nest.flatten(dataset.element_spec)):
+    return None
+  cardinality = int(tf.data.experimental.cardinality(dataset))
+  if cardinality <= 0:
+    # Covers empty, infinite and unknown cardinality datasets alike.
+    return None
+  specs = tf.nest.flatten(dataset.element_spec)
+  if all(spec.shape.is_fully_defined() for spec in specs):
+    # The size is known without iterating over the dataset.
+    element_size_bytes = sum(
+        spec.shape.num_elements() * spec.dtype.size for spec in specs)
+    if cardinality * element_size_bytes > max_serialized_size_bytes:
+      return None
+
+  runs = []
+  run_shapes = None
+  size_bytes = 0
+  for element in dataset:
+    flat_element = [t.numpy() for t in tf.nest.flatten(element)]
+    size_bytes += sum(x.nbytes for x in flat_element)
+    if size_bytes > max_serialized_size_bytes:
+      return None
+    shapes = [x.shape for x in flat_element]
+    if shapes != run_shapes:
+      if len(runs) == _MAX_SERIALIZED_SEQUENCE_CHUNKS:
+        return None
+      runs.append([])
+      run_shapes = shapes
+    runs[-1].append(flat_element)
+
+  chunks = []
+  for run in runs:
+    stacked_tensors = []
+    for component in zip(*run):
+      stacked = np.stack(component)
+      stacked_proto, _ = _serialize_tensor_value(
+          stacked,
+          computation_types.TensorType(
+              tf.dtypes.as_dtype(stacked.dtype), stacked.shape))
+      stacked_tensors.append(stacked_proto)
+    chunks.append(
+        executor_pb2.Value.Sequence.Elements.Chunk(
+            stacked_tensor=stacked_tensors))
+  return executor_pb2.Value.Sequence.Elements(chunk=chunks)
+
+
 @tracing.trace
 def _serialize_sequence_value(
     value: Union[type_conversions.TF_DATASET_REPRESENTATION_TYPES],
@@ -186,11 +320,19 @@ def _serialize_sequence_value(
   # `collections.abc.Mapping` type. This allows TFF to preserve and restore the
   # key ordering upon deserialization.
   element_type = computation_types.to_type(value.element_spec)
-  return executor_pb2.Value(
-      sequence=executor_pb2.Value.Sequence(
-          zipped_saved_model=_serialize_dataset(value),
-          element_type=type_serialization.serialize_type(
-              element_type))), type_spec
+  serialized_element_type = type_serialization.serialize_type(element_type)
+  # Materializing the elements in memory is much cheaper than saving the
+  # dataset to disk; the SavedModel path covers the datasets that cannot be
+  # materialized (e.g. infinite ones).
+  elements = _serialize_dataset_elements(value)
+  if elements is not None:
+    sequence_proto = executor_pb2.Value.Sequence(
+        elements=elements, element_type=serialized_element_type)
+  else:
+    sequence_proto = executor_pb2.Value.Sequence(
+        zipped_saved_model=_serialize_dataset(value),
+        element_type=serialized_element_type)
+  return executor_pb2.Value(sequence=sequence_proto), type_spec
 
 
 @tracing.trace
@@ -328,6 +470,47 @@ def _deserialize_tensor_value(
   return tensor_value, value_type
 
 
+@tracing.trace
+def _deserialize_raw_tensor_value(
+    value_proto: executor_pb2.Value) -> _DeserializeReturnType:
+  """Deserializes a tensor value from an `executor_pb2.Value.RawTensor`.
+
+  The elements are not copied: the returned Numpy array is a read-only view
+  over the bytes held by `value_proto`.
+
+  Args:
+    value_proto: An instance of `executor_pb2.Value`.
+
+  Returns:
+    A tuple `(value, type_spec)`, where `value` is a Numpy array that represents
+    the deserialized value, and `type_spec` is an instance of `tff.TensorType`
+    that represents its type.
+
+  Raises:
+    ValueError: If the value is malformed.
+  """
+  which_value = value_proto.WhichOneof('value')
+  if which_value != 'raw_tensor':
+    raise ValueError('Not a raw tensor value: {}'.format(which_value))
+
+  raw_tensor = value_proto.raw_tensor
+  dtype = tf.dtypes.as_dtype(raw_tensor.dtype)
+  shape = tuple(raw_tensor.shape)
+  num_elements = int(np.prod(shape, dtype=np.int64))
+  element_size = np.dtype(dtype.as_numpy_dtype).itemsize
+  if len(raw_tensor.content) != num_elements * element_size:
+    raise ValueError(
+        'Expected {} bytes for a raw tensor of dtype {} and shape {}, found '
+        '{}.'.format(num_elements * element_size, dtype.name, shape,
+                     len(raw_tensor.content)))
+
+  little_endian_dtype = np.dtype(dtype.as_numpy_dtype).newbyteorder('<')
+  tensor_value = np.frombuffer(
+      raw_tensor.content, dtype=little_endian_dtype).reshape(shape)
+  value_type = computation_types.TensorType(dtype=dtype, shape=shape)
+  return tensor_value, value_type
+
+
 def _deserialize_dataset(serialized_bytes):
   """Deserializes a `bytes` object to a `tf.data.Dataset`.
 
@@ -367,6 +550,37 @@ def _deserialize_dataset(serialized_bytes):
   return ds
 
 
+def _deserialize_dataset_elements(
+    elements_proto: executor_pb2.Value.Sequence.Elements,
+    element_type: computation_types.Type):
+  """Deserializes materialized elements to a `tf.data.Dataset`.
+
+  Args:
+    elements_proto: An instance of `executor_pb2.Value.Sequence.Elements`
+      produced by `_serialize_dataset_elements`.
+    element_type: The `tff.Type` of the elements of the dataset.
+
+  Returns:
+    A `tf.data.Dataset` instance.
+
+  Raises:
+    ValueError: If `elements_proto` holds no elements.
+  """
+  if not elements_proto.chunk:
+    raise ValueError('Cannot deserialize a sequence without elements.')
+  tf_structure = type_conversions.type_to_tf_structure(element_type)
+  ds = None
+  for chunk in elements_proto.chunk:
+    stacked_tensors = [
+        deserialize_value(stacked_proto)[0]
+        for stacked_proto in chunk.stacked_tensor
+    ]
+    chunk_ds = tf.data.Dataset.from_tensor_slices(
+        tf.nest.pack_sequence_as(tf_structure, stacked_tensors))
+    ds = chunk_ds if ds is None else ds.concatenate(chunk_ds)
+  return ds
+
+
 @tracing.trace
 def _deserialize_sequence_value(
     sequence_value_proto: executor_pb2.Value.Sequence
@@ -379,17 +593,20 @@ def _deserialize_sequence_value(
   Returns:
     A tuple of `(tf.data.Dataset, tff.Type)`.
   """
+  element_type = type_serialization.deserialize_type(
+      sequence_value_proto.element_type)
+
   which_value = sequence_value_proto.WhichOneof('value')
   if which_value == 'zipped_saved_model':
     ds = _deserialize_dataset(sequence_value_proto.zipped_saved_model)
+  elif which_value == 'elements':
+    ds = _deserialize_dataset_elements(sequence_value_proto.elements,
+                                       element_type)
   else:
     raise NotImplementedError(
         'Deserializing Sequences enocded as {!s} has not been implemented'
         .format(which_value))
 
-  element_type = type_serialization.deserialize_type(
-      sequence_value_proto.element_type)
-
   # If a serialized dataset had elements of nested structes of tensors (e.g.
   # `dict`, `OrderedDict`), the deserialized dataset will return `dict`,
   # `tuple`, or `namedtuple` (loses `collections.OrderedDict` in a conversion).
@@ -461,6 +678,8 @@ def deserialize_value(
   which_value = value_proto.WhichOneof('value')
   if which_value == 'tensor':
     return _deserialize_tensor_value(value_proto)
+  elif which_value == 'raw_tensor':
+    return _deserialize_raw_tensor_value(value_proto)
   elif which_value == 'computation':
     return _deserialize_computation(value_proto)
   elif which_value == 'sequence':
@@ -499,3 +718,88 @@ def deserialize_cardinalities(
         cardinality_spec.placement.uri)
     cardinalities_dict[literal] = cardinality_spec.cardinality
   return cardinalities_dict
+
+
+_StreamMessage = Union[executor_pb2.ExecuteRequest,
+                       executor_pb2.ExecuteResponse]
+
+
+def split_into_chunks(
+    message: _StreamMessage,
+    chunk_size_bytes: int = DEFAULT_STREAM_CHUNK_SIZE_BYTES
+) -> List[_StreamMessage]:
+  """Splits a message on the `Execute` stream into `ExecuteChunk`s.
+
+  Args:
+    message: An instance of `executor_pb2.ExecuteRequest` or
+      `executor_pb2.ExecuteResponse`, with its `sequence_number` already set.
+    chunk_size_bytes: The maximum number of serialized bytes per chunk.
+
+  Returns:
+    A list of messages of the same type as `message`, to be sent in order. This
+    is `[message]` if `message` is no larger than `chunk_size_bytes`.
+
+  Raises:
+    ValueError: If `chunk_size_bytes` is not positive.
+  """
+  py_typecheck.check_type(
+      message, (executor_pb2.ExecuteRequest, executor_pb2.ExecuteResponse))
+  if chunk_size_bytes < 1:
+    raise ValueError('Chunks must hold at least one byte, found {}.'.format(
+        chunk_size_bytes))
+  if message.ByteSize() <= chunk_size_bytes:
+    return [message]
+  content = memoryview(message.SerializeToString())
+  message_type = type(message)
+  chunks = []
+  for start in range(0, len(content), chunk_size_bytes):
+    end = start + chunk_size_bytes
+    chunks.append(
+        message_type(
+            chunk=executor_pb2.ExecuteChunk(
+                content=content[start:end].tobytes(),
+                is_last=end >= len(content)),
+            sequence_number=message.sequence_number))
+  return chunks
+
+
+class ChunkAssembler:
+  """Reassembles messages split into chunks by `split_into_chunks`.
+
+  Not thread-safe; each receiving end of a stream should own an instance.
+  """
+
+  def __init__(self, message_type):
+    """Creates an assembler for messages of `message_type`.
+
+    Args:
+      message_type: Either `executor_pb2.ExecuteRequest` or
+        `executor_pb2.ExecuteResponse`.
+    """
+    if message_type not in (executor_pb2.ExecuteRequest,
+                            executor_pb2.ExecuteResponse):
+      raise TypeError('Expected an `Execute` stream message type, found '
+                      '{}.'.format(py_typecheck.type_string(message_type)))
+    self._message_type = message_type
+    self._pending_chunks: Dict[int, List[bytes]] = {}
+
+  def add(self, message: _StreamMessage) -> Optional[_StreamMessage]:
+    """Adds a received message.
+
+    Args:
+      message: A message received on the stream, either a chunk or a complete
+        message.
+
+    Returns:
+      The complete message if `message` was complete or was the last chunk of
+      a message, otherwise `None`.
+    """
+    py_typecheck.check_type(message, self._message_type)
+    if not message.HasField('chunk'):
+      return message
+    chunks = self._pending_chunks.setdefault(message.sequence_number, [])
+    chunks.append(message.chunk.content)
+    if not message.chunk.is_last:
+      return None
+    del self._pending_chunks[message.sequence_number]
+    return self._message_type.FromString(b''.join(chunks))
@@ -0,0 +1,85 @@
+# Copyright 2020, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmarks the serialization of large tensors in `executor_serialization`.
+
+Compares the `tf.TensorProto` encoding of tensor values with the raw buffer
+encoding. Run with `--benchmarks=.` to execute all benchmarks.
+"""
+
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from google.protobuf import any_pb2
+from tensorflow_federated.proto.v0 import executor_pb2
+from tensorflow_federated.python.core.api import computation_types
+from tensorflow_federated.python.core.impl.executors import executor_serialization
+
+_NUM_ITERS = 10
+
+
+def _serialize_as_tensor_proto(value):
+  tensor_proto = tf.make_tensor_proto(value)
+  any_pb = any_pb2.Any()
+  any_pb.Pack(tensor_proto)
+  return executor_pb2.Value(tensor=any_pb)
+
+
+class ExecutorSerializationBenchmark(tf.test.Benchmark):
+
+  def _benchmark_roundtrip(self, name, serialize_fn, value):
+    value_type = computation_types.TensorType(
+        tf.dtypes.as_dtype(value.dtype), value.shape)
+    serialize_times = []
+    deserialize_times = []
+    for _ in range(_NUM_ITERS):
+      start = time.time()
+      value_proto = serialize_fn(value, value_type)
+      serialized = value_proto.SerializeToString()
+      serialize_times.append(time.time() - start)
+
+      start = time.time()
+      received_proto = executor_pb2.Value.FromString(serialized)
+      executor_serialization.deserialize_value(received_proto)
+      deserialize_times.append(time.time() - start)
+
+    self.report_benchmark(
+        name=name,
+        iters=_NUM_ITERS,
+        wall_time=np.median(serialize_times) + np.median(deserialize_times),
+        extras={
+            'serialize_wall_time': np.median(serialize_times),
+            'deserialize_wall_time': np.median(deserialize_times),
+            'serialized_size_bytes': len(serialized),
+        })
+
+  def _benchmark_float32_tensor(self, num_elements):
+    value = np.random.random_sample([num_elements]).astype(np.float32)
+    self._benchmark_roundtrip(
+        'tensor_proto_float32_{}'.format(num_elements),
+        lambda v, _: _serialize_as_tensor_proto(v), value)
+    self._benchmark_roundtrip(
+        'raw_tensor_float32_{}'.format(num_elements),
+        lambda v, t: executor_serialization.serialize_value(v, t)[0], value)
+
+  def benchmark_float32_tensor_1mb(self):
+    self._benchmark_float32_tensor(2**18)
+
+  def benchmark_float32_tensor_100mb(self):
+    self._benchmark_float32_tensor(25 * 2**20)
+
+
+if __name__ == '__main__':
+  tf.test.main()
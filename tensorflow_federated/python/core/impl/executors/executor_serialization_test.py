@@ -14,6 +14,7 @@
 
 import collections
 
+from absl.testing import absltest
 import numpy as np
 import tensorflow as tf
 
@@ -86,6 +87,69 @@ class ExecutorServiceUtilsTest(tf.test.TestCase):
     self.assertEqual(str(type_spec), 'int64*')
     self.assertAllEqual(list(y), [x * 2 for x in range(5)])
 
+  def test_serialize_finite_sequence_as_elements(self):
+    ds = tf.data.Dataset.range(5)
+    value_proto, _ = executor_serialization.serialize_value(
+        ds, computation_types.SequenceType(tf.int64))
+    self.assertEqual(value_proto.sequence.WhichOneof('value'), 'elements')
+    self.assertLen(value_proto.sequence.elements.chunk, 1)
+
+  def test_serialize_infinite_sequence_as_zipped_saved_model(self):
+    ds = tf.data.Dataset.range(5).repeat()
+    value_proto, _ = executor_serialization.serialize_value(
+        ds, computation_types.SequenceType(tf.int64))
+    self.assertEqual(
+        value_proto.sequence.WhichOneof('value'), 'zipped_saved_model')
+
+  def test_serialize_sequence_of_unknown_cardinality_as_zipped_saved_model(
+      self):
+    ds = tf.data.Dataset.range(5).filter(lambda x: x > 2)
+    value_proto, _ = executor_serialization.serialize_value(
+        ds, computation_types.SequenceType(tf.int64))
+    self.assertEqual(
+        value_proto.sequence.WhichOneof('value'), 'zipped_saved_model')
+    y, _ = executor_serialization.deserialize_value(value_proto)
+    self.assertAllEqual(list(y), [3, 4])
+
+  def test_serialize_sequence_of_varying_shapes_as_zipped_saved_model(self):
+    ds = tf.data.Dataset.range(20).map(lambda x: tf.fill([x % 2 + 1], x))
+    value_proto, _ = executor_serialization.serialize_value(
+        ds, computation_types.SequenceType(
+            computation_types.TensorType(tf.int64, [None])))
+    self.assertEqual(
+        value_proto.sequence.WhichOneof('value'), 'zipped_saved_model')
+    y, _ = executor_serialization.deserialize_value(value_proto)
+    actual = [x.numpy() for x in y]
+    self.assertLen(actual, 20)
+    self.assertAllEqual(actual[3], [3, 3])
+
+  def test_serialize_deserialize_sequence_of_strings(self):
+    ds = tf.data.Dataset.from_tensor_slices([b'a', b'bc', b'def'])
+    value_proto, value_type = executor_serialization.serialize_value(
+        ds, computation_types.SequenceType(tf.string))
+    self.assertEqual(str(value_type), 'string*')
+    self.assertEqual(
+        value_proto.sequence.WhichOneof('value'), 'zipped_saved_model')
+    y, type_spec = executor_serialization.deserialize_value(value_proto)
+    self.assertEqual(str(type_spec), 'string*')
+    self.assertAllEqual(list(y), [b'a', b'bc', b'def'])
+
+  def test_serialize_deserialize_sequence_of_batches_with_partial_batch(self):
+    ds = tf.data.Dataset.range(7).batch(3)
+    value_proto, value_type = executor_serialization.serialize_value(
+        ds, computation_types.SequenceType(
+            computation_types.TensorType(tf.int64, [None])))
+    self.assertEqual(value_proto.sequence.WhichOneof('value'), 'elements')
+    self.assertLen(value_proto.sequence.elements.chunk, 2)
+    self.assertEqual(str(value_type), 'int64[?]*')
+    y, type_spec = executor_serialization.deserialize_value(value_proto)
+    self.assertEqual(str(type_spec), 'int64[?]*')
+    actual = [x.numpy() for x in y]
+    self.assertLen(actual, 3)
+    self.assertAllEqual(actual[0], [0, 1, 2])
+    self.assertAllEqual(actual[1], [3, 4, 5])
+    self.assertAllEqual(actual[2], [6])
+
   # TODO(b/137602785): bring GPU test back after the fix for `wrap_function`.
   @test_utils.skip_test_for_gpu
   def test_serialize_deserialize_sequence_of_tuples(self):
@@ -190,6 +254,57 @@ class ExecutorServiceUtilsTest(tf.test.TestCase):
       self.assertEqual(type(actual), type(expected))
       self.assertAllClose(actual, expected)
 
+  def test_serialize_deserialize_large_tensor_value_as_raw_tensor(self):
+    x = np.arange(1000, dtype=np.float32).reshape([10, 100])
+    value_proto, value_type = executor_serialization.serialize_value(
+        x, computation_types.TensorType(tf.float32, [10, 100]))
+    self.assertEqual(value_proto.WhichOneof('value'), 'raw_tensor')
+    self.assertEqual(str(value_type), 'float32[10,100]')
+    y, type_spec = executor_serialization.deserialize_value(value_proto)
+    self.assertEqual(str(type_spec), 'float32[10,100]')
+    self.assertAllEqual(x, y)
+
+  def test_serialize_small_tensor_value_as_tensor_proto(self):
+    x = np.arange(10, dtype=np.float32)
+    value_proto, _ = executor_serialization.serialize_value(
+        x, computation_types.TensorType(tf.float32, [10]))
+    self.assertEqual(value_proto.WhichOneof('value'), 'tensor')
+
+  def test_serialize_large_tensor_value_with_different_dtype_as_tensor_proto(
+      self):
+    x = np.arange(1000, dtype=np.float32)
+    value_proto, _ = executor_serialization.serialize_value(
+        x, computation_types.TensorType(tf.int32, [1000]))
+    self.assertEqual(value_proto.WhichOneof('value'), 'tensor')
+    y, type_spec = executor_serialization.deserialize_value(value_proto)
+    self.assertEqual(str(type_spec), 'int32[1000]')
+    self.assertAllEqual(y, np.arange(1000, dtype=np.int32))
+
+  def test_serialize_large_tensor_value_with_bad_shape_raises(self):
+    x = np.arange(1000, dtype=np.float32)
+    with self.assertRaises(TypeError):
+      executor_serialization.serialize_value(
+          x, computation_types.TensorType(tf.float32, [10]))
+
+  def test_serialize_deserialize_raw_tensor_as_little_endian(self):
+    x = np.arange(1000, dtype=np.int32)
+    value_proto, _ = executor_serialization.serialize_value(
+        x, computation_types.TensorType(tf.int32, [1000]))
+    self.assertEqual(value_proto.raw_tensor.content,
+                     x.astype('<i4').tobytes())
+    value_proto = executor_pb2.Value(
+        raw_tensor=executor_pb2.Value.RawTensor(
+            dtype='int32', shape=[1000], content=x.astype('<i4').tobytes()))
+    y, _ = executor_serialization.deserialize_value(value_proto)
+    self.assertAllEqual(y, x)
+
+  def test_deserialize_raw_tensor_with_bad_content_size_raises(self):
+    value_proto = executor_pb2.Value(
+        raw_tensor=executor_pb2.Value.RawTensor(
+            dtype='float32', shape=[3], content=b'\x00' * 8))
+    with self.assertRaises(ValueError):
+      executor_serialization.deserialize_value(value_proto)
+
   def test_serialize_deserialize_tensor_value_with_bad_shape(self):
     x = tf.constant([10, 20, 30]).numpy()
     with self.assertRaises(TypeError):
@@ -393,5 +508,66 @@ class SerializeCardinalitiesTest(tf.test.TestCase):
     self.assertEqual(client_cardinalities, reconstructed_cardinalities)
 
 
+class ChunkingTest(absltest.TestCase):
+
+  def test_split_into_chunks_returns_small_message_unchanged(self):
+    request = executor_pb2.ExecuteRequest(
+        compute=executor_pb2.ComputeRequest(
+            value_ref=executor_pb2.ValueRef(id='abc')),
+        sequence_number=3)
+    chunks = executor_serialization.split_into_chunks(request)
+    self.assertEqual(chunks, [request])
+
+  def test_split_into_chunks_raises_with_zero_chunk_size(self):
+    with self.assertRaises(ValueError):
+      executor_serialization.split_into_chunks(
+          executor_pb2.ExecuteRequest(), chunk_size_bytes=0)
+
+  def test_split_and_assemble_request_roundtrip(self):
+    value_proto, _ = executor_serialization.serialize_value(
+        np.arange(100, dtype=np.int32),
+        computation_types.TensorType(tf.int32, [100]))
+    request = executor_pb2.ExecuteRequest(
+        create_value=executor_pb2.CreateValueRequest(value=value_proto),
+        sequence_number=7)
+    chunks = executor_serialization.split_into_chunks(
+        request, chunk_size_bytes=64)
+    self.assertGreater(len(chunks), 1)
+    for chunk in chunks:
+      self.assertTrue(chunk.HasField('chunk'))
+      self.assertEqual(chunk.sequence_number, 7)
+    assembler = executor_serialization.ChunkAssembler(
+        executor_pb2.ExecuteRequest)
+    for chunk in chunks[:-1]:
+      self.assertIsNone(assembler.add(chunk))
+    self.assertEqual(assembler.add(chunks[-1]), request)
+
+  def test_assemble_interleaved_responses(self):
+    responses = [
+        executor_pb2.ExecuteResponse(
+            create_value=executor_pb2.CreateValueResponse(
+                value_ref=executor_pb2.ValueRef(id=str(i) * 100)),
+            sequence_number=i) for i in range(2)
+    ]
+    first_chunks, second_chunks = [
+        executor_serialization.split_into_chunks(r, chunk_size_bytes=16)
+        for r in responses
+    ]
+    self.assertLen(first_chunks, len(second_chunks))
+    assembler = executor_serialization.ChunkAssembler(
+        executor_pb2.ExecuteResponse)
+    assembled = []
+    for first, second in zip(first_chunks, second_chunks):
+      for chunk in (first, second):
+        message = assembler.add(chunk)
+        if message is not None:
+          assembled.append(message)
+    self.assertEqual(assembled, responses)
+
+  def test_assembler_raises_with_wrong_message_type(self):
+    with self.assertRaises(TypeError):
+      executor_serialization.ChunkAssembler(executor_pb2.Value)
+
+
 if __name__ == '__main__':
   tf.test.main()
@@ -14,12 +14,13 @@
 """A service wrapper around an executor that makes it accessible over gRPC."""
 
 import asyncio
+import collections
 import functools
 import queue
 import sys
 import threading
 import traceback
-from typing import Iterable
+from typing import AsyncIterable, Iterable, Optional
 import uuid
 import weakref
 
@@ -35,6 +36,59 @@ from tensorflow_federated.python.core.impl.executors import executor_factory
 from tensorflow_federated.python.core.impl.executors import executor_serialization
 
 
+# The maximum total serialized size of the values the service remembers by
+# digest (see `CreateValueRequest.digest`). Least recently used values are
+# forgotten first.
+_VALUE_STORE_MAX_SIZE_BYTES = 1024**3  # 1 GB
+
+# The default number of requests of a single `Execute` stream that the
+# `AsyncExecutorService` handles at once.
+_DEFAULT_MAX_CONCURRENT_REQUESTS_PER_STREAM = 1000
+
+
+class _ValueStore:
+  """A size-bounded LRU mapping from content digests to embedded values.
+
+  Not thread-safe; callers must hold the lock of the service, if any.
+  """
+
+  def __init__(self, max_size_bytes):
+    self._max_size_bytes = max_size_bytes
+    self._size_bytes = 0
+    self._entries = collections.OrderedDict()
+
+  def get(self, digest):
+    """Returns the future stored under `digest`, or `None`."""
+    entry = self._entries.get(digest)
+    if entry is None:
+      return None
+    self._entries.move_to_end(digest)
+    return entry[0]
+
+  def put(self, digest, future_val, size_bytes):
+    """Stores `future_val` under `digest`, evicting older values if needed."""
+    if size_bytes > self._max_size_bytes:
+      return
+    if digest in self._entries:
+      self._size_bytes -= self._entries.pop(digest)[1]
+    self._entries[digest] = (future_val, size_bytes)
+    self._size_bytes += size_bytes
+    while self._size_bytes > self._max_size_bytes:
+      _, (_, evicted_size_bytes) = self._entries.popitem(last=False)
+      self._size_bytes -= evicted_size_bytes
+
+  def clear(self):
+    self._entries.clear()
+    self._size_bytes = 0
+
+
+def _invocation_metadata(context: Optional[grpc.ServicerContext]):
+  """Returns the metadata sent by the client of an RPC, if any."""
+  if context is None:
+    return None
+  return context.invocation_metadata()
+
+
 def _set_invalid_arg_err(context: grpc.ServicerContext, err):
   logging.error(traceback.format_exc())
   context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
@@ -47,8 +101,37 @@ def _set_unknown_err(context: grpc.ServicerContext, err):
   context.set_details(str(err))
 
 
-class ExecutorService(executor_pb2_grpc.ExecutorServicer):
-  """A wrapper around a target executor that makes it into a gRPC service."""
+def _assign_client_ref(values, response, operation):
+  """Moves the value created by a batch `operation` to its client ref.
+
+  Args:
+    values: The dictionary of values held by the service.
+    response: The response to the request of `operation`, which carries the
+      ref the service assigned to the created value.
+    operation: An instance of `executor_pb2.BatchRequest.Operation`.
+
+  Raises:
+    RuntimeError: If the operation failed to create a value.
+    ValueError: If the client ref is already in use.
+  """
+  if not response.HasField('value_ref'):
+    raise RuntimeError('Failed to perform a {} operation of a batch.'.format(
+        operation.WhichOneof('operation')))
+  client_id = operation.value_ref.id
+  if not client_id or client_id in values:
+    raise ValueError('Invalid client-assigned value ref: {!r}.'.format(
+        client_id))
+  values[client_id] = values.pop(response.value_ref.id)
+
+
+class _ExecutorServiceBase(executor_pb2_grpc.ExecutorServicer):
+  """The request handling shared by `ExecutorService` and its asyncio variant.
+
+  The values embedded in the executor are held as handles to the scheduled
+  coroutines that create them. Subclasses define how coroutines are scheduled
+  on the event loop running the executor (`_schedule`), and how a handle is
+  awaited in that loop (`_await_handle`).
+  """
 
   def __init__(self, ex_factory: executor_factory.ExecutorFactory, *args,
                **kwargs):
@@ -59,34 +142,13 @@ class ExecutorService(executor_pb2_grpc.ExecutorServicer):
     self._lock = threading.Lock()
 
     # The keys in this dictionary are value ids (the same as what we return
-    # in the gRPC responses), and the values are `concurrent.futures.Future`
-    # instances (this may, and probably will change as we flesh out the rest
-    # of this implementation).
+    # in the gRPC responses), and the values are the handles returned by
+    # `_schedule` for the coroutines that create the values.
     self._values = {}
 
-    def run_loop(loop):
-      loop.run_forever()
-      loop.close()
-
-    self._event_loop = asyncio.new_event_loop()
-    self._event_loop.set_task_factory(
-        tracing.propagate_trace_context_task_factory)
-    self._thread = threading.Thread(
-        target=functools.partial(run_loop, self._event_loop), daemon=True)
-    self._thread.start()
-
-    def finalize(loop, thread):
-      loop.call_soon_threadsafe(loop.stop)
-      thread.join()
-
-    weakref.finalize(self, finalize, self._event_loop, self._thread)
-
-  def _run_coro_threadsafe_with_tracing(self, coro):
-    """Runs `coro` on `self._event_loop` inside the current trace spans."""
-    with tracing.with_trace_context_from_rpc():
-      return asyncio.run_coroutine_threadsafe(
-          tracing.wrap_coroutine_in_current_trace_context(coro),
-          self._event_loop)
+    # Values created with a `digest`, which later requests may refer to by
+    # digest alone. Cleared whenever the executor is reconstructed.
+    self._value_store = _ValueStore(_VALUE_STORE_MAX_SIZE_BYTES)
 
   @property
   def executor(self):
@@ -96,12 +158,26 @@ class ExecutorService(executor_pb2_grpc.ExecutorServicer):
                          'concrete requests.')
     return self._executor
 
-  async def _HandleRequest(
+  def _schedule(self, coro, context=None):
+    """Schedules `coro` on the executor's loop, returning a handle to it."""
+    raise NotImplementedError()
+
+  def _await_handle(self, handle):
+    """Returns an awaitable for `handle`, in the executor's loop."""
+    raise NotImplementedError()
+
+  def _add_value(self, handle) -> executor_pb2.ValueRef:
+    value_id = str(uuid.uuid4())
+    with self._lock:
+      self._values[value_id] = handle
+    return executor_pb2.ValueRef(id=value_id)
+
+  async def _handle_request(
       self,
       req: executor_pb2.ExecuteRequest,
       context: grpc.ServicerContext,
-      response_queue: queue.Queue,
-  ):
+  ) -> executor_pb2.ExecuteResponse:
+    """Handles a request of an `Execute` stream, in the executor's loop."""
     try:
       which = req.WhichOneof('request')
       logging.debug('Received request of type %s, seq_no %s', which,
@@ -110,138 +186,114 @@ class ExecutorService(executor_pb2_grpc.ExecutorServicer):
         raise RuntimeError('Must set a request type')
       if which == 'create_value':
         response = executor_pb2.ExecuteResponse(
-            create_value=self.CreateValue(req.create_value, context))
+            create_value=self._create_value(req.create_value, context))
       elif which == 'create_call':
         response = executor_pb2.ExecuteResponse(
-            create_call=self.CreateCall(req.create_call, context))
+            create_call=self._create_call(req.create_call, context))
       elif which == 'create_struct':
         response = executor_pb2.ExecuteResponse(
-            create_struct=self.CreateStruct(req.create_struct, context))
+            create_struct=self._create_struct(req.create_struct, context))
       elif which == 'create_selection':
         response = executor_pb2.ExecuteResponse(
-            create_selection=self.CreateSelection(req.create_selection,
-                                                  context))
+            create_selection=self._create_selection(req.create_selection,
+                                                    context))
       elif which == 'compute':
         response = executor_pb2.ExecuteResponse(
-            compute=await self._Compute(req.compute, context))
+            compute=await self._compute(req.compute, context))
       elif which == 'dispose':
         response = executor_pb2.ExecuteResponse(
-            dispose=self.Dispose(req.dispose, context))
+            dispose=self._dispose(req.dispose, context))
       elif which == 'set_cardinalities':
         response = executor_pb2.ExecuteResponse(
-            set_cardinalities=self.SetCardinalities(req.set_cardinalities,
-                                                    context))
+            set_cardinalities=self._set_cardinalities(req.set_cardinalities,
+                                                      context))
+      elif which == 'batch':
+        response = executor_pb2.ExecuteResponse(
+            batch=self._handle_batch(req.batch, context))
       else:
         raise RuntimeError('Unknown request type')
       response.sequence_number = req.sequence_number
-      response_queue.put_nowait(response)
+      return response
     except Exception as err:  # pylint:disable=broad-except
       _set_unknown_err(context, err)
-      response = executor_pb2.ExecuteResponse()
-      response_queue.put_nowait(response)
+      # The client matches even a failed response to its request by number.
+      return executor_pb2.ExecuteResponse(sequence_number=req.sequence_number)
 
-  def Execute(
+  def _handle_batch(
       self,
-      request_iter: Iterable[executor_pb2.ExecuteRequest],
+      request: executor_pb2.BatchRequest,
       context: grpc.ServicerContext,
-  ) -> Iterable[executor_pb2.ExecuteResponse]:
-    """Yields responses to streaming requests."""
-    logging.debug('Bidi Execute stream created')
-
-    response_queue = queue.Queue()
-
-    class RequestIterFinished:
-      """Marker object indicating how many requests were received."""
-
-      def __init__(self, n_reqs):
-        self._n_reqs = n_reqs
-
-      def get_n_reqs(self):
-        return self._n_reqs
-
-    class RequestIterBroken:
-      """Marker object indicating breakage in the request iterator."""
-      pass
-
-    def request_thread_fn():
-      n_reqs = 0
-      try:
-        for req in request_iter:
-          asyncio.run_coroutine_threadsafe(
-              self._HandleRequest(req, context, response_queue),
-              self._event_loop)
-          n_reqs += 1
-        response_queue.put_nowait(RequestIterFinished(n_reqs))
-      except Exception as e:  # pylint: disable=broad-except
-        logging.exception(
-            'Exception %s caught in request thread; closing stream.', e)
-        response_queue.put_nowait(RequestIterBroken())
-      return
-
-    threading.Thread(target=request_thread_fn, daemon=True).start()
-
-    # This generator is finished when the request iterator is finished and we
-    # have yielded a response for every request.
-    n_responses = 0
-    target_responses = sys.maxsize
-    while n_responses < target_responses:
-      response = response_queue.get()
-      if isinstance(response, executor_pb2.ExecuteResponse):
-        n_responses += 1
-        logging.debug('Returning response of type %s with sequence no. %s',
-                      response.WhichOneof('response'), response.sequence_number)
-        yield response
-      elif isinstance(response, RequestIterFinished):
-        target_responses = response.get_n_reqs()
-      elif isinstance(response, RequestIterBroken):
-        # If the request iterator is broken, we want to break out of the loop
-        # without waiting for the remainder of the responses; the executors can
-        # be in an arbitrary state at this point.
-        break
+  ) -> executor_pb2.BatchResponse:
+    """Performs the operations of a batch in order, under client refs."""
+    for operation in request.operation:
+      which = operation.WhichOneof('operation')
+      if which == 'create_value':
+        response = self._create_value(operation.create_value, context)
+      elif which == 'create_call':
+        response = self._create_call(operation.create_call, context)
+      elif which == 'create_struct':
+        response = self._create_struct(operation.create_struct, context)
+      elif which == 'create_selection':
+        response = self._create_selection(operation.create_selection, context)
       else:
-        raise ValueError('Illegal response object: {}'.format(response))
-
-    logging.debug('Closing bidi Execute stream')
+        raise RuntimeError('Unknown batch operation type')
+      with self._lock:
+        _assign_client_ref(self._values, response, operation)
+    return executor_pb2.BatchResponse()
 
-  def SetCardinalities(
+  def _set_cardinalities(
       self,
       request: executor_pb2.SetCardinalitiesRequest,
       context: grpc.ServicerContext,
   ) -> executor_pb2.SetCardinalitiesResponse:
-    """Sets the cartinality for the executor service."""
+    """Sets the cardinality for the executor service."""
     py_typecheck.check_type(request, executor_pb2.SetCardinalitiesRequest)
     try:
       cardinalities_dict = executor_serialization.deserialize_cardinalities(
           request.cardinalities)
       self._executor = self._ex_factory.create_executor(cardinalities_dict)
+      with self._lock:
+        self._value_store.clear()
       return executor_pb2.SetCardinalitiesResponse()
     except (ValueError, TypeError) as err:
       _set_invalid_arg_err(context, err)
       return executor_pb2.SetCardinalitiesResponse()
 
-  def CreateValue(
+  def _create_value(
       self,
       request: executor_pb2.CreateValueRequest,
       context: grpc.ServicerContext,
   ) -> executor_pb2.CreateValueResponse:
-    """Creates a value embedded in the executor."""
+    """Creates a value embedded in the executor.
+
+    If the request carries a `digest` but no `value`, the value previously
+    created with the same digest is reused; if there is none, the response has
+    `digest_not_found` set and the client is expected to send the value.
+    """
     py_typecheck.check_type(request, executor_pb2.CreateValueRequest)
     try:
-      with tracing.span('ExecutorService.CreateValue', 'deserialize_value'):
-        value, value_type = (
-            executor_serialization.deserialize_value(request.value))
-      value_id = str(uuid.uuid4())
-      coro = self.executor.create_value(value, value_type)
-      future_val = self._run_coro_threadsafe_with_tracing(coro)
-      with self._lock:
-        self._values[value_id] = future_val
-      return executor_pb2.CreateValueResponse(
-          value_ref=executor_pb2.ValueRef(id=value_id))
+      if request.digest and not request.HasField('value'):
+        with self._lock:
+          handle = self._value_store.get(request.digest)
+        if handle is None:
+          return executor_pb2.CreateValueResponse(digest_not_found=True)
+      else:
+        with tracing.span('{}.CreateValue'.format(type(self).__name__),
+                          'deserialize_value'):
+          value, value_type = (
+              executor_serialization.deserialize_value(request.value))
+        handle = self._schedule(
+            self.executor.create_value(value, value_type), context)
+        if request.digest:
+          with self._lock:
+            self._value_store.put(request.digest, handle,
+                                  request.value.ByteSize())
+      return executor_pb2.CreateValueResponse(value_ref=self._add_value(handle))
     except (ValueError, TypeError) as err:
       _set_invalid_arg_err(context, err)
       return executor_pb2.CreateValueResponse()
 
-  def CreateCall(
+  def _create_call(
       self,
       request: executor_pb2.CreateCallRequest,
       context: grpc.ServicerContext,
@@ -249,30 +301,27 @@ class ExecutorService(executor_pb2_grpc.ExecutorServicer):
     """Creates a call embedded in the executor."""
     py_typecheck.check_type(request, executor_pb2.CreateCallRequest)
     try:
-      function_id = str(request.function_ref.id)
-      argument_id = str(request.argument_ref.id)
+      argument_id = request.argument_ref.id
       with self._lock:
-        function_val = self._values[function_id]
-        argument_val = self._values[argument_id] if argument_id else None
+        function_handle = self._values[request.function_ref.id]
+        argument_handle = self._values[argument_id] if argument_id else None
 
       async def _processing():
-        function = await asyncio.wrap_future(function_val)
-        argument = await asyncio.wrap_future(
-            argument_val) if argument_val is not None else None
+        function = await self._await_handle(function_handle)
+        if argument_handle is not None:
+          argument = await self._await_handle(argument_handle)
+        else:
+          argument = None
         return await self.executor.create_call(function, argument)
 
-      coro = _processing()
-      result_fut = self._run_coro_threadsafe_with_tracing(coro)
-      result_id = str(uuid.uuid4())
-      with self._lock:
-        self._values[result_id] = result_fut
+      result_handle = self._schedule(_processing(), context)
       return executor_pb2.CreateCallResponse(
-          value_ref=executor_pb2.ValueRef(id=result_id))
+          value_ref=self._add_value(result_handle))
     except (ValueError, TypeError) as err:
       _set_invalid_arg_err(context, err)
       return executor_pb2.CreateCallResponse()
 
-  def CreateStruct(
+  def _create_struct(
       self,
       request: executor_pb2.CreateStructRequest,
       context: grpc.ServicerContext,
@@ -281,29 +330,26 @@ class ExecutorService(executor_pb2_grpc.ExecutorServicer):
     py_typecheck.check_type(request, executor_pb2.CreateStructRequest)
     try:
       with self._lock:
-        elem_futures = [self._values[e.value_ref.id] for e in request.element]
+        elem_handles = [self._values[e.value_ref.id] for e in request.element]
       elem_names = [
           str(elem.name) if elem.name else None for elem in request.element
       ]
 
       async def _processing():
         elem_values = await asyncio.gather(
-            *[asyncio.wrap_future(v) for v in elem_futures])
+            *[self._await_handle(h) for h in elem_handles])
         elements = list(zip(elem_names, elem_values))
         struct = structure.Struct(elements)
         return await self.executor.create_struct(struct)
 
-      result_fut = self._run_coro_threadsafe_with_tracing(_processing())
-      result_id = str(uuid.uuid4())
-      with self._lock:
-        self._values[result_id] = result_fut
+      result_handle = self._schedule(_processing(), context)
       return executor_pb2.CreateStructResponse(
-          value_ref=executor_pb2.ValueRef(id=result_id))
+          value_ref=self._add_value(result_handle))
     except (ValueError, TypeError) as err:
       _set_invalid_arg_err(context, err)
       return executor_pb2.CreateStructResponse()
 
-  def CreateSelection(
+  def _create_selection(
       self,
       request: executor_pb2.CreateSelectionRequest,
       context: grpc.ServicerContext,
@@ -312,10 +358,10 @@ class ExecutorService(executor_pb2_grpc.ExecutorServicer):
     py_typecheck.check_type(request, executor_pb2.CreateSelectionRequest)
     try:
       with self._lock:
-        source_fut = self._values[request.source_ref.id]
+        source_handle = self._values[request.source_ref.id]
 
       async def _processing():
-        source = await asyncio.wrap_future(source_fut)
+        source = await self._await_handle(source_handle)
         which_selection = request.WhichOneof('selection')
         if which_selection == 'name':
           coro = self.executor.create_selection(source, name=request.name)
@@ -323,47 +369,34 @@ class ExecutorService(executor_pb2_grpc.ExecutorServicer):
           coro = self.executor.create_selection(source, index=request.index)
         return await coro
 
-      result_fut = self._run_coro_threadsafe_with_tracing(_processing())
-      result_id = str(uuid.uuid4())
-      with self._lock:
-        self._values[result_id] = result_fut
+      result_handle = self._schedule(_processing(), context)
       return executor_pb2.CreateSelectionResponse(
-          value_ref=executor_pb2.ValueRef(id=result_id))
+          value_ref=self._add_value(result_handle))
     except (ValueError, TypeError) as err:
       _set_invalid_arg_err(context, err)
       return executor_pb2.CreateSelectionResponse()
 
-  def Compute(
+  async def _compute(
       self,
       request: executor_pb2.ComputeRequest,
       context: grpc.ServicerContext,
   ) -> executor_pb2.ComputeResponse:
-    """Computes a value embedded in the executor."""
-    return self._run_coro_threadsafe_with_tracing(
-        self._Compute(request, context)).result()
-
-  async def _Compute(
-      self,
-      request: executor_pb2.ComputeRequest,
-      context: grpc.ServicerContext,
-  ) -> executor_pb2.ComputeResponse:
-    """Asynchronous implemention of `Compute`."""
+    """Computes a value embedded in the executor, in the executor's loop."""
     py_typecheck.check_type(request, executor_pb2.ComputeRequest)
     try:
-      value_id = str(request.value_ref.id)
       with self._lock:
-        future_val = asyncio.wrap_future(self._values[value_id])
-      val = await future_val
-      result_val = await val.compute()
-      val_type = val.type_signature
-      value_proto, _ = executor_serialization.serialize_value(
-          result_val, val_type)
+        handle = self._values[request.value_ref.id]
+      with tracing.with_trace_context_from_rpc(_invocation_metadata(context)):
+        val = await self._await_handle(handle)
+        result_val = await val.compute()
+        value_proto, _ = executor_serialization.serialize_value(
+            result_val, val.type_signature)
       return executor_pb2.ComputeResponse(value=value_proto)
     except (ValueError, TypeError) as err:
       _set_invalid_arg_err(context, err)
       return executor_pb2.ComputeResponse()
 
-  def Dispose(
+  def _dispose(
       self,
       request: executor_pb2.DisposeRequest,
       context: grpc.ServicerContext,
@@ -377,3 +410,302 @@ class ExecutorService(executor_pb2_grpc.ExecutorServicer):
     except KeyError as err:
       _set_invalid_arg_err(context, err)
     return executor_pb2.DisposeResponse()
+
+
+class ExecutorService(_ExecutorServiceBase):
+  """A wrapper around a target executor that makes it into a gRPC service."""
+
+  def __init__(self, ex_factory: executor_factory.ExecutorFactory, *args,
+               **kwargs):
+    super().__init__(ex_factory, *args, **kwargs)
+
+    def run_loop(loop):
+      loop.run_forever()
+      loop.close()
+
+    self._event_loop = asyncio.new_event_loop()
+    self._event_loop.set_task_factory(
+        tracing.propagate_trace_context_task_factory)
+    self._thread = threading.Thread(
+        target=functools.partial(run_loop, self._event_loop), daemon=True)
+    self._thread.start()
+
+    def finalize(loop, thread):
+      loop.call_soon_threadsafe(loop.stop)
+      thread.join()
+
+    weakref.finalize(self, finalize, self._event_loop, self._thread)
+
+  def _schedule(self, coro, context=None):
+    """Runs `coro` on `self._event_loop` inside the current trace spans."""
+    with tracing.with_trace_context_from_rpc(_invocation_metadata(context)):
+      return asyncio.run_coroutine_threadsafe(
+          tracing.wrap_coroutine_in_current_trace_context(coro),
+          self._event_loop)
+
+  def _await_handle(self, handle):
+    return asyncio.wrap_future(handle)
+
+  def Execute(
+      self,
+      request_iter: Iterable[executor_pb2.ExecuteRequest],
+      context: grpc.ServicerContext,
+  ) -> Iterable[executor_pb2.ExecuteResponse]:
+    """Yields responses to streaming requests."""
+    logging.debug('Bidi Execute stream created')
+
+    response_queue = queue.Queue()
+
+    class RequestIterFinished:
+      """Marker object indicating how many requests were received."""
+
+      def __init__(self, n_reqs):
+        self._n_reqs = n_reqs
+
+      def get_n_reqs(self):
+        return self._n_reqs
+
+    class RequestIterBroken:
+      """Marker object indicating breakage in the request iterator."""
+      pass
+
+    async def _respond(req):
+      response_queue.put_nowait(await self._handle_request(req, context))
+
+    def request_thread_fn():
+      n_reqs = 0
+      assembler = executor_serialization.ChunkAssembler(
+          executor_pb2.ExecuteRequest)
+      try:
+        for req in request_iter:
+          req = assembler.add(req)
+          if req is None:
+            # Wait for the remaining chunks of a large request.
+            continue
+          asyncio.run_coroutine_threadsafe(_respond(req), self._event_loop)
+          n_reqs += 1
+        response_queue.put_nowait(RequestIterFinished(n_reqs))
+      except Exception as e:  # pylint: disable=broad-except
+        logging.exception(
+            'Exception %s caught in request thread; closing stream.', e)
+        response_queue.put_nowait(RequestIterBroken())
+      return
+
+    threading.Thread(target=request_thread_fn, daemon=True).start()
+
+    # This generator is finished when the request iterator is finished and we
+    # have yielded a response for every request.
+    n_responses = 0
+    target_responses = sys.maxsize
+    while n_responses < target_responses:
+      response = response_queue.get()
+      if isinstance(response, executor_pb2.ExecuteResponse):
+        n_responses += 1
+        logging.debug('Returning response of type %s with sequence no. %s',
+                      response.WhichOneof('response'), response.sequence_number)
+        yield from executor_serialization.split_into_chunks(response)
+      elif isinstance(response, RequestIterFinished):
+        target_responses = response.get_n_reqs()
+      elif isinstance(response, RequestIterBroken):
+        # If the request iterator is broken, we want to break out of the loop
+        # without waiting for the remainder of the responses; the executors can
+        # be in an arbitrary state at this point.
+        break
+      else:
+        raise ValueError('Illegal response object: {}'.format(response))
+
+    logging.debug('Closing bidi Execute stream')
+
+  def SetCardinalities(
+      self,
+      request: executor_pb2.SetCardinalitiesRequest,
+      context: grpc.ServicerContext,
+  ) -> executor_pb2.SetCardinalitiesResponse:
+    """Sets the cardinality for the executor service."""
+    return self._set_cardinalities(request, context)
+
+  def CreateValue(
+      self,
+      request: executor_pb2.CreateValueRequest,
+      context: grpc.ServicerContext,
+  ) -> executor_pb2.CreateValueResponse:
+    """Creates a value embedded in the executor."""
+    return self._create_value(request, context)
+
+  def CreateCall(
+      self,
+      request: executor_pb2.CreateCallRequest,
+      context: grpc.ServicerContext,
+  ) -> executor_pb2.CreateCallResponse:
+    """Creates a call embedded in the executor."""
+    return self._create_call(request, context)
+
+  def CreateStruct(
+      self,
+      request: executor_pb2.CreateStructRequest,
+      context: grpc.ServicerContext,
+  ) -> executor_pb2.CreateStructResponse:
+    """Creates a struct embedded in the executor."""
+    return self._create_struct(request, context)
+
+  def CreateSelection(
+      self,
+      request: executor_pb2.CreateSelectionRequest,
+      context: grpc.ServicerContext,
+  ) -> executor_pb2.CreateSelectionResponse:
+    """Creates a selection embedded in the executor."""
+    return self._create_selection(request, context)
+
+  def Compute(
+      self,
+      request: executor_pb2.ComputeRequest,
+      context: grpc.ServicerContext,
+  ) -> executor_pb2.ComputeResponse:
+    """Computes a value embedded in the executor."""
+    return self._schedule(self._compute(request, context), context).result()
+
+  def Dispose(
+      self,
+      request: executor_pb2.DisposeRequest,
+      context: grpc.ServicerContext,
+  ) -> executor_pb2.DisposeResponse:
+    """Disposes of a value, making it no longer available for future calls."""
+    return self._dispose(request, context)
+
+
+class AsyncExecutorService(_ExecutorServiceBase):
+  """An asyncio variant of `ExecutorService`, to be hosted by `grpc.aio`.
+
+  Requests are handled directly on the event loop of the `grpc.aio` server,
+  which the target executor also runs on, so no threads are needed to consume
+  request streams or to wait for results. Each bidi `Execute` stream handles
+  up to `max_concurrent_requests_per_stream` requests at once and responds to
+  each as soon as it completes, in any order; once that many requests are in
+  flight, no more are read from the stream, so gRPC flow control pushes back
+  on the client.
+  """
+
+  def __init__(self,
+               ex_factory: executor_factory.ExecutorFactory,
+               *args,
+               max_concurrent_requests_per_stream: int = (
+                   _DEFAULT_MAX_CONCURRENT_REQUESTS_PER_STREAM),
+               **kwargs):
+    py_typecheck.check_type(max_concurrent_requests_per_stream, int)
+    if max_concurrent_requests_per_stream < 1:
+      raise ValueError(
+          'Must handle at least one request per stream at once, found {}.'
+          .format(max_concurrent_requests_per_stream))
+    super().__init__(ex_factory, *args, **kwargs)
+    self._max_concurrent_requests_per_stream = (
+        max_concurrent_requests_per_stream)
+
+  def _schedule(self, coro, context=None) -> asyncio.Task:
+    """Starts `coro` as a task inside the current trace spans."""
+    with tracing.with_trace_context_from_rpc(_invocation_metadata(context)):
+      return asyncio.ensure_future(
+          tracing.wrap_coroutine_in_current_trace_context(coro))
+
+  def _await_handle(self, handle):
+    return handle
+
+  async def Execute(
+      self,
+      request_iterator: AsyncIterable[executor_pb2.ExecuteRequest],
+      context: grpc.aio.ServicerContext,
+  ):
+    """Responds to streaming requests, each as soon as it completes."""
+    logging.debug('Async bidi Execute stream created')
+    semaphore = asyncio.Semaphore(self._max_concurrent_requests_per_stream)
+    # Chunks of one response must not be interleaved with those of another.
+    write_lock = asyncio.Lock()
+    pending_tasks = set()
+
+    async def _respond(req):
+      try:
+        response = await self._handle_request(req, context)
+        logging.debug('Returning response of type %s with sequence no. %s',
+                      response.WhichOneof('response'), response.sequence_number)
+        async with write_lock:
+          for chunk in executor_serialization.split_into_chunks(response):
+            await context.write(chunk)
+      finally:
+        semaphore.release()
+
+    assembler = executor_serialization.ChunkAssembler(
+        executor_pb2.ExecuteRequest)
+    try:
+      async for req in request_iterator:
+        req = assembler.add(req)
+        if req is None:
+          # Wait for the remaining chunks of a large request.
+          continue
+        await semaphore.acquire()
+        task = asyncio.ensure_future(_respond(req))
+        pending_tasks.add(task)
+        task.add_done_callback(pending_tasks.discard)
+      if pending_tasks:
+        await asyncio.wait(list(pending_tasks))
+    except asyncio.CancelledError:
+      # The stream was closed by the client; its responses can't be delivered.
+      for task in pending_tasks:
+        task.cancel()
+      raise
+
+    logging.debug('Closing async bidi Execute stream')
+
+  async def SetCardinalities(
+      self,
+      request: executor_pb2.SetCardinalitiesRequest,
+      context: grpc.aio.ServicerContext,
+  ) -> executor_pb2.SetCardinalitiesResponse:
+    """Sets the cardinality for the executor service."""
+    return self._set_cardinalities(request, context)
+
+  async def CreateValue(
+      self,
+      request: executor_pb2.CreateValueRequest,
+      context: grpc.aio.ServicerContext,
+  ) -> executor_pb2.CreateValueResponse:
+    """Creates a value embedded in the executor."""
+    return self._create_value(request, context)
+
+  async def CreateCall(
+      self,
+      request: executor_pb2.CreateCallRequest,
+      context: grpc.aio.ServicerContext,
+  ) -> executor_pb2.CreateCallResponse:
+    """Creates a call embedded in the executor."""
+    return self._create_call(request, context)
+
+  async def CreateStruct(
+      self,
+      request: executor_pb2.CreateStructRequest,
+      context: grpc.aio.ServicerContext,
+  ) -> executor_pb2.CreateStructResponse:
+    """Creates a struct embedded in the executor."""
+    return self._create_struct(request, context)
+
+  async def CreateSelection(
+      self,
+      request: executor_pb2.CreateSelectionRequest,
+      context: grpc.aio.ServicerContext,
+  ) -> executor_pb2.CreateSelectionResponse:
+    """Creates a selection embedded in the executor."""
+    return self._create_selection(request, context)
+
+  async def Compute(
+      self,
+      request: executor_pb2.ComputeRequest,
+      context: grpc.aio.ServicerContext,
+  ) -> executor_pb2.ComputeResponse:
+    """Computes a value embedded in the executor."""
+    return await self._compute(request, context)
+
+  async def Dispose(
+      self,
+      request: executor_pb2.DisposeRequest,
+      context: grpc.aio.ServicerContext,
+  ) -> executor_pb2.DisposeResponse:
+    """Disposes of a value, making it no longer available for future calls."""
+    return self._dispose(request, context)
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import queue
 import threading
 from unittest import mock
@@ -156,6 +157,35 @@ class ExecutorServiceTest(absltest.TestCase):
     self.assertEqual(value, 10.0)
     del env
 
+  def test_executor_service_create_value_by_digest_reuses_value(self):
+    ex_factory = executor_stacks.ResourceManagingExecutorFactory(
+        lambda _: eager_tf_executor.EagerTFExecutor())
+    env = TestEnv(ex_factory)
+    value_proto, _ = executor_serialization.serialize_value(
+        tf.constant(10.0).numpy(), tf.float32)
+    first_response = env.stub.CreateValue(
+        executor_pb2.CreateValueRequest(value=value_proto, digest=b'digest'))
+    second_response = env.stub.CreateValue(
+        executor_pb2.CreateValueRequest(digest=b'digest'))
+    self.assertFalse(second_response.digest_not_found)
+    self.assertNotEqual(first_response.value_ref.id,
+                        second_response.value_ref.id)
+    self.assertIs(
+        env.get_value_future_directly(first_response.value_ref.id),
+        env.get_value_future_directly(second_response.value_ref.id))
+    self.assertEqual(env.get_value(second_response.value_ref.id), 10.0)
+    del env
+
+  def test_executor_service_create_value_by_unknown_digest_not_found(self):
+    ex_factory = executor_stacks.ResourceManagingExecutorFactory(
+        lambda _: eager_tf_executor.EagerTFExecutor())
+    env = TestEnv(ex_factory)
+    response = env.stub.CreateValue(
+        executor_pb2.CreateValueRequest(digest=b'digest'))
+    self.assertTrue(response.digest_not_found)
+    self.assertEmpty(response.value_ref.id)
+    del env
+
   def test_executor_service_create_no_arg_computation_value_and_call(self):
     ex_factory = executor_stacks.ResourceManagingExecutorFactory(
         lambda _: eager_tf_executor.EagerTFExecutor())
@@ -177,6 +207,39 @@ class ExecutorServiceTest(absltest.TestCase):
     self.assertEqual(value, 10)
     del env
 
+  def test_executor_service_execute_batch_with_client_refs(self):
+    ex_factory = executor_stacks.ResourceManagingExecutorFactory(
+        lambda _: eager_tf_executor.EagerTFExecutor())
+    env = TestEnv(ex_factory)
+
+    @computations.tf_computation(tf.int32)
+    def comp(x):
+      return x + 1
+
+    comp_proto, _ = executor_serialization.serialize_value(comp)
+    arg_proto, _ = executor_serialization.serialize_value(10, tf.int32)
+    comp_ref = executor_pb2.ValueRef(id='comp')
+    arg_ref = executor_pb2.ValueRef(id='arg')
+    result_ref = executor_pb2.ValueRef(id='result')
+    batch = executor_pb2.BatchRequest(operation=[
+        executor_pb2.BatchRequest.Operation(
+            value_ref=comp_ref,
+            create_value=executor_pb2.CreateValueRequest(value=comp_proto)),
+        executor_pb2.BatchRequest.Operation(
+            value_ref=arg_ref,
+            create_value=executor_pb2.CreateValueRequest(value=arg_proto)),
+        executor_pb2.BatchRequest.Operation(
+            value_ref=result_ref,
+            create_call=executor_pb2.CreateCallRequest(
+                function_ref=comp_ref, argument_ref=arg_ref)),
+    ])
+    responses = list(
+        env.stub.Execute(iter([executor_pb2.ExecuteRequest(batch=batch)])))
+    self.assertLen(responses, 1)
+    self.assertEqual(responses[0].WhichOneof('response'), 'batch')
+    self.assertEqual(env.get_value('result'), 11)
+    del env
+
   def test_executor_service_value_unavailable_after_dispose(self):
     ex_factory = executor_stacks.ResourceManagingExecutorFactory(
         lambda _: eager_tf_executor.EagerTFExecutor())
@@ -403,5 +466,88 @@ class StreamingModeExecutorServiceTest(absltest.TestCase):
         env.close_channel()
 
 
+class AsyncExecutorServiceTest(absltest.TestCase):
+
+  def _run_with_async_service(self, test_fn):
+    """Runs `test_fn(stub)` against an `AsyncExecutorService` on a new loop."""
+
+    async def _run():
+      ex_factory = executor_stacks.ResourceManagingExecutorFactory(
+          lambda _: eager_tf_executor.EagerTFExecutor())
+      server = grpc.aio.server()
+      port = server.add_insecure_port('[::]:0')
+      executor_pb2_grpc.add_ExecutorServicer_to_server(
+          executor_service.AsyncExecutorService(
+              ex_factory, max_concurrent_requests_per_stream=4), server)
+      await server.start()
+      channel = grpc.aio.insecure_channel('localhost:{}'.format(port))
+      try:
+        stub = executor_pb2_grpc.ExecutorStub(channel)
+        await stub.SetCardinalities(
+            executor_pb2.SetCardinalitiesRequest(
+                cardinalities=executor_serialization.serialize_cardinalities(
+                    {placement_literals.CLIENTS: 0})))
+        return await test_fn(stub)
+      finally:
+        await channel.close()
+        await server.stop(None)
+
+    loop = asyncio.new_event_loop()
+    try:
+      return loop.run_until_complete(_run())
+    finally:
+      loop.close()
+
+  def test_create_value_and_compute(self):
+
+    async def _test(stub):
+      value_proto, _ = executor_serialization.serialize_value(
+          tf.constant(10.0).numpy(), tf.float32)
+      response = await stub.CreateValue(
+          executor_pb2.CreateValueRequest(value=value_proto))
+      response = await stub.Compute(
+          executor_pb2.ComputeRequest(value_ref=response.value_ref))
+      value, _ = executor_serialization.deserialize_value(response.value)
+      return value
+
+    self.assertEqual(self._run_with_async_service(_test), 10.0)
+
+  def test_execute_responds_to_concurrent_requests(self):
+
+    @computations.tf_computation(tf.int32)
+    def comp(x):
+      return x + 1
+
+    async def _test(stub):
+      call = stub.Execute()
+
+      def _create_value_request(seq, value, type_spec=None):
+        value_proto, _ = executor_serialization.serialize_value(
+            value, type_spec)
+        return executor_pb2.ExecuteRequest(
+            sequence_number=seq,
+            create_value=executor_pb2.CreateValueRequest(value=value_proto))
+
+      # More requests than the service handles at once.
+      await call.write(_create_value_request(0, comp))
+      for i in range(1, 11):
+        await call.write(_create_value_request(i, i, tf.int32))
+      await call.done_writing()
+      return [response async for response in call]
+
+    responses = self._run_with_async_service(_test)
+    self.assertCountEqual([r.sequence_number for r in responses], range(11))
+    for response in responses:
+      self.assertEqual(response.WhichOneof('response'), 'create_value')
+      self.assertTrue(response.create_value.value_ref.id)
+
+  def test_raises_on_non_positive_max_concurrent_requests(self):
+    ex_factory = executor_stacks.ResourceManagingExecutorFactory(
+        lambda _: eager_tf_executor.EagerTFExecutor())
+    with self.assertRaises(ValueError):
+      executor_service.AsyncExecutorService(
+          ex_factory, max_concurrent_requests_per_stream=0)
+
+
 if __name__ == '__main__':
   absltest.main()
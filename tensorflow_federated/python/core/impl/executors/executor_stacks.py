@@ -14,22 +14,29 @@
 """A collection of constructors for basic types of executor stacks."""
 
 import asyncio
+import collections
 from concurrent import futures
+import functools
 import math
-from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import multiprocessing
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+import weakref
 
 import attr
 import grpc
 import tensorflow as tf
 
+from tensorflow_federated.proto.v0 import executor_pb2_grpc
 from tensorflow_federated.python.common_libs import py_typecheck
 from tensorflow_federated.python.core.impl.executors import caching_executor
 from tensorflow_federated.python.core.impl.executors import eager_tf_executor
 from tensorflow_federated.python.core.impl.executors import executor_base
 from tensorflow_federated.python.core.impl.executors import executor_factory
+from tensorflow_federated.python.core.impl.executors import executor_service
 from tensorflow_federated.python.core.impl.executors import federated_composing_strategy
 from tensorflow_federated.python.core.impl.executors import federated_resolving_strategy
 from tensorflow_federated.python.core.impl.executors import federating_executor
+from tensorflow_federated.python.core.impl.executors import load_balancing
 from tensorflow_federated.python.core.impl.executors import reference_resolving_executor
 from tensorflow_federated.python.core.impl.executors import remote_executor
 from tensorflow_federated.python.core.impl.executors import sizing_executor
@@ -236,10 +243,13 @@ class SizingExecutorFactory(ResourceManagingExecutorFactory):
     return bit_size
 
 
-def _wrap_executor_in_threading_stack(ex: executor_base.Executor,
-                                      use_caching: Optional[bool] = False,
-                                      can_resolve_references=True):
-  threaded_ex = thread_delegating_executor.ThreadDelegatingExecutor(ex)
+def _wrap_executor_in_threading_stack(
+    ex: executor_base.Executor,
+    use_caching: Optional[bool] = False,
+    can_resolve_references=True,
+    event_loop_pool: Optional[thread_delegating_executor.EventLoopPool] = None):
+  threaded_ex = thread_delegating_executor.ThreadDelegatingExecutor(
+      ex, event_loop_pool=event_loop_pool)
   if use_caching:
     threaded_ex = caching_executor.CachingExecutor(threaded_ex)
   if can_resolve_references:
@@ -254,6 +264,15 @@ class UnplacedExecutorFactory(executor_factory.ExecutorFactory):
   This factory constructs executors which represent "local execution": work
   that happens at the clients, at the server, or without placements. As such,
   this executor manages the placement of work on local executors.
+
+  By default, each executor constructed by this factory runs in a dedicated
+  thread. If `thread_pool_sizes` is specified, the executors constructed for
+  each of the placements it contains instead share a bounded pool of threads of
+  the given size, one pool per placement.
+
+  The eager executors constructed by all factories share the TensorFlow
+  functions they embed through `eager_tf_executor.shared_function_cache()`, so
+  that a computation run by many clients is only embedded once per device.
   """
 
   def __init__(
@@ -262,12 +281,39 @@ class UnplacedExecutorFactory(executor_factory.ExecutorFactory):
       use_caching: bool,
       can_resolve_references: bool = True,
       server_device: Optional[tf.config.LogicalDevice] = None,
-      client_devices: Optional[Sequence[tf.config.LogicalDevice]] = ()):
+      client_devices: Optional[Sequence[tf.config.LogicalDevice]] = (),
+      thread_pool_sizes: Optional[Mapping[
+          Optional[placement_literals.PlacementLiteral], int]] = None):
+    """Initializes `UnplacedExecutorFactory`.
+
+    Args:
+      use_caching: Whether to wrap the constructed executors in a
+        `caching_executor.CachingExecutor`.
+      can_resolve_references: Whether to wrap the constructed executors in a
+        `reference_resolving_executor.ReferenceResolvingExecutor`.
+      server_device: An optional `tf.config.LogicalDevice` to place server and
+        other computation without explicit TFF placement.
+      client_devices: An optional sequence of `tf.config.LogicalDevice`s to
+        place clients on, in a round-robin fashion.
+      thread_pool_sizes: An optional mapping from placement literals (or `None`
+        for unplaced executors) to positive integers, the number of threads
+        shared by all executors constructed for that placement. Placements
+        absent from this mapping get a dedicated thread per executor.
+    """
     self._use_caching = use_caching
     self._can_resolve_references = can_resolve_references
     self._server_device = server_device
     self._client_devices = client_devices
     self._client_device_index = 0
+    self._event_loop_pools = {}
+    if thread_pool_sizes is not None:
+      py_typecheck.check_type(thread_pool_sizes, collections.abc.Mapping)
+      for placement, num_threads in thread_pool_sizes.items():
+        if placement is not None:
+          py_typecheck.check_type(placement,
+                                  placement_literals.PlacementLiteral)
+        self._event_loop_pools[placement] = (
+            thread_delegating_executor.EventLoopPool(num_threads))
 
   def _get_next_client_device(self) -> Optional[tf.config.LogicalDevice]:
     if not self._client_devices:
@@ -293,11 +339,14 @@ class UnplacedExecutorFactory(executor_factory.ExecutorFactory):
       device = self._server_device
     else:
       device = None
-    eager_ex = eager_tf_executor.EagerTFExecutor(device=device)
+    eager_ex = eager_tf_executor.EagerTFExecutor(
+        device=device,
+        tf_function_cache=eager_tf_executor.shared_function_cache())
     return _wrap_executor_in_threading_stack(
         eager_ex,
         use_caching=self._use_caching,
-        can_resolve_references=self._can_resolve_references)
+        can_resolve_references=self._can_resolve_references,
+        event_loop_pool=self._event_loop_pools.get(placement))
 
   def clean_up_executors(self):
     # Does not hold any executors internally, so nothing to clean up.
@@ -331,6 +380,10 @@ class FederatingExecutorFactory(executor_factory.ExecutorFactory):
       this hardcoded parameter.
     * A boolean `use_sizing` to indicate whether to wire instances of
       `sizing_executors.SizingExecutor` on top of the client stacks.
+    * An optional `merge_arity`, passed on to `federated_strategy_factory`. For
+      the default `federated_resolving_strategy.FederatedResolvingStrategy`,
+      this merges the partial aggregates of the clients in a tree of this
+      arity.
   """
 
   def __init__(self,
@@ -340,9 +393,17 @@ class FederatingExecutorFactory(executor_factory.ExecutorFactory):
                num_clients: Optional[int] = None,
                use_sizing: bool = False,
                federated_strategy_factory=federated_resolving_strategy
-               .FederatedResolvingStrategy.factory):
+               .FederatedResolvingStrategy.factory,
+               merge_arity: Optional[int] = None):
     py_typecheck.check_type(clients_per_thread, int)
     py_typecheck.check_type(unplaced_ex_factory, UnplacedExecutorFactory)
+    if merge_arity is not None:
+      py_typecheck.check_type(merge_arity, int)
+      if merge_arity < 2:
+        raise ValueError(
+            'Expected `merge_arity` to be greater than 1, found {}.'.format(
+                merge_arity))
+    self._merge_arity = merge_arity
     self._clients_per_thread = clients_per_thread
     self._unplaced_executor_factory = unplaced_ex_factory
     if num_clients is not None:
@@ -401,14 +462,20 @@ class FederatingExecutorFactory(executor_factory.ExecutorFactory):
       ]
       self._sizing_executors.extend(client_stacks)
 
-    federating_strategy_factory = self._federated_strategy_factory({
+    target_executors = {
         placement_literals.CLIENTS: [
             client_stacks[k % len(client_stacks)] for k in range(num_clients)
         ],
         placement_literals.SERVER:
             self._unplaced_executor_factory.create_executor(
                 placement=placement_literals.SERVER),
-    })
+    }
+    if self._merge_arity is None:
+      federating_strategy_factory = self._federated_strategy_factory(
+          target_executors)
+    else:
+      federating_strategy_factory = self._federated_strategy_factory(
+          target_executors, merge_arity=self._merge_arity)
     unplaced_executor = self._unplaced_executor_factory.create_executor()
     executor = federating_executor.FederatingExecutor(
         federating_strategy_factory, unplaced_executor)
@@ -476,15 +543,21 @@ class ComposingExecutorFactory(executor_factory.ExecutorFactory):
   compositional hierarchy based on the `max_fanout` parameter.
   """
 
-  def __init__(self, *, max_fanout: int,
+  def __init__(self,
+               *,
+               max_fanout: int,
                unplaced_ex_factory: UnplacedExecutorFactory,
                flat_stack_fn: Callable[[executor_factory.CardinalitiesType],
-                                       Sequence[executor_base.Executor]]):
+                                       Sequence[executor_base.Executor]],
+               speculation_policy: Optional[
+                   federated_composing_strategy
+                   .SpeculativeExecutionPolicy] = None):
     if max_fanout < 2:
       raise ValueError('Max fanout must be greater than 1.')
     self._flat_stack_fn = flat_stack_fn
     self._max_fanout = max_fanout
     self._unplaced_ex_factory = unplaced_ex_factory
+    self._speculation_policy = speculation_policy
 
   def create_executor(
       self, cardinalities: executor_factory.CardinalitiesType
@@ -515,7 +588,9 @@ class ComposingExecutorFactory(executor_factory.ExecutorFactory):
     server_executor = self._unplaced_ex_factory.create_executor(
         placement=placement_literals.SERVER)
     composing_strategy_factory = federated_composing_strategy.FederatedComposingStrategy.factory(
-        server_executor, target_executors)
+        server_executor,
+        target_executors,
+        speculation_policy=self._speculation_policy)
     unplaced_executor = self._unplaced_ex_factory.create_executor()
     composing_executor = federating_executor.FederatingExecutor(
         composing_strategy_factory, unplaced_executor)
@@ -569,7 +644,9 @@ def local_executor_factory(
     max_fanout=100,
     clients_per_thread=1,
     server_tf_device=None,
-    client_tf_devices=tuple()
+    client_tf_devices=tuple(),
+    thread_pool_sizes=None,
+    merge_arity=None
 ) -> executor_factory.ExecutorFactory:
   """Constructs an executor factory to execute computations locally.
 
@@ -596,6 +673,14 @@ def local_executor_factory(
     client_tf_devices: List/tuple of `tf.config.LogicalDevice` to place clients
       for simulation. Possibly accelerators returned by
       `tf.config.list_logical_devices()`.
+    thread_pool_sizes: An optional mapping from placement literals (or `None`
+      for unplaced executors) to the number of threads shared by all local
+      executors for that placement, see `UnplacedExecutorFactory`. By default,
+      each local executor runs in a dedicated thread.
+    merge_arity: An optional integer greater than 1. If specified, the partial
+      aggregates of the clients in `tff.federated_aggregate` are merged in a
+      concurrent tree of this arity, rather than accumulated sequentially at
+      the server, see `FederatedResolvingStrategy`.
 
   Returns:
     An instance of `executor_factory.ExecutorFactory` encapsulating the
@@ -616,12 +701,14 @@ def local_executor_factory(
   unplaced_ex_factory = UnplacedExecutorFactory(
       use_caching=False,
       server_device=server_tf_device,
-      client_devices=client_tf_devices)
+      client_devices=client_tf_devices,
+      thread_pool_sizes=thread_pool_sizes)
   federating_executor_factory = FederatingExecutorFactory(
       clients_per_thread=clients_per_thread,
       unplaced_ex_factory=unplaced_ex_factory,
       num_clients=num_clients,
-      use_sizing=False)
+      use_sizing=False,
+      merge_arity=merge_arity)
   flat_stack_fn = create_minimal_length_flat_stack_fn(
       max_fanout, federating_executor_factory)
   full_stack_factory = ComposingExecutorFactory(
@@ -828,16 +915,44 @@ class ReconstructOnChangeExecutorFactory(executor_factory.ExecutorFactory):
 
 
 def remote_executor_factory(
-    channels: List[grpc.Channel],
+    channels: List[Union[grpc.Channel, Callable[[], grpc.aio.Channel]]],
     rpc_mode: str = 'REQUEST_REPLY',
     thread_pool_executor: Optional[futures.Executor] = None,
     dispose_batch_size: int = 20,
-    max_fanout: int = 100) -> executor_factory.ExecutorFactory:
+    max_fanout: int = 100,
+    deduplicate_values: bool = False,
+    batch_requests: bool = False,
+    balance_client_load: bool = False,
+    speculation_policy: Optional[
+        federated_composing_strategy.SpeculativeExecutionPolicy] = None
+) -> executor_factory.ExecutorFactory:
   """Create an executor backed by remote workers.
 
+  By default, clients are split evenly across the workers. If
+  `balance_client_load` is set, the throughput of each worker is measured
+  instead, as the number of clients it hosts per second during which it has
+  requests in flight, and clients are assigned to workers in proportion to
+  their throughput. The clients are reassigned between rounds once the
+  measurements call for moving more than 10% of them, so that slower workers,
+  or workers with more data per client, stop defining the duration of a round.
+
+  The levels of the aggregation hierarchy above the workers all run in this
+  process, so values broadcast to the clients are sent to every worker from
+  here. To bound the egress of this process by `max_fanout` instead, connect
+  `channels` to intermediate aggregators, i.e., to executor services which are
+  themselves backed by a `remote_executor_factory` over the workers, such as
+  the `remote_executor_service` binary run with `--worker_addresses`. Each
+  aggregator receives a broadcast value once and re-broadcasts it to its own
+  workers.
+
+  Workers that are slow within a round can additionally be mitigated by a
+  `speculation_policy`, under which the shards of a `federated_map` still
+  running once most shards have finished are re-executed on idle workers.
+
   Args:
     channels: A list of `grpc.Channels` hosting services which can execute TFF
-      work.
+      work. If `rpc_mode` is 'ASYNC_STREAMING', a list of no-arg functions
+      returning `grpc.aio.Channel`s instead, see `RemoteExecutor`.
     rpc_mode: A string specifying the connection mode between the local host and
       `channels`.
     thread_pool_executor: Optional concurrent.futures.Executor used to wait for
@@ -851,6 +966,16 @@ def remote_executor_factory(
       `num_clients > max_fanout`, the constructed executor stack will consist of
       multiple levels of aggregators. The height of the stack will be on the
       order of `log(num_clients) / log(max_fanout)`.
+    deduplicate_values: Whether to send large values to each worker by digest
+      once the worker holds them, see `remote_executor.RemoteExecutor`.
+    batch_requests: Whether to coalesce the values created on each worker
+      within one iteration of the event loop into a single request, in a
+      streaming `rpc_mode`. See `remote_executor.RemoteExecutor`.
+    balance_client_load: Whether to assign clients to workers in proportion to
+      their measured throughput, rather than evenly.
+    speculation_policy: An optional
+      `federated_composing_strategy.SpeculativeExecutionPolicy` re-executing
+      straggling shards of `federated_map` on idle workers.
 
   Returns:
     An instance of `executor_factory.ExecutorFactory` encapsulating the
@@ -872,7 +997,17 @@ def remote_executor_factory(
             channel=channel,
             rpc_mode=rpc_mode,
             thread_pool_executor=thread_pool_executor,
-            dispose_batch_size=dispose_batch_size))
+            dispose_batch_size=dispose_batch_size,
+            deduplicate_values=deduplicate_values,
+            batch_requests=batch_requests))
+  if balance_client_load:
+    worker_executors = [
+        load_balancing.LoadTrackingExecutor(ex) for ex in remote_executors
+    ]
+    load_balancer = load_balancing.ClientLoadBalancer(worker_executors)
+  else:
+    worker_executors = remote_executors
+    load_balancer = None
 
   def _get_event_loop():
     should_close_loop = False
@@ -906,16 +1041,25 @@ def remote_executor_factory(
             for e in remote_executors
         ]
 
-      remaining_clients = cardinalities[placement_literals.CLIENTS]
+      num_clients = cardinalities[placement_literals.CLIENTS]
+      if load_balancer is not None:
+        clients_per_worker = load_balancer.assign(num_clients)
+      else:
+        clients_per_worker = []
+        remaining_clients = num_clients
+        for ex_idx in range(len(remote_executors)):
+          remaining_executors = len(remote_executors) - ex_idx
+          num_clients_to_host = remaining_clients // remaining_executors
+          remaining_clients -= num_clients_to_host
+          clients_per_worker.append(num_clients_to_host)
       live_workers = []
-      for ex_idx, ex in enumerate(remote_executors):
-        remaining_executors = len(remote_executors) - ex_idx
-        num_clients_to_host = remaining_clients // remaining_executors
-        remaining_clients -= num_clients_to_host
+      for ex, worker_ex, num_clients_to_host in zip(remote_executors,
+                                                    worker_executors,
+                                                    clients_per_worker):
         if num_clients_to_host > 0:
           _configure_remote_executor(
               ex, {placement_literals.CLIENTS: num_clients_to_host}, loop)
-          live_workers.append(ex)
+          live_workers.append(worker_ex)
     finally:
       if must_close_loop:
         loop.stop()
@@ -932,6 +1076,7 @@ def remote_executor_factory(
       max_fanout=max_fanout,
       unplaced_ex_factory=unplaced_ex_factory,
       flat_stack_fn=flat_stack_fn,
+      speculation_policy=speculation_policy,
   )
 
   class _ChangeQuery:
@@ -944,9 +1089,162 @@ def remote_executor_factory(
                  cardinalities: executor_factory.CardinalitiesType) -> bool:
       cardinalities_changed = self._cardinalities != cardinalities
       self._cardinalities = cardinalities
+      if load_balancer is not None and cardinalities.get(
+          placement_literals.CLIENTS):
+        # Always consulted, so that it measures every round.
+        needs_rebalance = load_balancer.needs_rebalance(
+            cardinalities[placement_literals.CLIENTS])
+        return cardinalities_changed or needs_rebalance
       return cardinalities_changed
 
   return ReconstructOnChangeExecutorFactory(
       underlying_stack=composing_executor_factory,
       ensure_closed=remote_executors,
       change_query=_ChangeQuery())
+
+
+# Allow arbitrarily large messages between the coordinator and the local worker
+# processes; both ends of the connection live on the same host.
+_LOCAL_WORKER_GRPC_OPTIONS = [
+    ('grpc.max_send_message_length', -1),
+    ('grpc.max_receive_message_length', -1),
+]
+
+
+def _serve_local_worker(connection, num_server_threads: int, max_fanout: int,
+                        clients_per_thread: int):
+  """Runs an `ExecutorService` in a local worker process.
+
+  The service is bound to an unused port on `localhost`; the chosen port is sent
+  back to the parent process over `connection` once the server has started.
+
+  Args:
+    connection: The child end of a `multiprocessing.Pipe`.
+    num_server_threads: The number of threads used by the gRPC server.
+    max_fanout: The `max_fanout` of the worker's local executor stack.
+    clients_per_thread: The `clients_per_thread` of the worker's local executor
+      stack.
+  """
+  ex_factory = local_executor_factory(
+      max_fanout=max_fanout, clients_per_thread=clients_per_thread)
+  service = executor_service.ExecutorService(ex_factory)
+  server = grpc.server(
+      futures.ThreadPoolExecutor(max_workers=num_server_threads),
+      options=_LOCAL_WORKER_GRPC_OPTIONS)
+  executor_pb2_grpc.add_ExecutorServicer_to_server(service, server)
+  port = server.add_insecure_port('localhost:0')
+  server.start()
+  connection.send(port)
+  connection.close()
+  server.wait_for_termination()
+
+
+def _terminate_local_workers(processes: List[multiprocessing.Process]):
+  for process in processes:
+    if process.is_alive():
+      process.terminate()
+  for process in processes:
+    process.join()
+
+
+def local_multiprocess_executor_factory(
+    num_processes: Optional[int] = None,
+    max_fanout: int = 100,
+    clients_per_thread: int = 1,
+    num_server_threads: int = 10,
+    rpc_mode: str = 'REQUEST_REPLY') -> executor_factory.ExecutorFactory:
+  """Constructs an executor factory sharding clients across local processes.
+
+  Spawns `num_processes` worker processes on the local machine, each of which
+  hosts an `ExecutorService` backed by a `local_executor_factory` stack and
+  listens on a `localhost` port. The returned factory is a
+  `remote_executor_factory` connected to these workers, so the clients of each
+  computation are sharded across the worker processes in the same way they
+  would be sharded across remote workers. This side-steps the Python GIL for
+  CPU-bound client work, letting a simulation use every core of the machine.
+
+  The worker processes are started with the `spawn` method and are terminated
+  when the returned factory is garbage collected, or when the parent process
+  exits.
+
+  Args:
+    num_processes: The number of worker processes to spawn. Defaults to the
+      number of CPUs on the machine.
+    max_fanout: The maximum fanout at any point in the aggregation hierarchy,
+      used both by the coordinator and by each worker's executor stack.
+    clients_per_thread: Integer number of clients for each of TFF's threads to
+      run in sequence within a worker process.
+    num_server_threads: The number of threads used by the gRPC server of each
+      worker process.
+    rpc_mode: A string specifying the connection mode between the coordinator
+      and the worker processes, as in `remote_executor_factory`.
+
+  Returns:
+    An instance of `executor_factory.ExecutorFactory` encapsulating the
+    executor construction logic specified above.
+
+  Raises:
+    ValueError: If `num_processes` or `num_server_threads` is not positive.
+    RuntimeError: If a worker process exits before its server has started.
+  """
+  if num_processes is None:
+    num_processes = multiprocessing.cpu_count()
+  py_typecheck.check_type(num_processes, int)
+  if num_processes < 1:
+    raise ValueError('Must spawn at least one worker process, found {}.'.format(
+        num_processes))
+  py_typecheck.check_type(num_server_threads, int)
+  if num_server_threads < 1:
+    raise ValueError(
+        'Each worker must use at least one server thread, found {}.'.format(
+            num_server_threads))
+  py_typecheck.check_type(max_fanout, int)
+  py_typecheck.check_type(clients_per_thread, int)
+
+  mp_context = multiprocessing.get_context('spawn')
+  processes = []
+  parent_connections = []
+  ports = []
+  try:
+    # Start every worker before waiting on any of them, so that they import
+    # TensorFlow and start their servers concurrently.
+    for _ in range(num_processes):
+      parent_connection, child_connection = mp_context.Pipe(duplex=False)
+      process = mp_context.Process(
+          target=_serve_local_worker,
+          args=(child_connection, num_server_threads, max_fanout,
+                clients_per_thread),
+          daemon=True)
+      parent_connections.append(parent_connection)
+      process.start()
+      child_connection.close()
+      processes.append(process)
+    for process, parent_connection in zip(processes, parent_connections):
+      try:
+        ports.append(parent_connection.recv())
+      except EOFError as e:
+        # The pipe is closed when the worker exits; wait briefly for its code.
+        process.join(timeout=1)
+        raise RuntimeError(
+            'Local worker process exited with code {} before starting its '
+            'server.'.format(process.exitcode)) from e
+  except BaseException:
+    _terminate_local_workers(processes)
+    raise
+  finally:
+    for parent_connection in parent_connections:
+      parent_connection.close()
+
+  def _create_channel(port):
+    target = 'localhost:{}'.format(port)
+    if rpc_mode == 'ASYNC_STREAMING':
+      # Asyncio channels are created lazily, in the loop owning the stream.
+      return functools.partial(
+          grpc.aio.insecure_channel, target, options=_LOCAL_WORKER_GRPC_OPTIONS)
+    return grpc.insecure_channel(target, options=_LOCAL_WORKER_GRPC_OPTIONS)
+
+  channels = [_create_channel(port) for port in ports]
+  factory = remote_executor_factory(
+      channels=channels, rpc_mode=rpc_mode, max_fanout=max_fanout)
+  weakref.finalize(factory, _terminate_local_workers, processes)
+  return factory
@@ -30,6 +30,7 @@ from tensorflow_federated.python.core.impl.executors import executor_base
 from tensorflow_federated.python.core.impl.executors import executor_factory
 from tensorflow_federated.python.core.impl.executors import executor_stacks
 from tensorflow_federated.python.core.impl.executors import executor_test_utils
+from tensorflow_federated.python.core.impl.executors import federated_resolving_strategy
 from tensorflow_federated.python.core.impl.types import placement_literals
 
 
@@ -279,6 +280,10 @@ class ExecutorStacksTest(parameterized.TestCase):
        executor_stacks.local_executor_factory(num_clients=3)),
       ('sizing_executor_three_clients',
        executor_stacks.sizing_executor_factory(num_clients=3)),
+      ('local_executor_three_clients_sharing_threads',
+       executor_stacks.local_executor_factory(
+           num_clients=3,
+           thread_pool_sizes={placement_literals.CLIENTS: 2})),
   )
   @test_utils.skip_test_for_multi_gpu
   def test_execution_of_temperature_sensor_example(self, executor):
@@ -313,6 +318,26 @@ class ExecutorStacksTest(parameterized.TestCase):
 
     self.assertEqual(result, 55)
 
+  def test_execution_of_federated_aggregate_with_merge_arity(self):
+
+    @computations.tf_computation(tf.int32, tf.int32)
+    def add(x, y):
+      return x + y
+
+    @computations.tf_computation(tf.int32)
+    def report(x):
+      return x
+
+    @computations.federated_computation(computation_types.at_clients(tf.int32))
+    def comp(x):
+      return intrinsics.federated_aggregate(x, 0, add, add, report)
+
+    executor = executor_stacks.local_executor_factory(merge_arity=2)
+    with executor_test_utils.install_executor(executor):
+      result = comp(list(range(10)))
+
+    self.assertEqual(result, 45)
+
   @parameterized.named_parameters(
       ('local_executor_none_clients', executor_stacks.local_executor_factory()),
       ('sizing_executor_none_clients',
@@ -448,6 +473,26 @@ class UnplacedExecutorFactoryTest(parameterized.TestCase):
     unplaced_executor = unplaced_factory.create_executor()
     self.assertIsInstance(unplaced_executor, executor_base.Executor)
 
+  def test_create_executor_with_thread_pool_sizes_shares_threads(self):
+    unplaced_factory = executor_stacks.UnplacedExecutorFactory(
+        use_caching=False,
+        thread_pool_sizes={placement_literals.CLIENTS: 2})
+    client_executors = [
+        unplaced_factory.create_executor(placement=placement_literals.CLIENTS)
+        for _ in range(5)
+    ]
+    for executor in client_executors:
+      self.assertIsInstance(executor, executor_base.Executor)
+    pool = unplaced_factory._event_loop_pools[placement_literals.CLIENTS]
+    self.assertEqual(pool.num_threads, 2)
+    self.assertCountEqual(pool.num_executors, [3, 2])
+
+  def test_create_executor_raises_with_invalid_thread_pool_size(self):
+    with self.assertRaises(ValueError):
+      executor_stacks.UnplacedExecutorFactory(
+          use_caching=False,
+          thread_pool_sizes={placement_literals.CLIENTS: 0})
+
 
 class FederatingExecutorFactoryTest(absltest.TestCase):
 
@@ -474,6 +519,27 @@ class FederatingExecutorFactoryTest(absltest.TestCase):
     self.assertIsInstance(sizing_ex_list, list)
     self.assertEmpty(sizing_ex_list)
 
+  def test_passes_merge_arity_to_strategy_factory(self):
+    unplaced_factory = executor_stacks.UnplacedExecutorFactory(use_caching=True)
+    strategy_factory = mock.Mock(
+        side_effect=federated_resolving_strategy.FederatedResolvingStrategy
+        .factory)
+    federating_factory = executor_stacks.FederatingExecutorFactory(
+        clients_per_thread=1,
+        unplaced_ex_factory=unplaced_factory,
+        federated_strategy_factory=strategy_factory,
+        merge_arity=2)
+    federating_factory.create_executor({placement_literals.CLIENTS: 3})
+    strategy_factory.assert_called_once_with(mock.ANY, merge_arity=2)
+
+  def test_raises_with_merge_arity_less_than_two(self):
+    unplaced_factory = executor_stacks.UnplacedExecutorFactory(use_caching=True)
+    with self.assertRaises(ValueError):
+      executor_stacks.FederatingExecutorFactory(
+          clients_per_thread=1,
+          unplaced_ex_factory=unplaced_factory,
+          merge_arity=1)
+
   def test_constructs_as_many_sizing_executors_as_client_executors(self):
     unplaced_factory = executor_stacks.UnplacedExecutorFactory(use_caching=True)
     federating_factory = executor_stacks.FederatingExecutorFactory(
@@ -713,5 +779,31 @@ class RemoteExecutorFactoryTest(absltest.TestCase):
     loop.close()
 
 
+class LocalMultiprocessExecutorFactoryTest(absltest.TestCase):
+
+  def test_raises_with_zero_processes(self):
+    with self.assertRaises(ValueError):
+      executor_stacks.local_multiprocess_executor_factory(num_processes=0)
+
+  def test_raises_with_zero_server_threads(self):
+    with self.assertRaises(ValueError):
+      executor_stacks.local_multiprocess_executor_factory(
+          num_processes=1, num_server_threads=0)
+
+  @test_utils.skip_test_for_multi_gpu
+  def test_execution_shards_clients_across_processes(self):
+
+    @computations.federated_computation(computation_types.at_clients(tf.int32))
+    def foo(x):
+      return intrinsics.federated_sum(x)
+
+    executor = executor_stacks.local_multiprocess_executor_factory(
+        num_processes=2, max_fanout=3)
+    with executor_test_utils.install_executor(executor):
+      result = foo([1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
+
+    self.assertEqual(result, 55)
+
+
 if __name__ == '__main__':
   absltest.main()
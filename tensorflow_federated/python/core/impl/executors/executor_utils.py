@@ -157,6 +157,26 @@ async def embed_tf_binary_operator_with_upcast(executor, type_spec, op):
   return await executor.create_value(proto, type_signature)
 
 
+async def embed_tf_stacked_reduction(executor, type_spec, reduction):
+  """Embeds a `reduction` over stacked `type_spec`-typed values in `executor`.
+
+  Args:
+    executor: An instance of `tff.framework.Executor`.
+    type_spec: An instance of `tff.Type` of the type of values that are stacked
+      to form the input of the reduction, and of its output.
+    reduction: A reduction function (such as `tf.math.reduce_sum`) to apply to
+      the tensor-level constituents of the stacked values, over the leading
+      dimension.
+
+  Returns:
+    An instance of `tff.framework.ExecutorValue` representing the reduction in
+    a form embedded into the executor.
+  """
+  proto, type_signature = tensorflow_computation_factory.create_stacked_reduction(
+      reduction, type_spec)
+  return await executor.create_value(proto, type_signature)
+
+
 def create_intrinsic_comp(intrinsic_def, type_spec):
   """Creates an intrinsic `pb.Computation`.
 
@@ -44,7 +44,8 @@
 """
 
 import asyncio
-from typing import Any, List
+import math
+from typing import Any, List, Optional
 
 import tensorflow as tf
 
@@ -127,6 +128,82 @@ class FederatedComposingStrategyValue(executor_value_base.ExecutorValue):
                                   py_typecheck.type_string(type(self._value))))
 
 
+class SpeculativeExecutionPolicy(object):
+  """An opt-in policy re-executing straggling shards of `federated_map`.
+
+  Under this policy, a `FederatedComposingStrategy` computes each shard of the
+  result of a `federated_map` as soon as it has been dispatched to its target
+  executor. Once `quantile` of the shards have finished, the argument of each
+  remaining shard is copied to a target executor that has already finished and
+  hosts the same number of clients, and the mapped function is re-executed
+  there. Whichever result arrives first is used and the other is cancelled; a
+  result computed on another target executor is embedded back in the target
+  executor owning the shard.
+
+  Shards are probed for completion by mapping them to empty structures, so the
+  results of shards which are not re-executed stay in their target executors.
+  The arguments and results of re-executed shards are transferred through the
+  composing executor, so this policy trades bandwidth for latency and is best
+  suited to rounds dominated by a few slow workers. A single policy may be
+  shared by several strategies, in which case its metrics are aggregated across
+  them.
+  """
+
+  def __init__(self, quantile: float = 0.9):
+    """Creates a `SpeculativeExecutionPolicy`.
+
+    Args:
+      quantile: The fraction of shards that must have finished before the
+        remaining shards are re-executed, in `(0, 1]`.
+
+    Raises:
+      ValueError: If `quantile` is out of range.
+    """
+    py_typecheck.check_type(quantile, float)
+    if not 0.0 < quantile <= 1.0:
+      raise ValueError('The quantile must be in (0, 1], found {}.'.format(
+          quantile))
+    self._quantile = quantile
+    self._num_maps = 0
+    self._num_speculations = 0
+    self._num_speculative_wins = 0
+
+  @property
+  def quantile(self) -> float:
+    return self._quantile
+
+  @property
+  def num_maps(self) -> int:
+    """The number of maps computed under this policy."""
+    return self._num_maps
+
+  @property
+  def num_speculations(self) -> int:
+    """The number of shards that have been re-executed."""
+    return self._num_speculations
+
+  @property
+  def num_speculative_wins(self) -> int:
+    """The number of re-executed shards whose copy finished first."""
+    return self._num_speculative_wins
+
+  def num_shards_to_wait_for(self, num_shards: int) -> int:
+    """The number of shards to finish before re-executing the others."""
+    return max(1, math.ceil(self._quantile * num_shards))
+
+  def record_map(self):
+    """Records that a map has been computed under this policy."""
+    self._num_maps += 1
+
+  def record_speculation(self):
+    """Records that a shard has been re-executed."""
+    self._num_speculations += 1
+
+  def record_speculative_win(self):
+    """Records that the copy of a re-executed shard has finished first."""
+    self._num_speculative_wins += 1
+
+
 class FederatedComposingStrategy(federating_executor.FederatingStrategy):
   """A strategy for composing federated types and intrinsics in disjoint scopes.
 
@@ -143,13 +220,23 @@ class FederatedComposingStrategy(federating_executor.FederatingStrategy):
   """
 
   @classmethod
-  def factory(cls, server_executor: executor_base.Executor,
-              target_executors: List[executor_base.Executor]):
-    return lambda executor: cls(executor, server_executor, target_executors)
-
-  def __init__(self, executor: federating_executor.FederatingExecutor,
-               server_executor: executor_base.Executor,
-               target_executors: List[executor_base.Executor]):
+  def factory(
+      cls,
+      server_executor: executor_base.Executor,
+      target_executors: List[executor_base.Executor],
+      speculation_policy: Optional[SpeculativeExecutionPolicy] = None):
+    return lambda executor: cls(
+        executor,
+        server_executor,
+        target_executors,
+        speculation_policy=speculation_policy)
+
+  def __init__(
+      self,
+      executor: federating_executor.FederatingExecutor,
+      server_executor: executor_base.Executor,
+      target_executors: List[executor_base.Executor],
+      speculation_policy: Optional[SpeculativeExecutionPolicy] = None):
     """Creates a `FederatedComposingStrategy`.
 
     Args:
@@ -160,6 +247,8 @@ class FederatedComposingStrategy(federating_executor.FederatingStrategy):
         server-side processing, etc.
       target_executors: The list of executors that manage disjoint scopes to
         combine in this executor, delegate to and collect or aggregate from.
+      speculation_policy: An optional `SpeculativeExecutionPolicy` to apply to
+        `federated_map`. By default, straggling shards are not re-executed.
 
     Raises:
       TypeError: If `server_executor` is not an `executor_base.Executor` or if
@@ -170,8 +259,15 @@ class FederatedComposingStrategy(federating_executor.FederatingStrategy):
     py_typecheck.check_type(target_executors, list)
     for e in target_executors:
       py_typecheck.check_type(e, executor_base.Executor)
+    if speculation_policy is not None:
+      py_typecheck.check_type(speculation_policy, SpeculativeExecutionPolicy)
     self._server_executor = server_executor
     self._target_executors = target_executors
+    self._speculation_policy = speculation_policy
+    # The cardinalities of the target executors, fetched once for speculation.
+    self._cardinalities = None
+    # The computations probing the shards of maps, keyed by member type.
+    self._probe_comps = {}
 
   def close(self):
     self._server_executor.close()
@@ -331,6 +427,11 @@ class FederatedComposingStrategy(federating_executor.FederatingStrategy):
   async def compute_federated_broadcast(
       self,
       arg: FederatedComposingStrategyValue) -> FederatedComposingStrategyValue:
+    """Broadcasts a server value, once to each of the target executors.
+
+    Target executors which compose further executors re-broadcast the value
+    themselves, so that the value crosses each edge of the hierarchy once.
+    """
     return await executor_utils.compute_intrinsic_federated_broadcast(
         self._executor, arg)
 
@@ -421,10 +522,124 @@ class FederatedComposingStrategy(federating_executor.FederatingStrategy):
 
     result_vals = await asyncio.gather(
         *[_child_fn(c, v) for c, v in zip(self._target_executors, val)])
+    if (self._speculation_policy is not None and
+        len(self._target_executors) > 1):
+      result_vals = await self._compute_speculatively(result_vals, val,
+                                                      fn_type.result, _child_fn)
     federated_type = computation_types.FederatedType(
         fn_type.result, val_type.placement, all_equal=all_equal)
     return FederatedComposingStrategyValue(result_vals, federated_type)
 
+  async def _probe(self, executor, result_val, member_type):
+    """Waits until the shard `result_val` has been computed by `executor`.
+
+    Args:
+      executor: The target executor owning `result_val`.
+      result_val: A shard of the result of a map, placed at `tff.CLIENTS`.
+      member_type: The type of the members of `result_val`.
+    """
+    if not type_analysis.is_tensorflow_compatible_type(member_type):
+      await result_val.compute()
+      return
+    probe_comps = self._probe_comps.get(member_type)
+    if probe_comps is None:
+      # Mapping the shard to empty structures waits for it to be computed, while
+      # only transferring the empty structures from `executor`.
+      probe_fn, probe_fn_type = (
+          tensorflow_computation_factory.create_computation_for_py_fn(
+              lambda _: structure.Struct([]), member_type))
+      map_type = computation_types.FunctionType(
+          [probe_fn_type, computation_types.at_clients(member_type)],
+          computation_types.at_clients(probe_fn_type.result))
+      map_comp = executor_utils.create_intrinsic_comp(
+          intrinsic_defs.FEDERATED_MAP, map_type)
+      probe_comps = (probe_fn, probe_fn_type, map_comp, map_type)
+      self._probe_comps[member_type] = probe_comps
+    probe_fn, probe_fn_type, map_comp, map_type = probe_comps
+    fn_val, map_val = await asyncio.gather(
+        executor.create_value(probe_fn, probe_fn_type),
+        executor.create_value(map_comp, map_type))
+    map_arg = await executor.create_struct([fn_val, result_val])
+    probe_val = await executor.create_call(map_val, map_arg)
+    await probe_val.compute()
+
+  async def _compute_speculatively(self, result_vals, arg_vals, member_type,
+                                   child_fn):
+    """Computes the shards of a map, re-executing the stragglers.
+
+    Args:
+      result_vals: The list of shards of the result of the map, one for each
+        element in `self._target_executors`.
+      arg_vals: The list of shards of the argument of the map, in the same
+        order as `result_vals`.
+      member_type: The type of the members of the result of the map.
+      child_fn: An async function creating the map of the shard of the argument
+        it is passed in the target executor it is passed.
+
+    Returns:
+      A list of shards of the result of the map, in which shards computed by
+      another target executor have been embedded back in their target executor.
+    """
+    policy = self._speculation_policy
+    policy.record_map()
+    if self._cardinalities is None:
+      self._cardinalities = await self._get_cardinalities()
+    cardinalities = self._cardinalities
+    primaries = [
+        asyncio.ensure_future(self._probe(ex, v, member_type))
+        for ex, v in zip(self._target_executors, result_vals)
+    ]
+    pending = set(primaries)
+    num_to_wait_for = policy.num_shards_to_wait_for(len(primaries))
+    while pending and len(primaries) - len(pending) < num_to_wait_for:
+      _, pending = await asyncio.wait(
+          pending, return_when=asyncio.FIRST_COMPLETED)
+    if not pending:
+      await asyncio.gather(*primaries)
+      return result_vals
+
+    idle = [
+        i for i, p in enumerate(primaries) if p.done() and not p.exception()
+    ]
+
+    async def _reexecute(index, target_index):
+      arg = await arg_vals[index].compute()
+      ex = self._target_executors[target_index]
+      copy = await ex.create_value(arg, arg_vals[index].type_signature)
+      result = await child_fn(ex, copy)
+      return await result.compute()
+
+    backups = {}
+    for index, primary in enumerate(primaries):
+      if primary.done():
+        continue
+      candidates = [
+          i for i in idle if cardinalities[i] == cardinalities[index]
+      ]
+      if not candidates:
+        continue
+      target_index = candidates[len(backups) % len(candidates)]
+      backups[index] = asyncio.ensure_future(_reexecute(index, target_index))
+      policy.record_speculation()
+
+    result_vals = list(result_vals)
+    superseded = set()
+    for index, backup in backups.items():
+      primary = primaries[index]
+      done, _ = await asyncio.wait([primary, backup],
+                                   return_when=asyncio.FIRST_COMPLETED)
+      if backup in done and backup.exception() is None:
+        primary.cancel()
+        superseded.add(index)
+        result_vals[index] = await self._target_executors[index].create_value(
+            backup.result(), result_vals[index].type_signature)
+        policy.record_speculative_win()
+      else:
+        backup.cancel()
+    await asyncio.gather(
+        *[p for i, p in enumerate(primaries) if i not in superseded])
+    return result_vals
+
   @tracing.trace
   async def compute_federated_map(
       self,
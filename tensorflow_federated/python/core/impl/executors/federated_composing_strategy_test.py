@@ -27,6 +27,8 @@ from tensorflow_federated.python.core.impl import intrinsic_factory
 from tensorflow_federated.python.core.impl.compiler import intrinsic_defs
 from tensorflow_federated.python.core.impl.context_stack import context_stack_impl
 from tensorflow_federated.python.core.impl.executors import eager_tf_executor
+from tensorflow_federated.python.core.impl.executors import executor_base
+from tensorflow_federated.python.core.impl.executors import executor_value_base
 from tensorflow_federated.python.core.impl.executors import federated_composing_strategy
 from tensorflow_federated.python.core.impl.executors import federated_resolving_strategy
 from tensorflow_federated.python.core.impl.executors import federating_executor
@@ -66,6 +68,74 @@ def _create_test_executor():
   return executor, num_clients
 
 
+class _SlowMapExecutorValue(executor_value_base.ExecutorValue):
+
+  def __init__(self, value, delay, computed_types):
+    self._value = value
+    self._delay = delay
+    self._computed_types = computed_types
+
+  @property
+  def value(self):
+    return self._value
+
+  @property
+  def type_signature(self):
+    return self._value.type_signature
+
+  async def compute(self):
+    self._computed_types.append(self.type_signature)
+    await asyncio.sleep(self._delay)
+    return await self._value.compute()
+
+
+class _SlowMapExecutor(executor_base.Executor):
+  """An executor delaying the results of calls to `federated_map`.
+
+  The types of the values computed are recorded in `computed_types`.
+  """
+
+  def __init__(self, target, delay):
+    self._target = target
+    self._delay = delay
+    self.computed_types = []
+
+  async def create_value(self, value, type_spec=None):
+    return _SlowMapExecutorValue(
+        await self._target.create_value(value, type_spec), 0,
+        self.computed_types)
+
+  async def create_call(self, comp, arg=None):
+    result = await self._target.create_call(
+        comp.value, arg.value if arg is not None else None)
+    # Only the call to `federated_map` has a struct parameter.
+    is_map = isinstance(comp.type_signature.parameter,
+                        computation_types.StructType)
+    return _SlowMapExecutorValue(result, self._delay if is_map else 0,
+                                 self.computed_types)
+
+  async def create_struct(self, elements):
+    return _SlowMapExecutorValue(
+        await self._target.create_struct([e.value for e in elements]), 0,
+        self.computed_types)
+
+  async def create_selection(self, source, index=None, name=None):
+    return _SlowMapExecutorValue(
+        await self._target.create_selection(
+            source.value, index=index, name=name), 0, self.computed_types)
+
+  def close(self):
+    self._target.close()
+
+
+def _create_speculative_stack(children, policy):
+  factory = federated_composing_strategy.FederatedComposingStrategy.factory(
+      _create_bottom_stack(), children, speculation_policy=policy)
+  executor = federating_executor.FederatingExecutor(factory,
+                                                    _create_bottom_stack())
+  return reference_resolving_executor.ReferenceResolvingExecutor(executor)
+
+
 def _invoke(ex, comp, arg=None):
   loop = asyncio.get_event_loop()
   v1 = loop.run_until_complete(ex.create_value(comp))
@@ -314,6 +384,79 @@ class FederatedComposingStrategyTest(absltest.TestCase):
     for value in result:
       self.assertEqual(value.numpy(), 10 + 1)
 
+  def test_federated_map_reexecutes_straggler(self):
+
+    @computations.tf_computation(tf.int32)
+    def add_one(x):
+      return x + 1
+
+    @computations.federated_computation(computation_types.at_clients(tf.int32))
+    def comp(x):
+      return intrinsics.federated_map(add_one, x)
+
+    policy = federated_composing_strategy.SpeculativeExecutionPolicy(
+        quantile=0.5)
+    executor = _create_speculative_stack([
+        _create_worker_stack(),
+        _create_worker_stack(),
+        _SlowMapExecutor(_create_worker_stack(), delay=60.0),
+    ], policy)
+    result = _invoke(executor, comp, list(range(6)))
+    self.assertEqual([x.numpy() for x in result], [x + 1 for x in range(6)])
+    self.assertEqual(policy.num_maps, 1)
+    self.assertEqual(policy.num_speculations, 1)
+    self.assertEqual(policy.num_speculative_wins, 1)
+
+  def test_federated_map_does_not_reexecute_without_stragglers(self):
+
+    @computations.tf_computation(tf.int32)
+    def add_one(x):
+      return x + 1
+
+    @computations.federated_computation(computation_types.at_clients(tf.int32))
+    def comp(x):
+      return intrinsics.federated_map(add_one, x)
+
+    policy = federated_composing_strategy.SpeculativeExecutionPolicy(
+        quantile=1.0)
+    executor = _create_speculative_stack(
+        [_create_worker_stack() for _ in range(3)], policy)
+    result = _invoke(executor, comp, list(range(6)))
+    self.assertEqual([x.numpy() for x in result], [x + 1 for x in range(6)])
+    self.assertEqual(policy.num_maps, 1)
+    self.assertEqual(policy.num_speculations, 0)
+
+  def test_federated_map_only_transfers_results_once_without_stragglers(self):
+
+    @computations.tf_computation(tf.int32)
+    def add_one(x):
+      return x + 1
+
+    @computations.federated_computation(computation_types.at_clients(tf.int32))
+    def comp(x):
+      return intrinsics.federated_map(add_one, x)
+
+    policy = federated_composing_strategy.SpeculativeExecutionPolicy(
+        quantile=1.0)
+    children = [
+        _SlowMapExecutor(_create_worker_stack(), delay=0.0) for _ in range(3)
+    ]
+    executor = _create_speculative_stack(children, policy)
+    result = _invoke(executor, comp, list(range(6)))
+    self.assertEqual([x.numpy() for x in result], [x + 1 for x in range(6)])
+    for child in children:
+      computed_types = [str(t) for t in child.computed_types]
+      # The map is probed by computing a shard of empty structures, and the
+      # shard of the result is only computed once, along with the result.
+      self.assertIn('{<>}@CLIENTS', computed_types)
+      self.assertEqual(computed_types.count('{int32}@CLIENTS'), 1)
+
+  def test_speculative_execution_policy_raises_on_bad_quantile(self):
+    with self.assertRaises(ValueError):
+      federated_composing_strategy.SpeculativeExecutionPolicy(quantile=0.0)
+    with self.assertRaises(ValueError):
+      federated_composing_strategy.SpeculativeExecutionPolicy(quantile=1.5)
+
   def test_federated_zip_at_server_unnamed(self):
 
     @computations.federated_computation
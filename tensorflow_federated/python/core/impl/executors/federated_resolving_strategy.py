@@ -42,7 +42,7 @@
 """
 
 import asyncio
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import absl.logging as logging
 import tensorflow as tf
@@ -61,6 +61,15 @@ from tensorflow_federated.python.core.impl.types import type_analysis
 from tensorflow_federated.python.core.impl.types import type_factory
 
 
+def _is_stackable_type(type_spec: computation_types.Type) -> bool:
+  """Returns `True` if values of `type_spec` can be stacked and summed."""
+  if not type_analysis.is_sum_compatible(type_spec):
+    return False
+  return type_analysis.contains_only(
+      type_spec,
+      lambda t: t.is_struct() or (t.is_tensor() and t.shape.is_fully_defined()))
+
+
 class FederatedResolvingStrategyValue(executor_value_base.ExecutorValue):
   """A value embedded in a `FederatedExecutor`."""
 
@@ -134,15 +143,23 @@ class FederatedResolvingStrategy(federating_executor.FederatingStrategy):
   * `tff.CLIENTS`
 
   Note that this strategy does not have a built-in concept of intermediate
-  aggregation, partitioning placements, clustering clients, etc.
+  aggregation, partitioning placements, clustering clients, etc. However, if
+  `merge_arity` is specified, `federated_aggregate` accumulates values on the
+  `tff.CLIENTS` target executors and combines the partial accumulators with
+  `merge` in a concurrent tree of the given arity, instead of folding every
+  value into the accumulator sequentially on the `tff.SERVER` target executor.
   """
 
   @classmethod
-  def factory(cls, target_executors: Dict[str, executor_base.Executor]):
-    return lambda executor: cls(executor, target_executors)
-
-  def __init__(self, executor: federating_executor.FederatingExecutor,
-               target_executors: Dict[str, executor_base.Executor]):
+  def factory(cls,
+              target_executors: Dict[str, executor_base.Executor],
+              merge_arity: Optional[int] = None):
+    return lambda executor: cls(executor, target_executors, merge_arity)
+
+  def __init__(self,
+               executor: federating_executor.FederatingExecutor,
+               target_executors: Dict[str, executor_base.Executor],
+               merge_arity: Optional[int] = None):
     """Creates a `FederatedResolvingStrategy`.
 
     Args:
@@ -153,6 +170,11 @@ class FederatedResolvingStrategy(federating_executor.FederatingStrategy):
         dictionary are placement literals. The values can be either single
         executors (if there only is a single participant associated with that
         placement, e.g. `tff.SERVER`) or lists of executors.
+      merge_arity: An optional integer greater than 1, the maximum number of
+        partial accumulators combined by a single node of the merge tree used
+        to compute `federated_aggregate`. If `None` (the default),
+        `federated_aggregate` is computed as a linear `federated_reduce` on the
+        `tff.SERVER` target executor.
 
     Raises:
       TypeError: If `target_executors` is not a `dict`, where each key is a
@@ -160,10 +182,17 @@ class FederatedResolvingStrategy(federating_executor.FederatingStrategy):
         `executor_base.Executor` or a list of `executor_base.Executor`s.
       ValueError: If `target_executors` contains a
         `placement_literals.PlacementLiteral` key that is not a kind supported
-        by the `FederatedResolvingStrategy`.
+        by the `FederatedResolvingStrategy`, or if `merge_arity` is less than 2.
     """
     super().__init__(executor)
     py_typecheck.check_type(target_executors, dict)
+    if merge_arity is not None:
+      py_typecheck.check_type(merge_arity, int)
+      if merge_arity < 2:
+        raise ValueError(
+            'Expected `merge_arity` to be greater than 1, found {}.'.format(
+                merge_arity))
+    self._merge_arity = merge_arity
     self._target_executors = {}
     for k, v in target_executors.items():
       if k is not None:
@@ -351,32 +380,111 @@ class FederatedResolvingStrategy(federating_executor.FederatingStrategy):
             placement,
             all_equal=all_equal))
 
+  @tracing.trace
+  async def _merge_tree(self, val, zero, zero_type, accumulate,
+                        accumulate_type, merge, merge_type):
+    """Aggregates `val` at the clients using a tree of `merge` calls.
+
+    The values of each target executor at `tff.CLIENTS` are first accumulated
+    on that executor, starting from `zero`. The resulting partial accumulators
+    are then combined `self._merge_arity` at a time, concurrently, on the
+    executor that holds the first partial accumulator of each group, until a
+    single accumulator remains.
+
+    Args:
+      val: A `list` of values embedded in the target executors at
+        `tff.CLIENTS`, one for each client.
+      zero: The computed zero of the aggregation.
+      zero_type: The type of `zero`, and of the partial accumulators.
+      accumulate: A `pb.Computation` of type `accumulate_type`.
+      accumulate_type: The type of `accumulate`.
+      merge: A `pb.Computation` of type `merge_type`.
+      merge_type: The type of `merge`.
+
+    Returns:
+      A tuple of the target executor and the final accumulator embedded in it.
+    """
+    children = self._target_executors[placement_literals.CLIENTS]
+    shards = {}
+    for value, child in zip(val, children):
+      _, values = shards.setdefault(id(child), (child, []))
+      values.append(value)
+
+    async def _accumulate(child, values):
+      fn, result = await asyncio.gather(
+          child.create_value(accumulate, accumulate_type),
+          child.create_value(zero, zero_type))
+      for value in values:
+        result = await child.create_call(
+            fn, await child.create_struct([result, value]))
+      return child, result
+
+    async def _merge(group):
+      child, result = group[0]
+
+      async def _move(other, value):
+        if other is child:
+          return value
+        return await child.create_value(await value.compute(), zero_type)
+
+      fn, *values = await asyncio.gather(
+          child.create_value(merge, merge_type),
+          *[_move(other, value) for other, value in group[1:]])
+      for value in values:
+        result = await child.create_call(
+            fn, await child.create_struct([result, value]))
+      return child, result
+
+    accumulators = await asyncio.gather(
+        *[_accumulate(child, values) for child, values in shards.values()])
+    while len(accumulators) > 1:
+      accumulators = await asyncio.gather(*[
+          _merge(accumulators[i:i + self._merge_arity])
+          for i in range(0, len(accumulators), self._merge_arity)
+      ])
+    return accumulators[0]
+
   @tracing.trace
   async def compute_federated_aggregate(
       self,
       arg: FederatedResolvingStrategyValue) -> FederatedResolvingStrategyValue:
-    val_type, zero_type, accumulate_type, _, report_type = (
+    val_type, zero_type, accumulate_type, merge_type, report_type = (
         executor_utils.parse_federated_aggregate_argument_types(
             arg.type_signature))
     py_typecheck.check_type(arg.internal_representation, structure.Struct)
     py_typecheck.check_len(arg.internal_representation, 5)
 
-    # Note: This is a simple initial implementation that simply forwards this
-    # to `federated_reduce()`. The more complete implementation would be able
-    # to take advantage of the parallelism afforded by `merge` to reduce the
-    # cost from liner (with respect to the number of clients) to sub-linear.
-
-    # TODO(b/134543154): Expand this implementation to take advantage of the
-    # parallelism afforded by `merge`.
-
     val = arg.internal_representation[0]
     zero = arg.internal_representation[1]
     accumulate = arg.internal_representation[2]
-    pre_report = await self.compute_federated_reduce(
-        FederatedResolvingStrategyValue(
-            structure.Struct([(None, val), (None, zero), (None, accumulate)]),
-            computation_types.StructType(
-                (val_type, zero_type, accumulate_type))))
+    if self._merge_arity is None or not val:
+      # Note: By default this simply forwards to `federated_reduce()`, which is
+      # linear with respect to the number of clients. Specifying `merge_arity`
+      # takes advantage of the parallelism afforded by `merge` to reduce the
+      # depth of the aggregation to logarithmic.
+      pre_report = await self.compute_federated_reduce(
+          FederatedResolvingStrategyValue(
+              structure.Struct([(None, val), (None, zero),
+                                (None, accumulate)]),
+              computation_types.StructType(
+                  (val_type, zero_type, accumulate_type))))
+    else:
+      py_typecheck.check_type(val, list)
+      self._check_value_compatible_with_placement(val, val_type.placement,
+                                                  val_type.all_equal)
+      zero = await (await self._executor.create_selection(arg,
+                                                          index=1)).compute()
+      merge = arg.internal_representation[3]
+      child, result = await self._merge_tree(val, zero, zero_type, accumulate,
+                                             accumulate_type, merge, merge_type)
+      server = self._target_executors[placement_literals.SERVER][0]
+      if server is not child:
+        result = await server.create_value(await result.compute(), zero_type)
+      pre_report = FederatedResolvingStrategyValue(
+          [result],
+          computation_types.FederatedType(
+              result.type_signature, placement_literals.SERVER,
+              all_equal=True))
 
     py_typecheck.check_type(pre_report.type_signature,
                             computation_types.FederatedType)
@@ -457,11 +565,16 @@ class FederatedResolvingStrategy(federating_executor.FederatingStrategy):
   async def compute_federated_mean(
       self,
       arg: FederatedResolvingStrategyValue) -> FederatedResolvingStrategyValue:
-    arg_sum = await self.compute_federated_sum(arg)
-    member_type = arg_sum.type_signature.member
+    py_typecheck.check_type(arg.type_signature, computation_types.FederatedType)
     count = float(len(arg.internal_representation))
     if count < 1.0:
       raise RuntimeError('Cannot compute a federated mean over an empty group.')
+    member_type = arg.type_signature.member
+    if (type_analysis.is_average_compatible(member_type) and
+        _is_stackable_type(member_type)):
+      return await self._compute_stacked_reduction(arg, tf.math.reduce_mean)
+    arg_sum = await self.compute_federated_sum(arg)
+    member_type = arg_sum.type_signature.member
     child = self._target_executors[placement_literals.SERVER][0]
     factor, multiply = await asyncio.gather(
         executor_utils.embed_tf_constant(child, member_type,
@@ -474,6 +587,46 @@ class FederatedResolvingStrategy(federating_executor.FederatingStrategy):
     result = await child.create_call(multiply, multiply_arg)
     return FederatedResolvingStrategyValue([result], arg_sum.type_signature)
 
+  @tracing.trace
+  async def _compute_stacked_reduction(self, arg, reduction):
+    """Reduces the members of `arg` in a single call at the `tff.SERVER`.
+
+    The members of `arg` are stacked into a single tensor per leaf, which is
+    reduced over its leading dimension by one call of an embedded `reduction`,
+    rather than by one call of a binary operator per member.
+
+    Args:
+      arg: A `FederatedResolvingStrategyValue` of federated type, whose member
+        type is a structure of tensors with fully defined shapes.
+      reduction: A reduction function such as `tf.math.reduce_sum`.
+
+    Returns:
+      A `FederatedResolvingStrategyValue` placed at `tff.SERVER`.
+    """
+    val = arg.internal_representation
+    py_typecheck.check_type(val, list)
+    member_type = arg.type_signature.member
+    child = self._target_executors[placement_literals.SERVER][0]
+
+    async def _stack():
+      values = await asyncio.gather(*[v.compute() for v in val])
+      leaves = zip(*[structure.flatten(v) for v in values])
+      return structure.pack_sequence_as(member_type, [
+          tf.stack([tf.convert_to_tensor(x, dtype=t.dtype) for x in leaf])
+          for leaf, t in zip(leaves, structure.flatten(member_type))
+      ])
+
+    fn, stacked_value = await asyncio.gather(
+        executor_utils.embed_tf_stacked_reduction(child, member_type,
+                                                  reduction), _stack())
+    stacked_arg = await child.create_value(stacked_value,
+                                           fn.type_signature.parameter)
+    result = await child.create_call(fn, stacked_arg)
+    return FederatedResolvingStrategyValue(
+        [result],
+        computation_types.FederatedType(
+            result.type_signature, placement_literals.SERVER, all_equal=True))
+
   @tracing.trace
   async def compute_federated_reduce(
       self,
@@ -533,6 +686,9 @@ class FederatedResolvingStrategy(federating_executor.FederatingStrategy):
       self,
       arg: FederatedResolvingStrategyValue) -> FederatedResolvingStrategyValue:
     py_typecheck.check_type(arg.type_signature, computation_types.FederatedType)
+    if (arg.internal_representation and
+        _is_stackable_type(arg.type_signature.member)):
+      return await self._compute_stacked_reduction(arg, tf.math.reduce_sum)
     zero, plus = await asyncio.gather(
         executor_utils.embed_tf_constant(self._executor,
                                          arg.type_signature.member, 0),
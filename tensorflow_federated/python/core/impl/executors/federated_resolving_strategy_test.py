@@ -13,13 +13,46 @@
 # limitations under the License.
 
 from absl.testing import absltest
+from absl.testing import parameterized
 import tensorflow as tf
 
 from tensorflow_federated.python.common_libs import structure
 from tensorflow_federated.python.core.api import computation_types
+from tensorflow_federated.python.core.impl.compiler import intrinsic_defs
 from tensorflow_federated.python.core.impl.executors import eager_tf_executor
 from tensorflow_federated.python.core.impl.executors import executor_test_utils
+from tensorflow_federated.python.core.impl.executors import executor_utils
 from tensorflow_federated.python.core.impl.executors import federated_resolving_strategy
+from tensorflow_federated.python.core.impl.executors import federating_executor
+from tensorflow_federated.python.core.impl.executors import reference_resolving_executor
+from tensorflow_federated.python.core.impl.types import placement_literals
+
+
+def create_test_executor(
+    number_of_clients: int = 3,
+    number_of_client_executors: int = None,
+    merge_arity: int = None) -> federating_executor.FederatingExecutor:
+
+  def create_bottom_stack():
+    executor = eager_tf_executor.EagerTFExecutor()
+    return reference_resolving_executor.ReferenceResolvingExecutor(executor)
+
+  if number_of_client_executors is None:
+    number_of_client_executors = number_of_clients
+  client_executors = [
+      create_bottom_stack() for _ in range(number_of_client_executors)
+  ]
+  factory = federated_resolving_strategy.FederatedResolvingStrategy.factory(
+      {
+          placement_literals.SERVER:
+              create_bottom_stack(),
+          placement_literals.CLIENTS: [
+              client_executors[i % number_of_client_executors]
+              for i in range(number_of_clients)
+          ],
+      },
+      merge_arity=merge_arity)
+  return federating_executor.FederatingExecutor(factory, create_bottom_stack())
 
 
 class FederatedResolvingStrategyValueComputeTest(
@@ -103,5 +136,131 @@ class FederatedResolvingStrategyValueComputeTest(
       self.run_sync(value.compute())
 
 
+class FederatedResolvingStrategyAggregateTest(executor_test_utils.AsyncTestCase,
+                                              parameterized.TestCase):
+
+  # pyformat: disable
+  @parameterized.named_parameters([
+      ('linear', 7, None, None),
+      ('one_client', 1, None, 2),
+      ('arity_2', 7, None, 2),
+      ('arity_3', 7, None, 3),
+      ('arity_larger_than_clients', 7, None, 10),
+      ('arity_2_shared_client_executors', 7, 3, 2),
+  ])
+  # pyformat: enable
+  def test_returns_value_with_merge_arity(self, number_of_clients,
+                                          number_of_client_executors,
+                                          merge_arity):
+    executor = create_test_executor(
+        number_of_clients=number_of_clients,
+        number_of_client_executors=number_of_client_executors,
+        merge_arity=merge_arity)
+    comp, comp_type = executor_test_utils.create_dummy_intrinsic_def_federated_aggregate(
+    )
+    add, add_type = executor_test_utils.create_dummy_computation_tensorflow_add(
+    )
+    identity, identity_type = executor_test_utils.create_dummy_computation_tensorflow_identity(
+    )
+    args = [
+        executor_test_utils.create_dummy_value_at_clients(number_of_clients),
+        (0.0, computation_types.TensorType(tf.float32)),
+        (add, add_type),
+        (add, add_type),
+        (identity, identity_type),
+    ]
+
+    comp = self.run_sync(executor.create_value(comp, comp_type))
+    elements = [self.run_sync(executor.create_value(*x)) for x in args]
+    arg = self.run_sync(executor.create_struct(elements))
+    result = self.run_sync(executor.create_call(comp, arg))
+
+    self.assertEqual(result.type_signature.compact_representation(),
+                     comp_type.result.compact_representation())
+    actual_result = self.run_sync(result.compute())
+    expected_result = sum(args[0][0])
+    self.assertEqual(actual_result, expected_result)
+
+  def test_raises_value_error_with_merge_arity_less_than_two(self):
+    with self.assertRaises(ValueError):
+      create_test_executor(merge_arity=1)
+
+
+class FederatedResolvingStrategySumAndMeanTest(
+    executor_test_utils.AsyncTestCase, parameterized.TestCase):
+
+  # pyformat: disable
+  @parameterized.named_parameters([
+      ('tensor',
+       computation_types.TensorType(tf.float32),
+       [1.0, 2.0, 6.0],
+       9.0),
+      ('tensor_with_shape',
+       computation_types.TensorType(tf.int32, [2]),
+       [[1, 2], [3, 4], [5, 6]],
+       [9, 12]),
+      ('tensor_with_undefined_shape',
+       computation_types.TensorType(tf.int32, [None]),
+       [[1, 2], [3, 4], [5, 6]],
+       [9, 12]),
+      ('struct',
+       computation_types.StructType([('a', tf.float32), ('b', tf.int32)]),
+       [structure.Struct([('a', 1.0), ('b', 1)]),
+        structure.Struct([('a', 2.0), ('b', 2)]),
+        structure.Struct([('a', 6.0), ('b', 3)])],
+       structure.Struct([('a', 9.0), ('b', 6)])),
+  ])
+  # pyformat: enable
+  def test_federated_sum_returns_value(self, member_type, value,
+                                       expected_result):
+    executor = create_test_executor(number_of_clients=len(value))
+    comp_type = computation_types.FunctionType(
+        computation_types.at_clients(member_type),
+        computation_types.at_server(member_type))
+    comp = executor_utils.create_intrinsic_comp(intrinsic_defs.FEDERATED_SUM,
+                                                comp_type)
+
+    comp = self.run_sync(executor.create_value(comp, comp_type))
+    arg = self.run_sync(
+        executor.create_value(value, computation_types.at_clients(member_type)))
+    result = self.run_sync(executor.create_call(comp, arg))
+
+    self.assertEqual(result.type_signature.compact_representation(),
+                     comp_type.result.compact_representation())
+    actual_result = self.run_sync(result.compute())
+    if member_type.is_struct():
+      self.assertEqual(structure.to_odict(actual_result),
+                       structure.to_odict(expected_result))
+    else:
+      self.assertEqual(list(actual_result.numpy().flatten()),
+                       list(tf.constant(expected_result).numpy().flatten()))
+
+  def test_federated_mean_returns_value_with_struct(self):
+    executor = create_test_executor(number_of_clients=3)
+    member_type = computation_types.StructType([
+        ('a', tf.float32),
+        ('b', computation_types.TensorType(tf.float32, [2])),
+    ])
+    comp_type = computation_types.FunctionType(
+        computation_types.at_clients(member_type),
+        computation_types.at_server(member_type))
+    comp = executor_utils.create_intrinsic_comp(intrinsic_defs.FEDERATED_MEAN,
+                                                comp_type)
+    value = [
+        structure.Struct([('a', 1.0), ('b', [1.0, 4.0])]),
+        structure.Struct([('a', 2.0), ('b', [2.0, 5.0])]),
+        structure.Struct([('a', 6.0), ('b', [3.0, 6.0])]),
+    ]
+
+    comp = self.run_sync(executor.create_value(comp, comp_type))
+    arg = self.run_sync(
+        executor.create_value(value, computation_types.at_clients(member_type)))
+    result = self.run_sync(executor.create_call(comp, arg))
+
+    actual_result = self.run_sync(result.compute())
+    self.assertEqual(actual_result.a, 3.0)
+    self.assertEqual(list(actual_result.b.numpy()), [2.0, 5.0])
+
+
 if __name__ == '__main__':
   absltest.main()
@@ -0,0 +1,268 @@
+# Copyright 2020, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Utilities for sharding clients across workers according to their load."""
+
+import math
+import time
+from typing import List, Optional, Sequence
+
+from tensorflow_federated.python.common_libs import py_typecheck
+from tensorflow_federated.python.common_libs import structure
+from tensorflow_federated.python.core.impl.executors import executor_base
+from tensorflow_federated.python.core.impl.executors import executor_value_base
+
+
+class LoadTrackingExecutor(executor_base.Executor):
+  """Executor tracking the load of the worker behind its target executor.
+
+  The executor counts the requests in flight to the target executor (its queue
+  depth) and accumulates the time during which at least one request is in
+  flight (its busy time). Generally, a `LoadTrackingExecutor` is placed
+  directly on top of the `RemoteExecutor` of each worker hosting clients, so
+  that the number of clients hosted divided by the busy time measures the
+  throughput of the worker.
+  """
+
+  def __init__(self, target):
+    """Creates a new instance of a load tracking executor.
+
+    Args:
+      target: An instance of `executor_base.Executor`.
+    """
+    py_typecheck.check_type(target, executor_base.Executor)
+    self._target = target
+    self._num_clients = 0
+    self._queue_depth = 0
+    self._busy_seconds = 0.0
+    self._busy_since = None
+
+  @property
+  def num_clients(self) -> int:
+    """The number of clients hosted by the worker since the last reset."""
+    return self._num_clients
+
+  @property
+  def queue_depth(self) -> int:
+    """The number of requests currently in flight to the target executor."""
+    return self._queue_depth
+
+  @property
+  def busy_seconds(self) -> float:
+    """The time spent with requests in flight since the last reset."""
+    if self._busy_since is not None:
+      return self._busy_seconds + time.monotonic() - self._busy_since
+    return self._busy_seconds
+
+  @property
+  def clients_per_second(self) -> Optional[float]:
+    """The measured throughput, or `None` if nothing was measured."""
+    busy_seconds = self.busy_seconds
+    if not self._num_clients or busy_seconds <= 0.0:
+      return None
+    return self._num_clients / busy_seconds
+
+  def reset(self, num_clients: int):
+    """Starts a new measurement, with the worker hosting `num_clients`."""
+    py_typecheck.check_type(num_clients, int)
+    self._num_clients = num_clients
+    self._busy_seconds = 0.0
+    if self._busy_since is not None:
+      self._busy_since = time.monotonic()
+
+  async def _track(self, coro):
+    if self._queue_depth == 0:
+      self._busy_since = time.monotonic()
+    self._queue_depth += 1
+    try:
+      return await coro
+    finally:
+      self._queue_depth -= 1
+      if self._queue_depth == 0:
+        self._busy_seconds += time.monotonic() - self._busy_since
+        self._busy_since = None
+
+  async def create_value(self, value, type_spec=None):
+    target_val = await self._track(
+        self._target.create_value(value, type_spec))
+    return LoadTrackingExecutorValue(self, target_val)
+
+  async def create_call(self, comp, arg=None):
+    if arg is not None:
+      target_val = await self._track(
+          self._target.create_call(comp.value, arg.value))
+    else:
+      target_val = await self._track(self._target.create_call(comp.value))
+    return LoadTrackingExecutorValue(self, target_val)
+
+  async def create_struct(self, elements):
+    target_val = await self._track(
+        self._target.create_struct(
+            structure.map_structure(lambda x: x.value, elements)))
+    return LoadTrackingExecutorValue(self, target_val)
+
+  async def create_selection(self, source, index=None, name=None):
+    target_val = await self._track(
+        self._target.create_selection(source.value, index=index, name=name))
+    return LoadTrackingExecutorValue(self, target_val)
+
+  def close(self):
+    self._target.close()
+
+
+class LoadTrackingExecutorValue(executor_value_base.ExecutorValue):
+  """A value managed by `LoadTrackingExecutor`."""
+
+  def __init__(self, owner, value):
+    """Creates an instance of a value in the load tracking executor.
+
+    Args:
+      owner: An instance of `LoadTrackingExecutor`.
+      value: An embedded value from the target executor.
+    """
+    py_typecheck.check_type(owner, LoadTrackingExecutor)
+    py_typecheck.check_type(value, executor_value_base.ExecutorValue)
+    self._owner = owner
+    self._value = value
+
+  @property
+  def value(self):
+    return self._value
+
+  @property
+  def type_signature(self):
+    return self._value.type_signature
+
+  async def compute(self):
+    return await self._owner._track(self._value.compute())  # pylint: disable=protected-access
+
+
+def _split_proportionally(num_clients: int,
+                          weights: Sequence[float]) -> List[int]:
+  """Splits `num_clients` in proportion to `weights`, by largest remainder."""
+  total_weight = sum(weights)
+  shares = [num_clients * w / total_weight for w in weights]
+  counts = [math.floor(s) for s in shares]
+  by_remainder = sorted(
+      range(len(weights)), key=lambda i: shares[i] - counts[i], reverse=True)
+  for i in by_remainder[:num_clients - sum(counts)]:
+    counts[i] += 1
+  return counts
+
+
+class ClientLoadBalancer(object):
+  """Assigns clients to workers in proportion to their measured throughput.
+
+  The throughput of each worker, in clients per second of busy time, is read
+  from its `LoadTrackingExecutor` at every call to `needs_rebalance`, which
+  is expected once per round, and smoothed with an exponential moving average.
+  Workers are assumed to be equally fast until they have been measured, so
+  that the first assignment splits the clients evenly.
+  """
+
+  def __init__(self,
+               trackers: Sequence[LoadTrackingExecutor],
+               smoothing: float = 0.5,
+               rebalance_threshold: float = 0.1):
+    """Creates a new load balancer.
+
+    Args:
+      trackers: The `LoadTrackingExecutor`s of the workers, in order.
+      smoothing: The weight of the latest measurement in the moving average of
+        the throughput of each worker, in `(0, 1]`.
+      rebalance_threshold: The fraction of clients that must move between
+        workers for `needs_rebalance` to return `True`.
+
+    Raises:
+      ValueError: If `trackers` is empty, or `smoothing` or
+        `rebalance_threshold` are out of range.
+    """
+    for tracker in trackers:
+      py_typecheck.check_type(tracker, LoadTrackingExecutor)
+    if not trackers:
+      raise ValueError('Must balance the load of at least one worker.')
+    if not 0.0 < smoothing <= 1.0:
+      raise ValueError('The smoothing must be in (0, 1], found {}.'.format(
+          smoothing))
+    if rebalance_threshold < 0.0:
+      raise ValueError(
+          'The rebalance threshold must be non-negative, found {}.'.format(
+              rebalance_threshold))
+    self._trackers = list(trackers)
+    self._smoothing = smoothing
+    self._rebalance_threshold = rebalance_threshold
+    self._clients_per_second = [None] * len(self._trackers)
+    self._assignment = None
+
+  @property
+  def clients_per_second(self) -> List[Optional[float]]:
+    """The smoothed throughput of each worker, `None` until measured."""
+    return list(self._clients_per_second)
+
+  @property
+  def queue_depths(self) -> List[int]:
+    """The number of requests currently in flight to each worker."""
+    return [tracker.queue_depth for tracker in self._trackers]
+
+  def _update_throughput(self):
+    """Folds the measurements since the last update into the averages."""
+    for i, tracker in enumerate(self._trackers):
+      measured = tracker.clients_per_second
+      if measured is None:
+        continue
+      previous = self._clients_per_second[i]
+      if previous is None:
+        self._clients_per_second[i] = measured
+      else:
+        self._clients_per_second[i] = (
+            self._smoothing * measured + (1.0 - self._smoothing) * previous)
+      tracker.reset(tracker.num_clients)
+
+  def _propose(self, num_clients: int) -> List[int]:
+    measured = [r for r in self._clients_per_second if r is not None]
+    default = sum(measured) / len(measured) if measured else 1.0
+    weights = [default if r is None else r for r in self._clients_per_second]
+    return _split_proportionally(num_clients, weights)
+
+  def needs_rebalance(self, num_clients: int) -> bool:
+    """Whether the clients should be reassigned before the next round.
+
+    Args:
+      num_clients: The number of clients of the next round.
+
+    Returns:
+      `True` if no assignment has been made for `num_clients` clients, or if
+      assigning them according to the latest measurements would move more than
+      `rebalance_threshold` of them to another worker.
+    """
+    self._update_throughput()
+    if self._assignment is None or sum(self._assignment) != num_clients:
+      return True
+    proposed = self._propose(num_clients)
+    num_moved = sum(
+        max(p - a, 0) for p, a in zip(proposed, self._assignment))
+    return num_moved > self._rebalance_threshold * num_clients
+
+  def assign(self, num_clients: int) -> List[int]:
+    """Returns the number of clients each worker should host.
+
+    Also starts a new measurement of each worker with its assigned clients.
+
+    Args:
+      num_clients: The total number of clients to assign.
+    """
+    py_typecheck.check_type(num_clients, int)
+    self._assignment = self._propose(num_clients)
+    for tracker, worker_clients in zip(self._trackers, self._assignment):
+      tracker.reset(worker_clients)
+    return list(self._assignment)
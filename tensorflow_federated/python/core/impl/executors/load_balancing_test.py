@@ -0,0 +1,108 @@
+# Copyright 2020, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from unittest import mock
+
+from absl.testing import absltest
+import tensorflow as tf
+
+from tensorflow_federated.python.core.api import computation_types
+from tensorflow_federated.python.core.impl.executors import eager_tf_executor
+from tensorflow_federated.python.core.impl.executors import load_balancing
+
+
+def _create_tracker_with_throughput(num_clients, busy_seconds):
+  tracker = load_balancing.LoadTrackingExecutor(
+      eager_tf_executor.EagerTFExecutor())
+  tracker.reset(num_clients)
+  tracker._busy_seconds = busy_seconds
+  return tracker
+
+
+class LoadTrackingExecutorTest(absltest.TestCase):
+
+  def test_tracks_busy_time_and_queue_depth(self):
+    tracker = load_balancing.LoadTrackingExecutor(
+        eager_tf_executor.EagerTFExecutor())
+    tracker.reset(4)
+    loop = asyncio.get_event_loop()
+    with mock.patch.object(load_balancing, 'time') as mock_time:
+      mock_time.monotonic.side_effect = [10.0, 12.0]
+      value = loop.run_until_complete(
+          tracker.create_value(10, computation_types.TensorType(tf.int32)))
+    self.assertEqual(tracker.queue_depth, 0)
+    self.assertEqual(tracker.busy_seconds, 2.0)
+    self.assertEqual(tracker.clients_per_second, 2.0)
+    self.assertIsInstance(value, load_balancing.LoadTrackingExecutorValue)
+    self.assertEqual(loop.run_until_complete(value.compute()).numpy(), 10)
+
+  def test_reset_clears_measurement(self):
+    tracker = _create_tracker_with_throughput(num_clients=4, busy_seconds=2.0)
+    tracker.reset(3)
+    self.assertEqual(tracker.num_clients, 3)
+    self.assertEqual(tracker.busy_seconds, 0.0)
+    self.assertIsNone(tracker.clients_per_second)
+
+
+class ClientLoadBalancerTest(absltest.TestCase):
+
+  def test_first_assignment_is_even(self):
+    trackers = [
+        load_balancing.LoadTrackingExecutor(eager_tf_executor.EagerTFExecutor())
+        for _ in range(3)
+    ]
+    balancer = load_balancing.ClientLoadBalancer(trackers)
+    self.assertTrue(balancer.needs_rebalance(10))
+    self.assertCountEqual(balancer.assign(10), [4, 3, 3])
+    self.assertEqual([t.num_clients for t in trackers], balancer.assign(10))
+
+  def test_assigns_clients_in_proportion_to_throughput(self):
+    balancer = load_balancing.ClientLoadBalancer([
+        load_balancing.LoadTrackingExecutor(eager_tf_executor.EagerTFExecutor())
+        for _ in range(2)
+    ])
+    balancer.assign(30)
+    # The first worker completed its clients three times as fast.
+    balancer._trackers[0]._busy_seconds = 1.0
+    balancer._trackers[1]._busy_seconds = 3.0
+    self.assertTrue(balancer.needs_rebalance(30))
+    self.assertEqual(balancer.clients_per_second, [15.0, 5.0])
+    self.assertEqual(balancer.assign(30), [23, 7])
+
+  def test_does_not_rebalance_below_threshold(self):
+    balancer = load_balancing.ClientLoadBalancer([
+        load_balancing.LoadTrackingExecutor(eager_tf_executor.EagerTFExecutor())
+        for _ in range(2)
+    ], rebalance_threshold=0.1)
+    balancer.assign(20)
+    balancer._trackers[0]._busy_seconds = 1.0
+    balancer._trackers[1]._busy_seconds = 1.1
+    self.assertFalse(balancer.needs_rebalance(20))
+
+  def test_rebalances_when_number_of_clients_changes(self):
+    balancer = load_balancing.ClientLoadBalancer([
+        load_balancing.LoadTrackingExecutor(eager_tf_executor.EagerTFExecutor())
+        for _ in range(2)
+    ])
+    balancer.assign(20)
+    self.assertTrue(balancer.needs_rebalance(21))
+
+  def test_raises_on_no_trackers(self):
+    with self.assertRaises(ValueError):
+      load_balancing.ClientLoadBalancer([])
+
+
+if __name__ == '__main__':
+  absltest.main()
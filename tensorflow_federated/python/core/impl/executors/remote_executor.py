@@ -14,9 +14,11 @@
 """A local proxy for a remote executor service hosted on a separate machine."""
 
 import asyncio
+import hashlib
 import queue
 import threading
 from typing import Mapping
+import uuid
 import weakref
 
 import absl.logging as logging
@@ -36,6 +38,11 @@ from tensorflow_federated.python.core.impl.types import placement_literals
 
 _STREAM_CLOSE_WAIT_SECONDS = 10
 
+# Values that serialize to fewer bytes than this are always sent in full, as
+# the cost of hashing them and the risk of an extra round trip outweigh the
+# savings of deduplication.
+_MIN_DEDUPLICATED_VALUE_SIZE_BYTES = 1024
+
 
 class RemoteValue(executor_value_base.ExecutorValue):
   """A reference to a value embedded in a remotely deployed executor service."""
@@ -76,12 +83,28 @@ class RemoteValue(executor_value_base.ExecutorValue):
     return self._value_ref
 
 
+def _check_response_type(request_type, response):
+  """Raises if `response` does not answer a request of type `request_type`."""
+  py_typecheck.check_type(response, executor_pb2.ExecuteResponse)
+  response_type = response.WhichOneof('response')
+  if response_type is None:
+    # The service responds without a payload when it failed to handle the
+    # request.
+    raise RuntimeError(
+        'The remote executor service failed to handle a request of type: '
+        '{}'.format(request_type))
+  if response_type != request_type:
+    raise ValueError('Request had type: {} but response had type: {}'.format(
+        request_type, response_type))
+
+
 class _BidiStream:
   """A bidi stream connection to the Executor service's Execute method."""
 
-  def __init__(self, stub, thread_pool_executor):
+  def __init__(self, stub, thread_pool_executor, chunk_size_bytes):
     self._stub = stub
     self._thread_pool_executor = thread_pool_executor
+    self._chunk_size_bytes = chunk_size_bytes
     self._is_initialized = False
 
   def _lazy_init(self):
@@ -110,9 +133,15 @@ class _BidiStream:
 
     def response_thread_fn():
       """Consumes response iter and exposes the value on corresponding Event."""
+      assembler = executor_serialization.ChunkAssembler(
+          executor_pb2.ExecuteResponse)
       try:
         logging.debug('Response thread: blocking for next response')
         for response in response_iter:
+          response = assembler.add(response)
+          if response is None:
+            # Wait for the remaining chunks of a large response.
+            continue
           logging.debug(
               'Response thread: processing response of type %s, seq_no %s',
               response.WhichOneof('response'), response.sequence_number)
@@ -171,8 +200,11 @@ class _BidiStream:
             request.WhichOneof('request'), seq)
         self._response_event_dict[seq] = response_event
 
-        # Enqueue a tuple of request and an Event used to return the response
-        self._request_queue.put(request)
+        # Enqueue the request, split into chunks if it is too large to be sent
+        # as a single message. The response is returned via the Event.
+        for chunk in executor_serialization.split_into_chunks(
+            request, self._chunk_size_bytes):
+          self._request_queue.put(chunk)
 
     await asyncio.get_event_loop().run_in_executor(self._thread_pool_executor,
                                                    response_event.wait)
@@ -180,11 +212,7 @@ class _BidiStream:
     if isinstance(response, Exception):
       raise response
 
-    py_typecheck.check_type(response, executor_pb2.ExecuteResponse)
-    response_type = response.WhichOneof('response')
-    if response_type != request_type:
-      raise ValueError('Request had type: {} but response had type: {}'.format(
-          request_type, response_type))
+    _check_response_type(request_type, response)
     return response
 
   def close(self):
@@ -199,11 +227,216 @@ class _BidiStream:
     self._is_initialized = False
 
 
+class _AsyncBidiStream:
+  """A bidi stream to the Executor service's Execute method using `grpc.aio`.
+
+  Unlike `_BidiStream`, no thread is blocked while waiting for a response: each
+  request registers an asyncio future keyed by its sequence number, which a
+  single task reading the stream resolves as responses arrive, in any order.
+
+  Since asyncio gRPC channels are bound to the event loop in which they are
+  created, the stream is owned by a single event loop, run in a thread of its
+  own. Requests sent from any other loop are delegated to the owning loop, so
+  that the stream lives across all rounds of a computation.
+  """
+
+  def __init__(self, channel_fn, chunk_size_bytes):
+    self._channel_fn = channel_fn
+    self._chunk_size_bytes = chunk_size_bytes
+    self._loop = None
+    self._thread = None
+    self._init_lock = threading.Lock()
+
+  def _lazy_init(self):
+    """Lazily starts the event loop owning the underlying gRPC stream."""
+    with self._init_lock:
+      if self._loop is not None:
+        return
+      logging.debug('Initializing async bidi stream')
+      loop = asyncio.new_event_loop()
+      loop.set_task_factory(tracing.propagate_trace_context_task_factory)
+      self._thread = threading.Thread(target=loop.run_forever, daemon=True)
+      self._thread.start()
+      asyncio.run_coroutine_threadsafe(self._open(), loop).result()
+      self._loop = loop
+
+  async def _open(self):
+    """Creates the channel and stream in the owning loop."""
+    self._channel = self._channel_fn()
+    py_typecheck.check_type(self._channel, grpc.aio.Channel)
+    self._call = executor_pb2_grpc.ExecutorStub(self._channel).Execute()
+    self._write_lock = asyncio.Lock()
+    self._response_futures = {}
+    self._stream_error = None
+    self._request_num = 0
+    self._response_task = asyncio.get_event_loop().create_task(
+        self._read_responses())
+
+  async def _read_responses(self):
+    """Consumes responses, resolving the future of the matching request."""
+    assembler = executor_serialization.ChunkAssembler(
+        executor_pb2.ExecuteResponse)
+    try:
+      async for response in self._call:
+        response = assembler.add(response)
+        if response is None:
+          # Wait for the remaining chunks of a large response.
+          continue
+        logging.debug(
+            'Response task: processing response of type %s, seq_no %s',
+            response.WhichOneof('response'), response.sequence_number)
+        response_future = self._response_futures.pop(response.sequence_number)
+        if not response_future.done():
+          response_future.set_result(response)
+      error = RuntimeError('The remote executor service closed the stream.')
+    except Exception as e:  # pylint: disable=broad-except
+      logging.exception('Error calling remote executor: %s', e)
+      error = e
+      if _is_retryable_grpc_error(error):
+        logging.exception('gRPC error is retryable')
+        error = execution_context.RetryableError(error)
+    self._stream_error = error
+    for response_future in self._response_futures.values():
+      if not response_future.done():
+        response_future.set_exception(error)
+    self._response_futures.clear()
+
+  @tracing.trace(span=True)
+  async def send_request(self, request):
+    """Send a request on the bidi stream."""
+    py_typecheck.check_type(request, executor_pb2.ExecuteRequest)
+    self._lazy_init()
+    coro = tracing.wrap_coroutine_in_current_trace_context(
+        self._send_request(request))
+    return await asyncio.wrap_future(
+        asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+  async def _send_request(self, request):
+    """Sends `request` and awaits its response, in the owning loop."""
+    if self._stream_error is not None:
+      raise self._stream_error
+
+    request_type = request.WhichOneof('request')
+    seq = self._request_num
+    self._request_num += 1
+    request.sequence_number = seq
+    response_future = asyncio.get_event_loop().create_future()
+    self._response_futures[seq] = response_future
+    logging.debug('Processing request of type %s, seq_no %s', request_type,
+                  seq)
+
+    # Chunks of one request must not be interleaved with those of another.
+    async with self._write_lock:
+      for chunk in executor_serialization.split_into_chunks(
+          request, self._chunk_size_bytes):
+        await self._call.write(chunk)
+
+    response = await response_future
+    _check_response_type(request_type, response)
+    return response
+
+  async def _close(self):
+    try:
+      await self._call.done_writing()
+      await asyncio.wait_for(self._response_task, _STREAM_CLOSE_WAIT_SECONDS)
+    except Exception as e:  # pylint: disable=broad-except
+      logging.debug('Error closing async bidi stream: %s', e)
+    await self._channel.close()
+
+  def close(self):
+    """Closes the stream in its owning loop, and stops that loop."""
+    with self._init_lock:
+      if self._loop is None:
+        logging.debug('Closing unused async bidi stream')
+        return
+      logging.debug('Closing async bidi stream')
+      loop, thread = self._loop, self._thread
+      self._loop = None
+      self._thread = None
+    asyncio.run_coroutine_threadsafe(self._close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+class _RequestBatcher:
+  """Coalesces the operations issued in one event loop iteration into a batch.
+
+  Operations that create values are assigned refs on the client and are sent
+  together in a single `BatchRequest` on the next iteration of the event loop,
+  so that a graph of dependent operations costs one message instead of one
+  round trip per operation.
+
+  If a batch fails, the error is recorded for the refs created in that batch
+  only, and raised once one of them is checked (see `check`).
+  """
+
+  def __init__(self, bidi_stream):
+    self._bidi_stream = bidi_stream
+    self._operations = []
+    self._pending_future = None
+    # Futures of the batches not yet acknowledged by the service. These are
+    # always resolved with `None`, so that no exception is left unretrieved.
+    self._in_flight = set()
+    # Errors of failed batches, keyed by the ids of the refs they created.
+    self._errors = {}
+
+  def add(self, operation: executor_pb2.BatchRequest.Operation):
+    """Adds `operation` to the batch sent on the next loop iteration."""
+    if not self._operations:
+      loop = asyncio.get_event_loop()
+      self._pending_future = loop.create_future()
+      self._in_flight.add(self._pending_future)
+      loop.call_soon(self._flush)
+    self._operations.append(operation)
+
+  def _flush(self):
+    operations = self._operations
+    request = executor_pb2.ExecuteRequest(
+        batch=executor_pb2.BatchRequest(operation=operations))
+    future = self._pending_future
+    self._operations = []
+    self._pending_future = None
+
+    async def _send():
+      try:
+        await self._bidi_stream.send_request(request)
+      except Exception as e:  # pylint: disable=broad-except
+        logging.debug('Batch of %d operations failed: %s', len(operations), e)
+        for operation in operations:
+          self._errors[operation.value_ref.id] = e
+      finally:
+        self._in_flight.discard(future)
+        future.set_result(None)
+
+    asyncio.ensure_future(_send())
+
+  async def wait(self):
+    """Waits until the service has processed all batches added so far."""
+    if self._in_flight:
+      await asyncio.wait(list(self._in_flight))
+
+  def check(self, value_ref: executor_pb2.ValueRef):
+    """Raises the error of the batch that created `value_ref`, if it failed."""
+    error = self._errors.get(value_ref.id)
+    if error is not None:
+      raise error
+
+  def reset(self):
+    """Forgets the batches sent to the service before it was reconstructed."""
+    self._operations = []
+    self._pending_future = None
+    self._in_flight = set()
+    self._errors = {}
+
+
 @tracing.trace(span=True)
 def _request(rpc_func, request):
   """Populates trace context and reraises gRPC errors with retryable info."""
-  with tracing.wrap_rpc_in_trace_context():
+  with tracing.wrap_rpc_in_trace_context() as metadata:
     try:
+      if metadata:
+        return rpc_func(request, metadata=metadata)
       return rpc_func(request)
     except grpc.RpcError as e:
       if _is_retryable_grpc_error(e):
@@ -234,46 +467,93 @@ def _is_retryable_grpc_error(error):
 class RemoteExecutor(executor_base.Executor):
   """The remote executor is a local proxy for a remote executor instance."""
 
-  # TODO(b/134543154): Switch to using an asynchronous gRPC client so we don't
-  # have to block on all those calls.
-
   def __init__(self,
                channel,
                rpc_mode='REQUEST_REPLY',
                thread_pool_executor=None,
-               dispose_batch_size=20):
+               dispose_batch_size=20,
+               stream_chunk_size_bytes=executor_serialization
+               .DEFAULT_STREAM_CHUNK_SIZE_BYTES,
+               deduplicate_values=False,
+               batch_requests=False):
     """Creates a remote executor.
 
     Args:
       channel: An instance of `grpc.Channel` to use for communication with the
-        remote executor service.
-      rpc_mode: Optional mode of calling the remote executor. Must be either
-        'REQUEST_REPLY' or 'STREAMING' (defaults to 'REQUEST_REPLY'). This
-        option will be removed after the request-reply interface is deprecated.
+        remote executor service. In 'ASYNC_STREAMING' mode, this must instead be
+        a no-arg function that returns a `grpc.aio.Channel`. It is called from
+        an event loop dedicated to the stream, as asyncio channels are bound to
+        the loop in which they are created.
+      rpc_mode: Optional mode of calling the remote executor. Must be one of
+        'REQUEST_REPLY', 'STREAMING' or 'ASYNC_STREAMING' (defaults to
+        'REQUEST_REPLY'). In 'STREAMING' mode, each request in flight blocks a
+        thread of `thread_pool_executor` until its response arrives, whereas in
+        'ASYNC_STREAMING' mode the responses are awaited directly on the event
+        loop, so that no threads are used however many requests are in flight.
+        This option will be removed after the request-reply interface is
+        deprecated.
       thread_pool_executor: Optional concurrent.futures.Executor used to wait
-        for the reply to a streaming RPC message. Uses the default Executor if
-        not specified.
+        for the reply to a streaming RPC message in 'STREAMING' mode. Uses the
+        default Executor if not specified.
       dispose_batch_size: The batch size for requests to dispose of remote
         worker values. Lower values will result in more requests to the remote
         worker, but will result in values being cleaned up sooner and therefore
         may result in lower memory usage on the remote worker.
+      stream_chunk_size_bytes: The maximum size of a single message sent in
+        streaming modes. Larger requests, such as those embedding large values,
+        are split into chunks of this size and reassembled by the remote
+        executor service. Ignored in 'REQUEST_REPLY' mode.
+      deduplicate_values: Whether to identify large values by a digest of their
+        content. A value whose digest was already sent to the remote executor
+        service is then offered by digest alone, and only uploaded again if the
+        service no longer holds it. This makes re-sending the same value (e.g.
+        broadcasting unchanged model weights, or re-creating the same
+        computation every round) cost one small request.
+      batch_requests: Whether to coalesce the values created within the same
+        iteration of the event loop into a single request, in one of the
+        streaming modes. The created values are then returned without waiting
+        for the remote executor service, and errors in creating them are only
+        raised once they are computed. Values offered by digest alone (see
+        `deduplicate_values`) are never batched.
     """
 
-    py_typecheck.check_type(channel, grpc.Channel)
     py_typecheck.check_type(rpc_mode, str)
     py_typecheck.check_type(dispose_batch_size, int)
-    if rpc_mode not in ['REQUEST_REPLY', 'STREAMING']:
+    py_typecheck.check_type(stream_chunk_size_bytes, int)
+    py_typecheck.check_type(deduplicate_values, bool)
+    py_typecheck.check_type(batch_requests, bool)
+    if rpc_mode not in ['REQUEST_REPLY', 'STREAMING', 'ASYNC_STREAMING']:
       raise ValueError('Invalid rpc_mode: {}'.format(rpc_mode))
+    if batch_requests and rpc_mode == 'REQUEST_REPLY':
+      raise ValueError('Requests can only be batched in a streaming rpc_mode.')
+    if rpc_mode == 'ASYNC_STREAMING':
+      py_typecheck.check_callable(channel)
+    else:
+      py_typecheck.check_type(channel, grpc.Channel)
 
     logging.debug('Creating new ExecutorStub with RPC_MODE=%s', rpc_mode)
 
-    self._stub = executor_pb2_grpc.ExecutorStub(channel)
     self._bidi_stream = None
     self._dispose_batch_size = dispose_batch_size
     self._dispose_request = executor_pb2.DisposeRequest()
+    self._deduplicate_values = deduplicate_values
+    # Digests of the values uploaded to the service since the last call to
+    # `set_cardinalities`.
+    self._uploaded_digests = set()
+    if rpc_mode == 'ASYNC_STREAMING':
+      logging.debug('Creating async Bidi stream')
+      self._stub = None
+      self._bidi_stream = _AsyncBidiStream(channel, stream_chunk_size_bytes)
+    else:
+      self._stub = executor_pb2_grpc.ExecutorStub(channel)
     if rpc_mode == 'STREAMING':
       logging.debug('Creating Bidi stream')
-      self._bidi_stream = _BidiStream(self._stub, thread_pool_executor)
+      self._bidi_stream = _BidiStream(self._stub, thread_pool_executor,
+                                      stream_chunk_size_bytes)
+    if batch_requests:
+      self._batcher = _RequestBatcher(self._bidi_stream)
+    else:
+      self._batcher = None
 
   def close(self):
     if self._bidi_stream is not None:
@@ -290,7 +570,7 @@ class RemoteExecutor(executor_base.Executor):
     if self._bidi_stream is None:
       _request(self._stub.Dispose, dispose_request)
     else:
-      send_request_fut = self._bidi_stream.send_request(
+      send_request_fut = self._send_request(
           executor_pb2.ExecuteRequest(dispose=dispose_request))
       # We don't care about the response, and so don't bother to await it.
       # Just start it as a task so that it runs at some point.
@@ -303,11 +583,15 @@ class RemoteExecutor(executor_base.Executor):
         cardinalities)
     request = executor_pb2.SetCardinalitiesRequest(
         cardinalities=serialized_cardinalities)
+    # The service forgets all values when its executor is reconstructed.
+    self._uploaded_digests.clear()
+    if self._batcher is not None:
+      self._batcher.reset()
 
     if self._bidi_stream is None:
       _request(self._stub.SetCardinalities, request)
     else:
-      await self._bidi_stream.send_request(
+      await self._send_request(
           executor_pb2.ExecuteRequest(set_cardinalities=request))
     return
 
@@ -319,15 +603,57 @@ class RemoteExecutor(executor_base.Executor):
       return executor_serialization.serialize_value(value, type_spec)
 
     value_proto, type_spec = serialize_value()
-    create_value_request = executor_pb2.CreateValueRequest(value=value_proto)
+    if (self._deduplicate_values and
+        value_proto.ByteSize() >= _MIN_DEDUPLICATED_VALUE_SIZE_BYTES):
+      digest = hashlib.sha256(
+          value_proto.SerializeToString(deterministic=True)).digest()
+      if digest in self._uploaded_digests:
+        response = await self._create_value(
+            executor_pb2.CreateValueRequest(digest=digest))
+        if not response.digest_not_found:
+          return RemoteValue(response.value_ref, type_spec, self)
+      create_value_request = executor_pb2.CreateValueRequest(
+          value=value_proto, digest=digest)
+      value_ref = await self._create_value_ref(create_value_request)
+      self._uploaded_digests.add(digest)
+    else:
+      create_value_request = executor_pb2.CreateValueRequest(value=value_proto)
+      value_ref = await self._create_value_ref(create_value_request)
+    return RemoteValue(value_ref, type_spec, self)
+
+  async def _create_value_ref(
+      self, request: executor_pb2.CreateValueRequest) -> executor_pb2.ValueRef:
+    """Creates the value of `request`, in a batch if requests are batched."""
+    if self._batcher is not None:
+      return self._create_in_batch(create_value=request)
+    return (await self._create_value(request)).value_ref
+
+  def _create_in_batch(self, **operation) -> executor_pb2.ValueRef:
+    """Adds an operation to the next batch, returning its client-side ref."""
+    value_ref = executor_pb2.ValueRef(id=str(uuid.uuid4()))
+    self._batcher.add(
+        executor_pb2.BatchRequest.Operation(value_ref=value_ref, **operation))
+    return value_ref
+
+  async def _send_request(
+      self,
+      request: executor_pb2.ExecuteRequest) -> executor_pb2.ExecuteResponse:
+    """Sends `request` on the bidi stream, after any pending batch."""
+    if self._batcher is not None:
+      await self._batcher.wait()
+    return await self._bidi_stream.send_request(request)
+
+  async def _create_value(
+      self, request: executor_pb2.CreateValueRequest
+  ) -> executor_pb2.CreateValueResponse:
+    """Sends a `CreateValueRequest` to the remote executor service."""
     if self._bidi_stream is None:
-      response = _request(self._stub.CreateValue, create_value_request)
+      response = _request(self._stub.CreateValue, request)
     else:
-      response = (await self._bidi_stream.send_request(
-          executor_pb2.ExecuteRequest(create_value=create_value_request)
-      )).create_value
+      response = (await self._send_request(
+          executor_pb2.ExecuteRequest(create_value=request))).create_value
     py_typecheck.check_type(response, executor_pb2.CreateValueResponse)
-    return RemoteValue(response.value_ref, type_spec, self)
+    return response
 
   @tracing.trace(span=True)
   async def create_call(self, comp, arg=None):
@@ -338,10 +664,14 @@ class RemoteExecutor(executor_base.Executor):
     create_call_request = executor_pb2.CreateCallRequest(
         function_ref=comp.value_ref,
         argument_ref=(arg.value_ref if arg is not None else None))
+    if self._batcher is not None:
+      return RemoteValue(
+          self._create_in_batch(create_call=create_call_request),
+          comp.type_signature.result, self)
     if self._bidi_stream is None:
       response = _request(self._stub.CreateCall, create_call_request)
     else:
-      response = (await self._bidi_stream.send_request(
+      response = (await self._send_request(
           executor_pb2.ExecuteRequest(create_call=create_call_request)
       )).create_call
     py_typecheck.check_type(response, executor_pb2.CreateCallResponse)
@@ -360,10 +690,13 @@ class RemoteExecutor(executor_base.Executor):
       type_elem.append((k, v.type_signature) if k else v.type_signature)
     result_type = computation_types.StructType(type_elem)
     request = executor_pb2.CreateStructRequest(element=proto_elem)
+    if self._batcher is not None:
+      return RemoteValue(
+          self._create_in_batch(create_struct=request), result_type, self)
     if self._bidi_stream is None:
       response = _request(self._stub.CreateStruct, request)
     else:
-      response = (await self._bidi_stream.send_request(
+      response = (await self._send_request(
           executor_pb2.ExecuteRequest(create_struct=request))).create_struct
     py_typecheck.check_type(response, executor_pb2.CreateStructResponse)
     return RemoteValue(response.value_ref, result_type, self)
@@ -381,10 +714,13 @@ class RemoteExecutor(executor_base.Executor):
       result_type = getattr(source.type_signature, name)
     request = executor_pb2.CreateSelectionRequest(
         source_ref=source.value_ref, name=name, index=index)
+    if self._batcher is not None:
+      return RemoteValue(
+          self._create_in_batch(create_selection=request), result_type, self)
     if self._bidi_stream is None:
       response = _request(self._stub.CreateSelection, request)
     else:
-      response = (await self._bidi_stream.send_request(
+      response = (await self._send_request(
           executor_pb2.ExecuteRequest(create_selection=request)
       )).create_selection
     py_typecheck.check_type(response, executor_pb2.CreateSelectionResponse)
@@ -394,10 +730,13 @@ class RemoteExecutor(executor_base.Executor):
   async def _compute(self, value_ref):
     py_typecheck.check_type(value_ref, executor_pb2.ValueRef)
     request = executor_pb2.ComputeRequest(value_ref=value_ref)
+    if self._batcher is not None:
+      await self._batcher.wait()
+      self._batcher.check(value_ref)
     if self._bidi_stream is None:
       response = _request(self._stub.Compute, request)
     else:
-      response = (await self._bidi_stream.send_request(
+      response = (await self._send_request(
           executor_pb2.ExecuteRequest(compute=request))).compute
     py_typecheck.check_type(response, executor_pb2.ComputeResponse)
     value, _ = executor_serialization.deserialize_value(response.value)
@@ -15,6 +15,7 @@
 import asyncio
 import collections
 import contextlib
+import functools
 import queue
 import sys
 import threading
@@ -24,6 +25,7 @@ from absl.testing import absltest
 from absl.testing import parameterized
 import grpc
 from grpc.framework.foundation import logging_pool
+import numpy as np
 import portpicker
 import tensorflow as tf
 
@@ -49,7 +51,7 @@ def create_remote_executor(rpc_mode='REQUEST_REPLY'):
 
 
 @contextlib.contextmanager
-def test_context(rpc_mode='REQUEST_REPLY'):
+def test_context(rpc_mode='REQUEST_REPLY', batch_requests=False):
   port = portpicker.pick_unused_port()
   server_pool = logging_pool.pool(max_workers=1)
   server = grpc.server(server_pool)
@@ -68,15 +70,21 @@ def test_context(rpc_mode='REQUEST_REPLY'):
   executor_pb2_grpc.add_ExecutorServicer_to_server(service, server)
   server.start()
 
-  channel = grpc.insecure_channel('localhost:{}'.format(port))
+  if rpc_mode == 'ASYNC_STREAMING':
+    channel = functools.partial(grpc.aio.insecure_channel,
+                                'localhost:{}'.format(port))
+  else:
+    channel = grpc.insecure_channel('localhost:{}'.format(port))
 
-  remote_exec = remote_executor.RemoteExecutor(channel, rpc_mode)
+  remote_exec = remote_executor.RemoteExecutor(
+      channel, rpc_mode, batch_requests=batch_requests)
   asyncio.get_event_loop().run_until_complete(
       remote_exec.set_cardinalities({placement_literals.CLIENTS: 3}))
   executor = reference_resolving_executor.ReferenceResolvingExecutor(
       remote_exec)
   try:
-    yield collections.namedtuple('_', 'executor tracers')(executor, tracers)
+    yield collections.namedtuple('_', 'executor tracers remote_executor')(
+        executor, tracers, remote_exec)
   finally:
     executor.close()
     for tracer in tracers:
@@ -89,6 +97,21 @@ def test_context(rpc_mode='REQUEST_REPLY'):
       server.stop(None)
 
 
+@contextlib.contextmanager
+def _executor_service_context(ex_factory):
+  """Serves `ex_factory` on a local port, and yields the address."""
+  port = portpicker.pick_unused_port()
+  server = grpc.server(logging_pool.pool(max_workers=10))
+  server.add_insecure_port('[::]:{}'.format(port))
+  service = executor_service.ExecutorService(ex_factory)
+  executor_pb2_grpc.add_ExecutorServicer_to_server(service, server)
+  server.start()
+  try:
+    yield 'localhost:{}'.format(port)
+  finally:
+    server.stop(None)
+
+
 def _invoke(ex, comp, arg=None):
   loop = asyncio.get_event_loop()
   v1 = loop.run_until_complete(ex.create_value(comp))
@@ -645,6 +668,7 @@ class RemoteExecutorIntegrationTest(parameterized.TestCase):
   @parameterized.named_parameters(
       ('request_reply', 'REQUEST_REPLY'),
       ('streaming', 'STREAMING'),
+      ('async_streaming', 'ASYNC_STREAMING'),
   )
   def test_execution_of_tensorflow(self, rpc_mode):
 
@@ -657,6 +681,200 @@ class RemoteExecutorIntegrationTest(parameterized.TestCase):
 
     self.assertEqual(result, 10)
 
+  @parameterized.named_parameters(
+      ('streaming', 'STREAMING'),
+      ('async_streaming', 'ASYNC_STREAMING'),
+  )
+  def test_large_value_is_chunked_streaming(self, rpc_mode):
+    num_elements = 600000  # Serializes to more than one chunk.
+
+    @computations.tf_computation(
+        computation_types.TensorType(tf.float32, [num_elements]))
+    def comp(x):
+      return x + 1.0
+
+    arg = np.zeros([num_elements], dtype=np.float32)
+    with test_context(rpc_mode=rpc_mode) as context:
+      result = _invoke(context.executor, comp, arg)
+
+    np.testing.assert_array_equal(result, np.ones([num_elements]))
+
+  @parameterized.named_parameters(
+      ('streaming', 'STREAMING'),
+      ('async_streaming', 'ASYNC_STREAMING'),
+  )
+  def test_batched_requests(self, rpc_mode):
+
+    @computations.tf_computation(tf.int32, tf.int32)
+    def comp(x, y):
+      return x + y
+
+    with test_context(rpc_mode=rpc_mode, batch_requests=True) as context:
+      result = _invoke(context.executor, comp, (10, 20))
+
+    self.assertEqual(result, 30)
+
+  def test_values_created_in_one_iteration_are_sent_in_one_batch(self):
+
+    @computations.tf_computation(tf.int32)
+    def comp(x):
+      return x + 1
+
+    async def _create_and_call(ex):
+      fn, arg = await asyncio.gather(
+          ex.create_value(comp), ex.create_value(10, tf.int32))
+      return await ex.create_call(fn, arg)
+
+    with test_context(rpc_mode='STREAMING', batch_requests=True) as context:
+      ex = context.remote_executor
+      sent_request_types = []
+      send_request = ex._bidi_stream.send_request
+
+      async def _recording_send_request(request):
+        sent_request_types.append(request.WhichOneof('request'))
+        return await send_request(request)
+
+      ex._bidi_stream.send_request = _recording_send_request
+      loop = asyncio.get_event_loop()
+      result = loop.run_until_complete(_create_and_call(ex))
+      computed = loop.run_until_complete(result.compute())
+
+    self.assertEqual(computed.numpy(), 11)
+    # The two values are created in one batch, and the call in another.
+    self.assertEqual(sent_request_types, ['batch', 'batch', 'compute'])
+
+  @parameterized.named_parameters(
+      ('streaming', 'STREAMING'),
+      ('async_streaming', 'ASYNC_STREAMING'),
+  )
+  def test_batched_create_value_failing_on_service_raises(self, rpc_mode):
+    with test_context(rpc_mode=rpc_mode, batch_requests=True) as context:
+      ex = context.remote_executor
+      loop = asyncio.get_event_loop()
+      # The service cannot deserialize an empty value.
+      value_ref = loop.run_until_complete(
+          ex._create_value_ref(
+              executor_pb2.CreateValueRequest(value=executor_pb2.Value())))
+      failed = remote_executor.RemoteValue(
+          value_ref, computation_types.TensorType(tf.int32), ex)
+      with self.assertRaisesRegex(RuntimeError, 'failed to handle'):
+        loop.run_until_complete(failed.compute())
+      # The executor keeps serving requests.
+      value = loop.run_until_complete(ex.create_value(10, tf.int32))
+      self.assertEqual(loop.run_until_complete(value.compute()), 10)
+
+  @parameterized.named_parameters(
+      ('streaming', 'STREAMING'),
+      ('async_streaming', 'ASYNC_STREAMING'),
+  )
+  def test_batched_create_call_failing_on_service_raises(self, rpc_mode):
+    with test_context(rpc_mode=rpc_mode, batch_requests=True) as context:
+      ex = context.remote_executor
+      loop = asyncio.get_event_loop()
+      unknown_fn = remote_executor.RemoteValue(
+          executor_pb2.ValueRef(id='unknown'),
+          computation_types.FunctionType(None, tf.int32), ex)
+      failed = loop.run_until_complete(ex.create_call(unknown_fn))
+      with self.assertRaisesRegex(RuntimeError, 'failed to handle'):
+        loop.run_until_complete(failed.compute())
+      value = loop.run_until_complete(ex.create_value(10, tf.int32))
+      self.assertEqual(loop.run_until_complete(value.compute()), 10)
+
+  def test_failed_batch_only_fails_values_created_in_it(self):
+
+    @computations.tf_computation(tf.int32)
+    def comp(x):
+      return x + 1
+
+    with test_context(rpc_mode='STREAMING', batch_requests=True) as context:
+      ex = context.remote_executor
+      send_request = ex._bidi_stream.send_request
+      num_batches = [0]
+
+      async def _failing_first_batch_send_request(request):
+        if request.WhichOneof('request') == 'batch':
+          num_batches[0] += 1
+          if num_batches[0] == 1:
+            raise RuntimeError('Failed batch')
+        return await send_request(request)
+
+      ex._bidi_stream.send_request = _failing_first_batch_send_request
+      loop = asyncio.get_event_loop()
+      failed = loop.run_until_complete(ex.create_value(10, tf.int32))
+      loop.run_until_complete(ex._batcher.wait())
+      fn = loop.run_until_complete(ex.create_value(comp))
+      arg = loop.run_until_complete(ex.create_value(20, tf.int32))
+      result = loop.run_until_complete(ex.create_call(fn, arg))
+      computed = loop.run_until_complete(result.compute())
+      with self.assertRaisesRegex(RuntimeError, 'Failed batch'):
+        loop.run_until_complete(failed.compute())
+      loop.run_until_complete(
+          ex.set_cardinalities({placement_literals.CLIENTS: 3}))
+      self.assertEmpty(ex._batcher._errors)
+
+    self.assertEqual(computed.numpy(), 21)
+
+  def test_concurrent_requests_async_streaming(self):
+
+    @computations.tf_computation(tf.int32)
+    def comp(x):
+      return x + 1
+
+    async def _invoke_concurrently(ex):
+      fn = await ex.create_value(comp)
+      args = await asyncio.gather(
+          *[ex.create_value(i, tf.int32) for i in range(100)])
+      results = await asyncio.gather(
+          *[ex.create_call(fn, arg) for arg in args])
+      return await asyncio.gather(*[result.compute() for result in results])
+
+    with test_context(rpc_mode='ASYNC_STREAMING') as context:
+      results = asyncio.get_event_loop().run_until_complete(
+          _invoke_concurrently(context.executor))
+
+    self.assertEqual([result.numpy() for result in results],
+                     list(range(1, 101)))
+
+  def test_resending_large_value_with_deduplication_sends_digest_only(self):
+    port = portpicker.pick_unused_port()
+    server = grpc.server(logging_pool.pool(max_workers=1))
+    server.add_insecure_port('[::]:{}'.format(port))
+    service = executor_service.ExecutorService(
+        executor_stacks.local_executor_factory())
+    executor_pb2_grpc.add_ExecutorServicer_to_server(service, server)
+    server.start()
+    channel = grpc.insecure_channel('localhost:{}'.format(port))
+    executor = remote_executor.RemoteExecutor(
+        channel, deduplicate_values=True)
+    value = np.arange(1000, dtype=np.float32)
+    type_spec = computation_types.TensorType(tf.float32, [1000])
+    loop = asyncio.get_event_loop()
+    try:
+      loop.run_until_complete(executor.set_cardinalities({}))
+      sent_requests = []
+      create_value_fn = executor._create_value  # pylint: disable=protected-access
+
+      async def _recording_create_value(request):
+        sent_requests.append(request)
+        return await create_value_fn(request)
+
+      with mock.patch.object(executor, '_create_value',
+                             _recording_create_value):
+        first = loop.run_until_complete(executor.create_value(value, type_spec))
+        second = loop.run_until_complete(
+            executor.create_value(value, type_spec))
+      self.assertLen(sent_requests, 2)
+      self.assertTrue(sent_requests[0].HasField('value'))
+      self.assertFalse(sent_requests[1].HasField('value'))
+      self.assertEqual(sent_requests[0].digest, sent_requests[1].digest)
+      np.testing.assert_array_equal(
+          loop.run_until_complete(first.compute()), value)
+      np.testing.assert_array_equal(
+          loop.run_until_complete(second.compute()), value)
+    finally:
+      executor.close()
+      server.stop(None)
+
   def test_with_federated_computations(self):
     with test_context() as context:
 
@@ -689,6 +907,69 @@ class RemoteExecutorIntegrationTest(parameterized.TestCase):
       result = _invoke(context.executor, baz, 50)
       self.assertEqual(result, [51, 51, 51])
 
+  def test_remote_executor_factory_over_aggregator_service(self):
+
+    @computations.tf_computation(tf.int32)
+    def add_one(x):
+      return x + 1
+
+    @computations.federated_computation(
+        computation_types.FederatedType(tf.int32, placement_literals.SERVER))
+    def comp(x):
+      value = intrinsics.federated_broadcast(x)
+      return intrinsics.federated_map(add_one, value)
+
+    with contextlib.ExitStack() as stack:
+      worker_addresses = [
+          stack.enter_context(
+              _executor_service_context(
+                  executor_stacks.local_executor_factory())) for _ in range(2)
+      ]
+      # An intermediate aggregator, as served by the `remote_executor_service`
+      # binary run with `--worker_addresses`.
+      aggregator_factory = executor_stacks.remote_executor_factory(
+          [grpc.insecure_channel(address) for address in worker_addresses])
+      aggregator_address = stack.enter_context(
+          _executor_service_context(aggregator_factory))
+      factory = executor_stacks.remote_executor_factory(
+          [grpc.insecure_channel(aggregator_address)])
+      executor = factory.create_executor({placement_literals.CLIENTS: 4})
+      stack.callback(executor.close)
+
+      result = _invoke(executor, comp, 50)
+
+    self.assertEqual(result, [51, 51, 51, 51])
+
+  def test_remote_executor_factory_async_streaming_over_several_rounds(self):
+
+    @computations.tf_computation(tf.int32)
+    def add_one(x):
+      return x + 1
+
+    @computations.federated_computation(
+        computation_types.FederatedType(tf.int32, placement_literals.CLIENTS))
+    def comp(x):
+      return intrinsics.federated_map(add_one, x)
+
+    with _executor_service_context(
+        executor_stacks.local_executor_factory()) as address:
+      channels_created = []
+
+      def _channel_fn():
+        channels_created.append(address)
+        return grpc.aio.insecure_channel(address)
+
+      factory = executor_stacks.remote_executor_factory(
+          [_channel_fn], rpc_mode='ASYNC_STREAMING')
+      with executor_test_utils.install_executor(factory):
+        results = [comp([x] * 3) for x in range(3)]
+      factory.clean_up_executors()
+
+    self.assertEqual(results, [[1, 1, 1], [2, 2, 2], [3, 3, 3]])
+    # The stream is kept open across rounds, rather than re-created whenever
+    # requests are sent from another event loop.
+    self.assertLen(channels_created, 1)
+
 
 if __name__ == '__main__':
   absltest.main()
@@ -16,7 +16,7 @@
 import asyncio
 import functools
 import threading
-from typing import Optional
+from typing import List, Optional
 import weakref
 
 import absl.logging as logging
@@ -54,43 +54,120 @@ class ThreadDelegatingExecutorValue(evb.ExecutorValue):
                                           self._event_loop)
 
 
+def _start_event_loop_thread():
+  """Returns a new event loop and the daemon thread running it forever."""
+  event_loop = asyncio.new_event_loop()
+  event_loop.set_task_factory(tracing.propagate_trace_context_task_factory)
+
+  def run_loop(loop):
+    loop.run_forever()
+    loop.close()
+
+  thread = threading.Thread(
+      target=functools.partial(run_loop, event_loop), daemon=True)
+  thread.start()
+  return event_loop, thread
+
+
+def _stop_event_loop_threads(event_loops, threads):
+  logging.debug('Finalizing, joining %d thread(s).', len(threads))
+  for loop in event_loops:
+    loop.call_soon_threadsafe(loop.stop)
+  for thread in threads:
+    thread.join()
+  logging.debug('Thread(s) joined.')
+
+
+class EventLoopPool(object):
+  """A bounded pool of threads, each running an asyncio event loop.
+
+  An `EventLoopPool` can be shared by any number of `ThreadDelegatingExecutor`s
+  to bound the number of threads used to run them. Each executor is pinned to a
+  single event loop in the pool for its lifetime, so that the values of its
+  target executor are only ever accessed from a single thread. Executors are
+  assigned to the event loop with the fewest live executors, and the work of
+  executors sharing an event loop is interleaved in the order it is submitted.
+  """
+
+  def __init__(self, num_threads: int):
+    """Creates an `EventLoopPool` and starts its threads.
+
+    Args:
+      num_threads: A positive integer, the number of threads in the pool.
+
+    Raises:
+      ValueError: If `num_threads` is not positive.
+    """
+    py_typecheck.check_type(num_threads, int)
+    if num_threads < 1:
+      raise ValueError('Expected `num_threads` to be positive, found '
+                       '{}.'.format(num_threads))
+    self._lock = threading.Lock()
+    self._event_loops = []
+    threads = []
+    for _ in range(num_threads):
+      event_loop, thread = _start_event_loop_thread()
+      self._event_loops.append(event_loop)
+      threads.append(thread)
+    self._num_executors = [0] * num_threads
+    weakref.finalize(self, _stop_event_loop_threads, list(self._event_loops),
+                     threads)
+
+  @property
+  def num_threads(self) -> int:
+    return len(self._event_loops)
+
+  @property
+  def num_executors(self) -> List[int]:
+    """The number of live executors assigned to each of the event loops."""
+    with self._lock:
+      return list(self._num_executors)
+
+  def acquire(self) -> asyncio.AbstractEventLoop:
+    """Returns the least loaded event loop, and assigns one executor to it."""
+    with self._lock:
+      index = self._num_executors.index(min(self._num_executors))
+      self._num_executors[index] += 1
+      return self._event_loops[index]
+
+  def release(self, event_loop: asyncio.AbstractEventLoop):
+    """Unassigns one executor from `event_loop`."""
+    with self._lock:
+      index = self._event_loops.index(event_loop)
+      self._num_executors[index] -= 1
+
+
 class ThreadDelegatingExecutor(eb.Executor):
   """The concurrent executor delegates work to a separate thread.
 
   This executor only handles threading. It delegates all execution to an
   underlying pool of target executors.
-  """
 
-  # TODO(b/134543154): Upgrade this to a threadpool with multiple workers,
-  # possibly one that could be shared among multiple of these executors.
+  By default, each executor runs its own thread and event loop. If an
+  `EventLoopPool` is specified, the executor instead runs on one of the event
+  loops of the pool, shared with the other executors using the same pool.
+  """
 
-  def __init__(self, target_executor: eb.Executor):
+  def __init__(self,
+               target_executor: eb.Executor,
+               event_loop_pool: Optional[EventLoopPool] = None):
     """Creates a concurrent executor backed by a target executor.
 
     Args:
       target_executor: The executor that does all the work.
+      event_loop_pool: An optional `EventLoopPool` providing the thread to
+        delegate to. If `None`, the executor starts a dedicated thread.
     """
     py_typecheck.check_type(target_executor, eb.Executor)
     self._target_executor = target_executor
-    self._event_loop = asyncio.new_event_loop()
-    self._event_loop.set_task_factory(
-        tracing.propagate_trace_context_task_factory)
-
-    def run_loop(loop):
-      loop.run_forever()
-      loop.close()
-
-    self._thread = threading.Thread(
-        target=functools.partial(run_loop, self._event_loop), daemon=True)
-    self._thread.start()
-
-    def finalizer(loop, thread):
-      logging.debug('Finalizing, joining thread.')
-      loop.call_soon_threadsafe(loop.stop)
-      thread.join()
-      logging.debug('Thread joined.')
-
-    weakref.finalize(self, finalizer, self._event_loop, self._thread)
+    if event_loop_pool is not None:
+      py_typecheck.check_type(event_loop_pool, EventLoopPool)
+      self._event_loop = event_loop_pool.acquire()
+      weakref.finalize(self, event_loop_pool.release, self._event_loop)
+    else:
+      self._event_loop, thread = _start_event_loop_thread()
+      weakref.finalize(self, _stop_event_loop_threads, [self._event_loop],
+                       [thread])
 
   def close(self):
     # Close does not clean up the event loop or thread.
@@ -207,5 +207,41 @@ class ThreadDelegatingExecutorTest(absltest.TestCase):
     self.assertEqual(result, 9)
 
 
+class EventLoopPoolTest(absltest.TestCase):
+
+  def test_raises_value_error_with_no_threads(self):
+    with self.assertRaises(ValueError):
+      thread_delegating_executor.EventLoopPool(0)
+
+  def test_assigns_executors_to_least_loaded_event_loop(self):
+    pool = thread_delegating_executor.EventLoopPool(2)
+    executors = [
+        thread_delegating_executor.ThreadDelegatingExecutor(
+            eager_tf_executor.EagerTFExecutor(), event_loop_pool=pool)
+        for _ in range(5)
+    ]
+    self.assertEqual(pool.num_threads, 2)
+    self.assertCountEqual(pool.num_executors, [3, 2])
+
+    del executors
+    self.assertEqual(pool.num_executors, [0, 0])
+
+  def test_end_to_end_with_shared_event_loop_pool(self):
+
+    @computations.tf_computation(tf.int32)
+    def add_one(x):
+      return tf.add(x, 1)
+
+    pool = thread_delegating_executor.EventLoopPool(2)
+    executors = [
+        thread_delegating_executor.ThreadDelegatingExecutor(
+            eager_tf_executor.EagerTFExecutor(), event_loop_pool=pool)
+        for _ in range(10)
+    ]
+
+    results = [_invoke(ex, add_one, x) for x, ex in enumerate(executors)]
+    self.assertEqual(results, list(range(1, 11)))
+
+
 if __name__ == '__main__':
   absltest.main()
@@ -24,6 +24,7 @@ from tensorflow_federated.python.simulation.hdf5_client_data import HDF5ClientDa
 from tensorflow_federated.python.simulation.iterative_process_compositions import compose_dataset_computation_with_computation
 from tensorflow_federated.python.simulation.iterative_process_compositions import compose_dataset_computation_with_iterative_process
 from tensorflow_federated.python.simulation.metrics_manager import MetricsManager
+from tensorflow_federated.python.simulation.server_utils import run_async_server
 from tensorflow_federated.python.simulation.server_utils import run_server
 from tensorflow_federated.python.simulation.server_utils import server_context
 from tensorflow_federated.python.simulation.transforming_client_data import TransformingClientData
@@ -13,6 +13,7 @@
 # limitations under the License.
 """A set of utilities for components of simulation serving infrastructure."""
 
+import asyncio
 import concurrent
 import contextlib
 import time
@@ -114,3 +115,85 @@ def run_server(ex_factory: executor_factory.ExecutorFactory,
   with server_context(ex_factory, num_threads, port, credentials, options):
     while True:
       time.sleep(_ONE_DAY_IN_SECONDS)
+
+
+async def _serve_async(service: executor_service.AsyncExecutorService,
+                       port: int,
+                       credentials: Optional[grpc.ServerCredentials],
+                       options: Optional[List[Tuple[Any, Any]]],
+                       max_concurrent_rpcs: Optional[int]):
+  """Serves `service` on a `grpc.aio` server until it is terminated."""
+  # The server must be created in the event loop it runs in.
+  server = grpc.aio.server(
+      options=options, maximum_concurrent_rpcs=max_concurrent_rpcs)
+  full_port_string = '[::]:{}'.format(port)
+  if credentials is not None:
+    server.add_secure_port(full_port_string, credentials)
+  else:
+    server.add_insecure_port(full_port_string)
+  executor_pb2_grpc.add_ExecutorServicer_to_server(service, server)
+  await server.start()
+  try:
+    await server.wait_for_termination()
+  finally:
+    await server.stop(None)
+
+
+def run_async_server(ex_factory: executor_factory.ExecutorFactory,
+                     port: int,
+                     credentials: Optional[grpc.ServerCredentials] = None,
+                     options: Optional[List[Tuple[Any, Any]]] = None,
+                     max_concurrent_rpcs: Optional[int] = None,
+                     max_concurrent_requests_per_stream: int = 1000):
+  """Runs an asyncio gRPC server hosting a simulation component.
+
+  Unlike `run_server`, which handles calls on a thread pool, the server runs
+  on a single event loop with an `AsyncExecutorService`, so that a worker can
+  serve many coordinators, each with many requests in flight, without a thread
+  per call. The server runs indefinitely, but can be stopped by a keyboard
+  interrupt.
+
+  Args:
+    ex_factory: The executor factory to be hosted by the server.
+    port: The port to listen on (for gRPC), must be a non-zero integer.
+    credentials: The optional credentials to use for the secure connection if
+      any, or `None` if the server should open an insecure port. If specified,
+      must be a valid `ServerCredentials` object that can be accepted by the
+      gRPC server's `add_secure_port()`.
+    options: The optional `list` of server options, each in the `(key, value)`
+      format accepted by the `grpc.aio.server()` constructor.
+    max_concurrent_rpcs: The optional maximum number of calls, including open
+      `Execute` streams, that the server handles at once. Further calls are
+      rejected with `RESOURCE_EXHAUSTED`. Unbounded if `None`.
+    max_concurrent_requests_per_stream: The maximum number of requests of a
+      single `Execute` stream that are handled at once. Further requests are
+      left unread, so that gRPC flow control pushes back on the client.
+
+  Raises:
+    ValueError: If `port`, `max_concurrent_rpcs` or
+      `max_concurrent_requests_per_stream` are invalid.
+  """
+  py_typecheck.check_type(ex_factory, executor_factory.ExecutorFactory)
+  py_typecheck.check_type(port, int)
+  if credentials is not None:
+    py_typecheck.check_type(credentials, grpc.ServerCredentials)
+  if port < 1:
+    raise ValueError('The server port must be a positive integer.')
+  if max_concurrent_rpcs is not None:
+    py_typecheck.check_type(max_concurrent_rpcs, int)
+    if max_concurrent_rpcs < 1:
+      raise ValueError(
+          'The maximum number of concurrent calls must be a positive integer.')
+  service = executor_service.AsyncExecutorService(
+      ex_factory,
+      max_concurrent_requests_per_stream=max_concurrent_requests_per_stream)
+  loop = asyncio.new_event_loop()
+  try:
+    loop.run_until_complete(
+        _serve_async(service, port, credentials, options, max_concurrent_rpcs))
+  except KeyboardInterrupt:
+    logging.info('Server stopped by KeyboardInterrupt.')
+  finally:
+    logging.info('Shutting down server.')
+    loop.close()
+    ex_factory.clean_up_executors()
@@ -60,7 +60,7 @@ REQUIRED_PACKAGES = [
     'attrs~=19.3.0',
     'cachetools~=3.1.1',
     'dm-tree~=0.1.1',
-    'grpcio~=1.29.0',
+    'grpcio~=1.32.0',
     'h5py~=2.10.0',
     'numpy~=1.18.4',
     'portpicker~=1.3.1',
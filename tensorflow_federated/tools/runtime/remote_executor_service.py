@@ -27,12 +27,62 @@ flags.DEFINE_string('certificate_chain', '', 'the cert for SSL/TLS setup')
 flags.DEFINE_integer('clients', '1', 'number of clients to host on this worker')
 flags.DEFINE_integer('fanout', '100',
                      'max fanout in the hierarchy of local executors')
+flags.DEFINE_list(
+    'worker_addresses', [],
+    'addresses of downstream workers; if set, this worker is an intermediate '
+    'aggregator hosting the clients of these workers, and --clients is '
+    'ignored')
+flags.DEFINE_enum('worker_rpc_mode', 'REQUEST_REPLY',
+                  ['REQUEST_REPLY', 'STREAMING'],
+                  'mode of the connections to the downstream workers; must be '
+                  'STREAMING if --asyncio is set, as REQUEST_REPLY calls would '
+                  'block the event loop')
+flags.DEFINE_string(
+    'worker_root_certificates', '',
+    'the root certificates for SSL/TLS connections to the downstream workers; '
+    'if not set, the connections to the downstream workers are plaintext, '
+    'regardless of --private_key and --certificate_chain')
+flags.DEFINE_bool(
+    'asyncio', False, 'whether to serve on an asyncio event loop rather than '
+    'a thread pool; --threads is then ignored')
+flags.DEFINE_integer(
+    'max_concurrent_rpcs', None,
+    'max number of calls handled at once by the asyncio server, if bounded')
+flags.DEFINE_integer(
+    'max_concurrent_requests_per_stream', '1000',
+    'max number of requests of one stream handled at once by the asyncio '
+    'server')
 
 
 def main(argv):
   del argv
-  executor_factory = tff.framework.local_executor_factory(
-      num_clients=FLAGS.clients, max_fanout=FLAGS.fanout)
+  if FLAGS.worker_addresses:
+    if FLAGS.asyncio and FLAGS.worker_rpc_mode == 'REQUEST_REPLY':
+      # Request-reply calls to the workers block the thread they are made on,
+      # which is the event loop serving all streams with --asyncio.
+      raise ValueError(
+          '--worker_rpc_mode=REQUEST_REPLY cannot be used with --asyncio; use '
+          '--worker_rpc_mode=STREAMING instead.')
+    # Values broadcast to this aggregator are re-broadcast to its workers, so
+    # that the egress of the root of a deep hierarchy scales with its fanout.
+    if FLAGS.worker_root_certificates:
+      with open(FLAGS.worker_root_certificates, 'rb') as f:
+        root_certificates = f.read()
+      channel_credentials = grpc.ssl_channel_credentials(
+          root_certificates=root_certificates)
+      channels = [
+          grpc.secure_channel(address, channel_credentials)
+          for address in FLAGS.worker_addresses
+      ]
+    else:
+      channels = [
+          grpc.insecure_channel(address) for address in FLAGS.worker_addresses
+      ]
+    executor_factory = tff.framework.remote_executor_factory(
+        channels, rpc_mode=FLAGS.worker_rpc_mode, max_fanout=FLAGS.fanout)
+  else:
+    executor_factory = tff.framework.local_executor_factory(
+        num_clients=FLAGS.clients, max_fanout=FLAGS.fanout)
   if FLAGS.private_key:
     if FLAGS.certificate_chain:
       with open(FLAGS.private_key, 'rb') as f:
@@ -48,8 +98,17 @@ def main(argv):
           'Private key has been specified, but the certificate chain missing.')
   else:
     credentials = None
-  tff.simulation.run_server(executor_factory, FLAGS.threads, FLAGS.port,
-                            credentials)
+  if FLAGS.asyncio:
+    tff.simulation.run_async_server(
+        executor_factory,
+        FLAGS.port,
+        credentials,
+        max_concurrent_rpcs=FLAGS.max_concurrent_rpcs,
+        max_concurrent_requests_per_stream=(
+            FLAGS.max_concurrent_requests_per_stream))
+  else:
+    tff.simulation.run_server(executor_factory, FLAGS.threads, FLAGS.port,
+                              credentials)
 
 
 if __name__ == '__main__':